@@ -0,0 +1,62 @@
+# bench/bench_adaptive.py
+"""
+AIMD concurrency under throttling (user-017), fuzz scheduler vs local HTTP.
+
+Each scenario fuzzes `--paths` paths on a server in its own process that
+takes `--latency` seconds per request and, when capped, answers 429 beyond
+that many requests in flight. Capped runs start the limit at `--start`;
+the uncapped run starts at 10 and may grow to `--max`. Reports the limit
+path, requests/sec and the share of requests that were throttled. Fails if
+a capped run does not end within half/double its cap, or the uncapped run
+never grows.
+
+    python bench/bench_adaptive.py --caps 10,25 --latency 0.1
+"""
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT / "src"), str(ROOT)]
+
+from fuzz.scheduler import FuzzScheduler, fuzz_hosts  # noqa: E402
+from tests.stubs import forked_http, timed  # noqa: E402
+from utils.adaptive import AimdController  # noqa: E402
+
+
+def run(cap, start, upper, args):
+    with forked_http(lambda p: (404, {}, b""), delay=args.latency, max_in_flight=cap) as url:
+        ctl = AimdController(start, min_limit=2, max_limit=upper, name="fuzz")
+        sch = FuzzScheduler(per_host=upper, max_errors=10**6, max_retries=1000, backoff=0.0,
+                            calibrate=False, adaptive=ctl)
+        _, secs = timed(fuzz_hosts, [url], [f"p{i}" for i in range(args.paths)], scheduler=sch)
+    return ctl.report(), sch.host_summaries()[0], secs
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--paths", type=int, default=2000)
+    ap.add_argument("--latency", type=float, default=0.1, help="server delay per request (s)")
+    ap.add_argument("--caps", default="10,25", help="in-flight caps of the throttling servers")
+    ap.add_argument("--start", type=int, default=200)
+    ap.add_argument("--max", type=int, default=320)
+    args = ap.parse_args()
+
+    ok = True
+    scenarios = [(int(c), args.start) for c in args.caps.split(",")] + [(None, 10)]
+    for cap, start in scenarios:
+        rep, st, secs = run(cap, start, args.max, args)
+        tail = [h["limit"] for h in rep["history"][-10:]]
+        if cap is None:
+            good = rep["max_seen"] > start
+        else:
+            good = all(cap / 2 <= limit <= cap * 2 for limit in tail)
+        ok &= good
+        print(f"cap={cap or 'none':<5} limit {start} -> {rep['limit']:<4} (range {rep['min_seen']}-{rep['max_seen']}, "
+              f"{rep['decreases']} decreases, last {tail})  {st['done'] / secs:6.0f} paths/s  "
+              f"{st['backoffs'] / st['requests']:5.1%} throttled  {'ok' if good else 'MISMATCH'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
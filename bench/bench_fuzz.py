@@ -0,0 +1,79 @@
+# bench/bench_fuzz.py
+"""
+Path fuzzer throughput (user-007) against a local HTTP server.
+
+Every `--hit-every`th path exists. Reports requests/sec per concurrency
+level for one host (PathFuzzer) and for `--hosts` hosts at once
+(FuzzScheduler); each server runs in its own process. Then fetches one
+`--big-mb` body and reports the client's Python heap peak, to check that
+bodies are hashed as a stream up to max_bytes instead of loaded. Fails if
+hits are missed or invented.
+
+    python bench/bench_fuzz.py --paths 5000 --latency 0.01
+"""
+import argparse
+import sys
+import tracemalloc
+from contextlib import ExitStack
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT / "src"), str(ROOT)]
+
+from fuzz.path_fuzzer import PathFuzzer, iter_fuzz  # noqa: E402
+from fuzz.scheduler import FuzzScheduler, iter_fuzz_hosts  # noqa: E402
+from tests.stubs import forked_http, timed  # noqa: E402
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--paths", type=int, default=5000)
+    ap.add_argument("--hit-every", type=int, default=50)
+    ap.add_argument("--latency", type=float, default=0.01, help="server delay per request (s)")
+    ap.add_argument("--concurrency", default="10,50,200")
+    ap.add_argument("--hosts", type=int, default=4)
+    ap.add_argument("--big-mb", type=int, default=20)
+    args = ap.parse_args()
+
+    paths = [f"p{i}" for i in range(args.paths)] + ["big"]
+    expected = {p for i, p in enumerate(paths[:-1]) if i % args.hit_every == 0} | {"big"}
+    big = b"x" * (args.big_mb << 20)
+
+    def handler(target):
+        name = target.lstrip("/")
+        if name == "big":
+            return 200, {}, big
+        return (200, {}, b"<html>found %s</html>" % name.encode()) if name in expected else (404, {}, b"")
+
+    ok = True
+    with ExitStack() as stack:
+        urls = [stack.enter_context(forked_http(handler, args.latency)) for _ in range(args.hosts)]
+        for c in (int(x) for x in args.concurrency.split(",")):
+            fuzzer = PathFuzzer(concurrency=c, calibrate=False)
+            hits, secs = timed(lambda: list(iter_fuzz(urls[0], paths, fuzzer=fuzzer)))
+            good = {h["url"].rsplit("/", 1)[1] for h in hits} == expected
+            ok &= good
+            print(f"1 host   concurrency={c:<4} {len(paths)} requests in {secs:6.2f}s  "
+                  f"{len(paths) / secs:7.0f} req/s  {len(hits)} hits  {'ok' if good else 'MISMATCH'}")
+        c = max(int(x) for x in args.concurrency.split(","))
+        sch = FuzzScheduler(concurrency=c, per_host=max(1, c // args.hosts), calibrate=False)
+        hits, secs = timed(lambda: list(iter_fuzz_hosts(urls, paths, scheduler=sch)))
+        good = len(hits) == len(expected) * args.hosts
+        ok &= good
+        total = len(paths) * args.hosts
+        print(f"{args.hosts} hosts  concurrency={c:<4} {total} requests in {secs:6.2f}s  "
+              f"{total / secs:7.0f} req/s  {len(hits)} hits  {'ok' if good else 'MISMATCH'}")
+
+        tracemalloc.start()
+        hits = list(iter_fuzz(urls[0], ["big"], calibrate=False))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        good = len(hits) == 1 and hits[0]["truncated"]
+        ok &= good
+        print(f"{args.big_mb} MB body: client heap peak {peak / 2**20:.2f} MB, "
+              f"hashed {hits[0]['len'] if hits else 0} bytes  {'ok' if good else 'MISMATCH'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+# bench/bench_nmap_parse.py
+"""
+Streaming nmap XML parser memory (user-011) on a synthetic scan file.
+
+Writes an nmap -oX style document with `--hosts` hosts to a temp file, then
+compares ET.parse over the whole file against iter_nmap_xml fed in CHUNK
+pieces. Hosts are consumed one at a time in both cases, so the heap peak
+reflects the parser alone. Reports time and tracemalloc peak for each; fails
+if the host or port counts differ.
+
+    python bench/bench_nmap_parse.py --hosts 30000
+"""
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT / "src"), str(ROOT)]
+
+from scanner.nmap_integration import CHUNK, _host_record, iter_nmap_xml  # noqa: E402
+
+HOST = """<host starttime="1700000000" endtime="1700000042"><status state="up" reason="syn-ack"/>
+<address addr="10.{a}.{b}.{c}" addrtype="ipv4"/><address addr="00:11:22:{a:02X}:{b:02X}:{c:02X}" addrtype="mac" vendor="Acme"/>
+<hostnames><hostname name="h{i}.example.com" type="PTR"/></hostnames>
+<ports>{ports}</ports>
+<os><osmatch name="Linux 5.X" accuracy="96"/><osmatch name="Linux 4.X" accuracy="90"/></os>
+<hostscript><script id="smb-os-discovery" output="OS: Unix; host h{i}"/></hostscript>
+</host>
+"""
+PORT = ('<port protocol="tcp" portid="{p}"><state state="open" reason="syn-ack" reason_ttl="64"/>'
+        '<service name="http" product="nginx" version="1.25.{p}" method="probed" conf="10">'
+        '<cpe>cpe:/a:nginx:nginx:1.25.{p}</cpe></service>'
+        '<script id="http-title" output="Welcome to host {i} port {p}"/></port>')
+
+
+def write_scan(path: Path, hosts: int, ports: int):
+    with open(path, "w") as f:
+        f.write('<?xml version="1.0"?>\n<nmaprun scanner="nmap" args="nmap -sV -oX -" version="7.94">\n'
+                '<scaninfo type="syn" protocol="tcp" numservices="1000" services="1-1000"/>\n')
+        for i in range(hosts):
+            f.write(HOST.format(i=i, a=i >> 16 & 255, b=i >> 8 & 255, c=i & 255,
+                                ports="".join(PORT.format(i=i, p=80 + p) for p in range(ports))))
+        f.write(f'<runstats><finished time="1700000042"/><hosts up="{hosts}" down="0" total="{hosts}"/></runstats>\n'
+                '</nmaprun>\n')
+
+
+def whole_tree(path: Path):
+    for el in ET.parse(path).getroot().iter("host"):
+        yield _host_record(el)
+
+
+def streamed(path: Path):
+    with open(path, "rb") as f:
+        yield from iter_nmap_xml(iter(lambda: f.read(CHUNK), b""))
+
+
+def measure(hosts):
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = ports = 0
+    for h in hosts:
+        count += 1
+        ports += len(h["ports"])
+    secs = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return count, ports, secs, peak
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--hosts", type=int, default=30000)
+    ap.add_argument("--ports", type=int, default=5, help="open ports per host")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "scan.xml"
+        write_scan(path, args.hosts, args.ports)
+        print(f"{args.hosts} hosts, {path.stat().st_size / 2**20:.1f} MB of XML")
+        results = {}
+        for label, hosts in (("ET.parse", whole_tree(path)), ("iter_nmap_xml", streamed(path))):
+            count, ports, secs, peak = results[label] = measure(hosts)
+            print(f"{label:<14} {count} hosts {ports} ports in {secs:6.2f}s  "
+                  f"{count / secs:7.0f} hosts/s  heap peak {peak / 2**20:8.2f} MB")
+    counts = {r[:2] for r in results.values()}
+    ok = counts == {(args.hosts, args.hosts * args.ports)}
+    print("ok" if ok else f"MISMATCH {counts}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+# bench/bench_store.py
+"""
+Result store write cost (user-014): json export vs ndjson vs sqlite.
+
+Writes `--records` probe-like records plus `--records // 10` nmap hosts with
+`--ports` ports each into a temp results dir, the way main._save does (the
+json export serializes the whole list; the stores take records one at a time
+and are flushed once). Reports records/sec, size on disk and heap peak per
+store (the peak from a second, traced pass so tracing does not skew the
+timing); fails if a store does not read back the same number of records.
+
+    python bench/bench_store.py --records 100000
+"""
+import argparse
+import gzip
+import json
+import sqlite3
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT / "src"), str(ROOT)]
+
+import config  # noqa: E402
+from utils.output import save_json  # noqa: E402
+from utils.store import NdjsonStore, SqliteStore  # noqa: E402
+from tests.stubs import timed  # noqa: E402
+
+NAME = "bench.test"
+
+
+def probes(n):
+    for i in range(n):
+        yield {"url": f"https://h{i}.{NAME}/", "status": 200 if i % 3 else 403, "title": f"host {i}",
+               "server": "nginx", "ips": [f"10.0.{i >> 8 & 255}.{i & 255}"], "length": 1000 + i}
+
+
+def hosts(n, ports):
+    for i in range(n):
+        yield {"addr": f"10.1.{i >> 8 & 255}.{i & 255}", "status": "up",
+               "ports": [{"port": str(80 + p), "protocol": "tcp", "state": "open", "service": "http"}
+                         for p in range(ports)]}
+
+
+def write_json(args):
+    save_json(f"{NAME}_probe", list(probes(args.records)))
+    save_json(f"{NAME}_nmap", list(hosts(args.records // 10, args.ports)))
+
+
+def write_store(store, args):
+    store.write_many("probe", probes(args.records))
+    store.write_many("nmap", hosts(args.records // 10, args.ports))
+    store.close()
+
+
+def count_json(d):
+    return sum(len(json.loads(p.read_text())) for p in d.glob("*.json"))
+
+
+def count_ndjson(d):
+    return sum(sum(1 for _ in (gzip.open(p, "rt") if p.suffix == ".gz" else open(p))) for p in d.glob("*.ndjson*"))
+
+
+def count_sqlite(d):
+    db = sqlite3.connect(str(d / "results.sqlite"))
+    try:
+        return db.execute("SELECT count(*) FROM records").fetchone()[0]
+    finally:
+        db.close()
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--records", type=int, default=100000)
+    ap.add_argument("--ports", type=int, default=5, help="ports per nmap host")
+    args = ap.parse_args()
+
+    total = args.records + args.records // 10
+    cases = (
+        ("json", write_json, count_json),
+        ("ndjson", lambda a: write_store(NdjsonStore(NAME), a), count_ndjson),
+        ("ndjson+gzip", lambda a: write_store(NdjsonStore(NAME, compress="gzip"), a), count_ndjson),
+        ("sqlite", lambda a: write_store(SqliteStore(NAME), a), count_sqlite),
+    )
+    ok = True
+    for label, write, count in cases:
+        with tempfile.TemporaryDirectory() as tmp:
+            config.RESULTS_DIR = Path(tmp)
+            _, secs = timed(write, args)
+            size = sum(p.stat().st_size for p in Path(tmp).iterdir())
+            got = count(Path(tmp))
+        with tempfile.TemporaryDirectory() as tmp:
+            config.RESULTS_DIR = Path(tmp)
+            tracemalloc.start()
+            write(args)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        good = got == total
+        ok &= good
+        print(f"{label:<12} {total} records in {secs:6.2f}s  {total / secs:8.0f} rec/s  "
+              f"{size / 2**20:7.1f} MB on disk  heap peak {peak / 2**20:7.1f} MB  "
+              f"{'ok' if good else f'MISMATCH ({got})'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,25 +1,24 @@
 # src/config.py
 from pathlib import Path
 import os
-from dotenv import load_dotenv
-
-load_dotenv()
 
 # root of the package (absolute)
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 
+# python-dotenv is slow to import; only load it when there is a .env to read
+# (same lookup as load_dotenv(): this directory, then its parents)
+for _d in (Path(__file__).resolve().parent, *Path(__file__).resolve().parents):
+    if (_d / ".env").is_file():
+        from dotenv import load_dotenv
+        load_dotenv(_d / ".env")
+        break
+
 # Use absolute dirs so working directory doesn't matter
 DATA_DIR = Path(os.getenv("DATA_DIR", PROJECT_ROOT / "data"))
 SCREENSHOT_DIR = Path(os.getenv("SCREENSHOT_DIR", PROJECT_ROOT / "screenshots"))
 RESULTS_DIR = Path(os.getenv("RESULTS_DIR", PROJECT_ROOT / "results"))
-
-# ensure these directories exist immediately
-for d in (DATA_DIR, SCREENSHOT_DIR, RESULTS_DIR):
-    try:
-        d.mkdir(parents=True, exist_ok=True)
-    except Exception as e:
-        # avoid raising on import; the caller can see logs/errors
-        print(f"[config] could not create dir {d}: {e}")
+# created on first write (utils.output.result_path, the screenshot engine,
+# the stores), not on import
 
 SHODAN_API_KEY = os.getenv("SHODAN_API_KEY", "")
 DEFAULT_WORDLIST = Path(os.getenv("DEFAULT_WORDLIST", DATA_DIR / "subdomains.txt"))
@@ -27,3 +26,13 @@ DEFAULT_PATH_WORDLIST = Path(os.getenv("PATH_WORDLIST", DATA_DIR / "paths.txt"))
 HTTP_TIMEOUT = int(os.getenv("HTTP_TIMEOUT", "6"))
 NMAP_PORTS = os.getenv("NMAP_PORTS", "1-1000")
 NMAP_EXTRA_ARGS = os.getenv("NMAP_EXTRA_ARGS", "-sV -sC")
+NMAP_BIN = os.getenv("NMAP_BIN", "nmap")
+NMAP_PROCS = int(os.getenv("NMAP_PROCS", "4"))
+NMAP_BATCH_SIZE = int(os.getenv("NMAP_BATCH_SIZE", "16"))
+NMAP_TOP_PORTS = int(os.getenv("NMAP_TOP_PORTS", "1000"))
+NMAP_DISCOVERY_ARGS = os.getenv("NMAP_DISCOVERY_ARGS", "-T4 --open")
+# bounds of the in-flight limits chosen by --adaptive
+ADAPTIVE_MIN = int(os.getenv("ADAPTIVE_MIN", "4"))
+ADAPTIVE_MAX_DNS = int(os.getenv("ADAPTIVE_MAX_DNS", "1000"))
+ADAPTIVE_MAX_PROBE = int(os.getenv("ADAPTIVE_MAX_PROBE", "500"))
+ADAPTIVE_MAX_FUZZ = int(os.getenv("ADAPTIVE_MAX_FUZZ", "1000"))
@@ -0,0 +1,163 @@
+# src/discovery/async_dns.py
+"""
+asyncio DNS bruteforce engine built on dns.asyncresolver.
+
+Instead of one future per wordlist entry, a fixed number of coroutines pull
+labels from a shared iterator, so the in-flight window (and memory) stays
+bounded regardless of wordlist size.
+"""
+import asyncio
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import dns.asyncresolver
+import dns.exception
+import dns.resolver
+
+from discovery.resolver_pool import ResolverPool
+from discovery.wildcard import DnsAnswer, WildcardFilter, answer_from
+from utils import metrics
+from utils.adaptive import AimdController, AsyncLimiter
+from utils.cache import MISS, ResultCache
+from utils.ratelimit import AsyncTokenBucket
+from utils.streams import iter_from_async
+
+
+class _AsyncUpstreams:
+    """Lazily created async resolver + rate limiter per pool nameserver."""
+
+    def __init__(self, rate: Optional[float] = None):
+        self.rate = rate
+        self._resolvers: Dict[str, dns.asyncresolver.Resolver] = {}
+        self._limiters: Dict[str, AsyncTokenBucket] = {}
+
+    def get(self, nameserver: str) -> Tuple[dns.asyncresolver.Resolver, AsyncTokenBucket]:
+        r = self._resolvers.get(nameserver)
+        if r is None:
+            r = dns.asyncresolver.Resolver(configure=False)
+            r.nameservers = [nameserver]
+            self._resolvers[nameserver] = r
+            self._limiters[nameserver] = AsyncTokenBucket(self.rate)
+        return r, self._limiters[nameserver]
+
+
+async def _aresolve(host: str, pool: ResolverPool, upstreams: _AsyncUpstreams,
+                    timeout: float = 3.0, cache: Optional[ResultCache] = None) -> Optional[DnsAnswer]:
+    """
+    Resolve A records for host via the pool. Timeouts and SERVFAIL are retried
+    on a different resolver (up to pool.retries extra attempts); NXDOMAIN and
+    NoAnswer are final (and cached, like positive answers, when `cache` is set).
+    """
+    if cache is not None:
+        cached = cache.get_dns(host)
+        if cached is not MISS:
+            return DnsAnswer(*cached) if cached else None
+    up = None
+    for attempt in range(pool.retries + 1):
+        if attempt:
+            metrics.inc("dns_retries_total")
+        up = pool.pick(exclude=up)
+        resolver, limiter = upstreams.get(up.nameserver)
+        await limiter.acquire()
+        t0 = time.monotonic()
+        try:
+            ans = await resolver.resolve(host, "A", lifetime=timeout)
+        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+            pool.record(up, "nxdomain", time.monotonic() - t0)
+            if cache is not None:
+                cache.put_dns(host, None)
+            return None
+        except dns.exception.Timeout:
+            pool.record(up, "timeout", time.monotonic() - t0)
+            continue
+        except dns.resolver.NoNameservers:
+            pool.record(up, "servfail", time.monotonic() - t0)
+            continue
+        except dns.exception.DNSException:
+            pool.record(up, "error", time.monotonic() - t0)
+            return None
+        pool.record(up, "ok", time.monotonic() - t0)
+        answer = answer_from(ans, host)
+        if cache is not None:
+            cache.put_dns(host, answer.ips, answer.cname, answer.ttl)
+        return answer
+    return None
+
+
+async def _abruteforce(domain: str, wordlist: Iterable[str], pool: ResolverPool,
+                       wildcard_filter: WildcardFilter,
+                       emit: Callable[[str, List[str]], Awaitable[None]],
+                       concurrency: int = 200, rate: Optional[float] = None,
+                       timeout: float = 3.0, stop: Optional[threading.Event] = None,
+                       cache: Optional[ResultCache] = None, adaptive: Optional[AimdController] = None):
+    upstreams = _AsyncUpstreams(rate)
+    labels = iter(wordlist)
+    limiter = None
+    if adaptive is not None:
+        # enough workers for the upper bound; the limiter keeps the rest waiting
+        pool.controller = adaptive
+        limiter = AsyncLimiter(adaptive)
+        concurrency = adaptive.max_limit
+
+    async def worker():
+        # all workers share one iterator, so entries are consumed lazily
+        for sub in labels:
+            if stop is not None and stop.is_set():
+                return
+            fqdn = f"{sub}.{domain}"
+            if limiter is None:
+                ans = await _aresolve(fqdn, pool, upstreams, timeout, cache)
+            else:
+                async with limiter.slot():
+                    ans = await _aresolve(fqdn, pool, upstreams, timeout, cache)
+            if ans is None or not ans.ips:
+                continue
+            if wildcard_filter.needs_analysis(fqdn):
+                # new zone: fingerprint it off-loop (blocking probes, once per zone)
+                await asyncio.to_thread(wildcard_filter.analyze, wildcard_filter.zone_for(fqdn))
+            if wildcard_filter.check(fqdn, ans):
+                continue
+            await emit(fqdn, list(ans.ips))
+
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+
+
+async def abruteforce_subdomains(domain: str, wordlist: Iterable[str], pool: ResolverPool,
+                                 wildcard_filter: WildcardFilter, **kwargs) -> Dict[str, List[str]]:
+    """
+    Async counterpart of bruteforce_subdomains.
+
+    concurrency: max in-flight queries
+    adaptive: AimdController that sets the in-flight limit instead of `concurrency`
+    rate: per-resolver queries/sec limit (None = unlimited)
+    timeout/retries: per query; retries come from pool.retries
+    """
+    found: Dict[str, List[str]] = {}
+
+    async def emit(fqdn, ips):
+        found[fqdn] = ips
+
+    await _abruteforce(domain, wordlist, pool, wildcard_filter, emit, **kwargs)
+    return found
+
+
+def run_async_bruteforce(domain: str, wordlist: Iterable[str], pool: ResolverPool,
+                         wildcard_filter: WildcardFilter, **kwargs) -> Dict[str, List[str]]:
+    """Blocking wrapper around abruteforce_subdomains."""
+    return asyncio.run(abruteforce_subdomains(domain, wordlist, pool, wildcard_filter, **kwargs))
+
+
+def iter_async_bruteforce(domain: str, wordlist: Iterable[str], pool: ResolverPool,
+                          wildcard_filter: WildcardFilter, buffer: int = 1000, **kwargs) -> Iterator[Tuple[str, List[str]]]:
+    """
+    Run the async engine on a background event loop and yield (fqdn, ips) hits
+    to synchronous consumers as they resolve. At most `buffer` unconsumed hits
+    are held before the engine pauses.
+    """
+    def produce(emit, stop):
+        async def emit_hit(fqdn, ips):
+            await emit((fqdn, ips))
+        return _abruteforce(domain, wordlist, pool, wildcard_filter, emit_hit, stop=stop, **kwargs)
+
+    return iter_from_async(produce, buffer=buffer, name="async-dns")
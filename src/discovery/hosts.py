@@ -1,26 +1,57 @@
 # src/discovery/hosts.py
-from typing import List
-from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Optional
 import config
+from discovery.http_probe import iter_probe
+from utils import metrics
+from utils.cache import MISS, ResultCache
 from utils.helpers import requests_session
 
-session = requests_session(timeout=config.HTTP_TIMEOUT)
+_session = None
 
-def is_live_http(host: str) -> bool:
-    for proto in ("http://", "https://"):
-        url = proto + host
+def get_session():
+    """Shared requests session, built on first use rather than on import."""
+    global _session
+    if _session is None:
+        _session = requests_session(timeout=config.HTTP_TIMEOUT)
+    return _session
+
+def is_live_http(host: str, cache: Optional[ResultCache] = None) -> bool:
+    """
+    Blocking single-host check: True if host answers plain HTTP or HTTPS. With
+    `cache`, a fresh result for (host, scheme) is reused instead of probing.
+    """
+    for scheme in ("http", "https"):
+        if cache is not None:
+            cached = cache.get_probe(host, scheme)
+            if cached is not MISS:
+                if cached:
+                    return True
+                continue
+        live = False
         try:
-            r = session.get(url, timeout=config.HTTP_TIMEOUT, allow_redirects=True)
-            if 100 <= r.status_code < 600:
-                return True
+            r = get_session().get(f"{scheme}://{host}", timeout=config.HTTP_TIMEOUT, allow_redirects=True)
+            live = 100 <= r.status_code < 600
         except Exception:
-            continue
+            pass
+        if cache is not None:
+            cache.put_probe(host, scheme, live)
+        if live:
+            return True
     return False
 
-def filter_live(hosts: List[str], workers: int = 20) -> List[str]:
-    live = []
-    with ThreadPoolExecutor(max_workers=workers) as exe:
-        for res in exe.map(lambda h: h if is_live_http(h) else None, hosts):
-            if res:
-                live.append(res)
-    return live
+def iter_live(hosts: Iterable[str], workers: int = 100,
+              cache: Optional[ResultCache] = None, **probe_opts) -> Iterator[str]:
+    """
+    Yield live hosts as soon as they are confirmed by the async prober
+    (discovery.http_probe). `hosts` may be a lazy iterator (e.g. fed from
+    iter_subdomains), so probing starts while resolution is still running.
+    `workers` is the number of hosts probed concurrently.
+    """
+    for res in iter_probe(hosts, concurrency=workers, cache=cache, **probe_opts):
+        if res["live"]:
+            yield res["host"]
+
+@metrics.timed("filter_live_seconds")
+def filter_live(hosts: Iterable[str], workers: int = 100,
+                cache: Optional[ResultCache] = None, **probe_opts) -> List[str]:
+    return list(iter_live(hosts, workers=workers, cache=cache, **probe_opts))
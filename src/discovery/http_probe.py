@@ -0,0 +1,248 @@
+# src/discovery/http_probe.py
+"""
+Async HTTP(S) liveness prober built on httpx (HTTP/1.1 + HTTP/2).
+
+Per host, both schemes are probed concurrently: "race" returns the first
+scheme that answers and cancels the other, "both" waits for both and prefers
+HTTPS. Each scheme can try HEAD first (falling back to GET on 405/501 or
+errors), and GET bodies are read only up to `max_bytes`. One pass captures
+status, <title>, Server header, TLS certificate names, HTTP version and the
+redirect chain.
+"""
+import asyncio
+import html
+import re
+import ssl
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import httpx
+
+import config
+from utils import adaptive as aimd, metrics
+from utils.cache import MISS, ResultCache
+from utils.helpers import async_http_client
+from utils.streams import aiter_sync, iter_from_async
+
+try:  # optional: decode certificates we did not verify
+    from cryptography import x509
+except ImportError:  # pragma: no cover
+    x509 = None
+
+SCHEMES = ("https", "http")
+MODES = ("race", "both")
+
+_TITLE_RE = re.compile(rb"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+
+
+def _extract_title(body: bytes, encoding: Optional[str]) -> Optional[str]:
+    m = _TITLE_RE.search(body)
+    if not m:
+        return None
+    text = m.group(1).decode(encoding or "utf-8", errors="replace")
+    text = " ".join(html.unescape(text).split())
+    return text[:200] or None
+
+
+def _tls_names(response: httpx.Response) -> List[str]:
+    stream = response.extensions.get("network_stream")
+    ssl_obj = stream.get_extra_info("ssl_object") if stream is not None else None
+    if ssl_obj is None:
+        return []
+    names = []
+    cert = ssl_obj.getpeercert()
+    if cert:
+        for field in cert.get("subject", ()):
+            for key, value in field:
+                if key == "commonName":
+                    names.append(value)
+        names += [v for k, v in cert.get("subjectAltName", ()) if k == "DNS"]
+    elif x509 is not None:
+        der = ssl_obj.getpeercert(binary_form=True)
+        if der:
+            try:
+                c = x509.load_der_x509_certificate(der)
+                names += [a.value for a in c.subject.get_attributes_for_oid(x509.NameOID.COMMON_NAME)]
+                san = c.extensions.get_extension_for_class(x509.SubjectAlternativeName)
+                names += san.value.get_values_for_type(x509.DNSName)
+            except Exception:
+                pass
+    return list(dict.fromkeys(names))
+
+
+def _describe(url: str, response: httpx.Response, body: bytes) -> Dict:
+    return {
+        "url": url,
+        "final_url": str(response.url),
+        "status": response.status_code,
+        "http_version": response.http_version,
+        "server": response.headers.get("server"),
+        "title": _extract_title(body, response.encoding) if body else None,
+        "tls_names": _tls_names(response) if response.url.scheme == "https" else [],
+        "redirects": [{"url": str(r.url), "status": r.status_code} for r in response.history],
+    }
+
+
+def _observe(t0: float, outcome, controller: Optional[aimd.AimdController]):
+    elapsed = time.monotonic() - t0
+    metrics.observe_http("probe", elapsed, outcome)
+    if controller is not None:
+        controller.record(elapsed, aimd.http_outcome(outcome) if isinstance(outcome, int) else outcome)
+
+
+async def _probe_url(client: httpx.AsyncClient, url: str, head_first: bool = False,
+                     max_bytes: int = 16384, controller: Optional[aimd.AimdController] = None) -> Optional[Dict]:
+    """Probe one URL; None if nothing answered."""
+    if head_first:
+        t0 = time.monotonic()
+        try:
+            r = await client.head(url, follow_redirects=True)
+            _observe(t0, r.status_code, controller)
+            if r.status_code not in (405, 501):
+                return _describe(url, r, b"")
+        except httpx.TimeoutException:
+            _observe(t0, aimd.TIMEOUT, controller)
+        except (httpx.HTTPError, ssl.SSLError, OSError):
+            _observe(t0, aimd.ERROR, controller)
+    t0 = time.monotonic()
+    try:
+        async with client.stream("GET", url, follow_redirects=True) as r:
+            body = bytearray()
+            async for chunk in r.aiter_bytes():
+                body += chunk
+                if len(body) >= max_bytes:
+                    break
+            _observe(t0, r.status_code, controller)
+            return _describe(url, r, bytes(body[:max_bytes]))
+    except httpx.TimeoutException:
+        _observe(t0, aimd.TIMEOUT, controller)
+        return None
+    except (httpx.HTTPError, ssl.SSLError, OSError):
+        _observe(t0, aimd.ERROR, controller)
+        return None
+
+
+class HttpProber:
+    """
+    Probe many hosts concurrently over one pooled client.
+
+    concurrency: max hosts probed at once (global)
+    per_host: max concurrent connections per host (both schemes share it)
+    mode: "race" or "both" (see module docstring)
+    adaptive: AimdController setting the number of hosts in flight instead of
+              `concurrency` (fed with every request's latency and outcome)
+    """
+
+    def __init__(self, concurrency: int = 100, per_host: int = 2, mode: str = "race",
+                 head_first: bool = False, max_bytes: int = 16384,
+                 timeout: float = None, cache: Optional[ResultCache] = None,
+                 adaptive: Optional[aimd.AimdController] = None):
+        if mode not in MODES:
+            raise ValueError(f"unknown probe mode {mode!r}, expected one of {MODES}")
+        self.concurrency = max(1, concurrency)
+        self.per_host = max(1, per_host)
+        self.mode = mode
+        self.head_first = head_first
+        self.max_bytes = max_bytes
+        self.timeout = timeout or config.HTTP_TIMEOUT
+        self.cache = cache
+        self.adaptive = adaptive
+
+    def _client(self) -> httpx.AsyncClient:
+        limit = self.adaptive.max_limit if self.adaptive is not None else self.concurrency
+        return async_http_client(limit, self.timeout)
+
+    async def _probe_scheme(self, client, host_sem, host: str, scheme: str) -> Optional[Dict]:
+        async with host_sem:
+            res = await _probe_url(client, f"{scheme}://{host}", self.head_first, self.max_bytes, self.adaptive)
+        if self.cache is not None:
+            self.cache.put_probe(host, scheme, res is not None, res)
+        return res
+
+    async def probe(self, client, host_sems, host: str) -> Dict:
+        result = {"host": host, "live": False, "scheme": None, "cached": False}
+        schemes = list(SCHEMES)
+        if self.cache is not None:
+            for scheme in SCHEMES:
+                cached = self.cache.get_probe(host, scheme)
+                if cached is MISS:
+                    continue
+                if cached:
+                    # entries kept without a record (is_live_http) only say the host is live
+                    if isinstance(cached, dict):
+                        result.update(cached)
+                    result.update(live=True, scheme=scheme, cached=True)
+                    return result
+                schemes.remove(scheme)
+        if not schemes:
+            return result
+
+        tasks = [asyncio.create_task(self._probe_scheme(client, host_sems[host], host, s)) for s in schemes]
+        hits = {}
+        try:
+            if self.mode == "race":
+                for fut in asyncio.as_completed(tasks):
+                    res = await fut
+                    if res is not None:
+                        hits[res["url"].split(":", 1)[0]] = res
+                        break
+            else:
+                for res in await asyncio.gather(*tasks):
+                    if res is not None:
+                        hits[res["url"].split(":", 1)[0]] = res
+        finally:
+            for t in tasks:
+                t.cancel()
+        for scheme in SCHEMES:
+            if scheme in hits:
+                result.update(hits[scheme], live=True, scheme=scheme)
+                if self.mode == "both" and len(hits) > 1:
+                    result["other"] = {k: v for k, v in hits.items() if k != scheme}
+                break
+        return result
+
+    async def run(self, hosts: Iterable[str], emit, stop=None):
+        """
+        Probe every host from a (possibly blocking/lazy) iterable, awaiting
+        emit(result) for each. Feeding stops early once `stop` is set.
+        """
+        host_sems = defaultdict(lambda: asyncio.Semaphore(self.per_host))
+        slots = aimd.AsyncLimiter(self.adaptive) if self.adaptive is not None else asyncio.Semaphore(self.concurrency)
+        pending = set()
+
+        async def one(host):
+            try:
+                await emit(await self.probe(client, host_sems, host))
+            finally:
+                host_sems.pop(host, None)
+                slots.release()
+
+        async with self._client() as client:
+            async for host in aiter_sync(hosts):
+                if stop is not None and stop.is_set():
+                    break
+                await slots.acquire()
+                t = asyncio.create_task(one(host))
+                pending.add(t)
+                t.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending)
+
+
+def iter_probe(hosts: Iterable[str], **opts) -> Iterator[Dict]:
+    """
+    Probe hosts and yield one result dict per host as soon as it is done.
+    `hosts` may be a lazy iterator; probing starts with the first host.
+    Options are HttpProber's.
+    """
+    prober = HttpProber(**opts)
+
+    def produce(emit, stop):
+        return prober.run(hosts, emit, stop)
+
+    return iter_from_async(produce, name="http-probe")
+
+
+def probe_hosts(hosts: Iterable[str], **opts) -> List[Dict]:
+    return list(iter_probe(hosts, **opts))
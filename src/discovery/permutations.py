@@ -0,0 +1,245 @@
+# src/discovery/permutations.py
+"""
+Permutation and recursive subdomain generation.
+
+Hits of a bruteforce (bruteforce_subdomains / iter_subdomains) seed rounds
+of generated candidates, resolved through the same iter_subdomains machinery
+(resolver pool, cache, wildcard filter, adaptive limits). The hits of each
+round seed the next one, until a round finds nothing new or `rounds` is
+reached.
+
+Candidates are derived from the leftmost label of each hit and produced in
+priority tiers, so the likeliest names are queried first and a per-round
+`max_candidates` cap only cuts off the long tail:
+
+  1. numbers   staging2 -> staging1/staging3, api -> api1/api2
+  2. env swap  api-dev -> api-staging, dev-api; part swap a-b -> b-a
+  3. dashes    api -> api-dev, dev-api
+  4. concat    api -> apidev, devapi
+  5. levels    api -> dev.api
+  6. recurse   (recurse=True) word.hit for hits that are not wildcard zones
+
+Every name already queried or generated goes through a Bloom filter
+(utils.bloom), so the stream is de-duplicated without keeping the names in
+a set. Per-round yield is kept in `rounds`.
+"""
+import re
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from discovery.resolver_pool import ResolverPool
+from discovery.subdomains import DEFAULT_RESOLVERS, iter_subdomains, make_wildcard_filter
+from discovery.wildcard import WildcardFilter
+from utils.bloom import BloomFilter
+
+# environment/role words most often found around existing names
+ENV_WORDS = ("dev", "staging", "stage", "stg", "test", "qa", "uat", "prod", "preprod", "int",
+             "internal", "api", "admin", "beta", "old", "new", "v1", "v2", "demo", "sandbox")
+
+# labels tried under every discovered subzone with recurse=True
+RECURSE_WORDS = ("www", "api", "admin", "internal", "dev", "staging", "test", "app", "portal",
+                 "vpn", "mail", "static", "cdn", "auth", "login", "m")
+
+TIERS = ("numbers", "env-swap", "dashes", "concat", "levels", "recurse")
+
+_LABEL_RE = re.compile(r"^[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?$")
+_NUM_RE = re.compile(r"^(.*?)(\d+)$")
+
+
+def _valid(label: str) -> bool:
+    return bool(_LABEL_RE.match(label))
+
+
+def _numbers(label: str) -> Iterator[str]:
+    m = _NUM_RE.match(label)
+    if m:
+        stem, num = m.group(1), m.group(2)
+        n = int(num)
+        for v in (n + 1, n - 1, n + 2, n + 3):
+            if v >= 0:
+                yield f"{stem}{v:0{len(num)}d}"
+        if stem:
+            yield stem.rstrip("-")
+    else:
+        for suffix in ("1", "2", "-1", "-2", "01", "02", "3"):
+            yield label + suffix
+
+
+def _env_swap(label: str, words: Iterable[str]) -> Iterator[str]:
+    parts = label.split("-")
+    if len(parts) < 2:
+        return
+    yield "-".join(reversed(parts))
+    for i, part in enumerate(parts):
+        if part in words:
+            for w in words:
+                if w != part:
+                    yield "-".join(parts[:i] + [w] + parts[i + 1:])
+
+
+def _dashes(label: str, words: Iterable[str]) -> Iterator[str]:
+    for w in words:
+        if w != label:
+            yield f"{label}-{w}"
+            yield f"{w}-{label}"
+
+
+def _concat(label: str, words: Iterable[str]) -> Iterator[str]:
+    for w in words:
+        if w != label:
+            yield f"{label}{w}"
+            yield f"{w}{label}"
+
+
+def _levels(label: str, words: Iterable[str]) -> Iterator[str]:
+    for w in words:
+        if w != label:
+            yield f"{w}.{label}"
+
+
+class PermutationEngine:
+    """
+    domain: apex the hits belong to
+    words: environment/role words used by the mutations
+    rounds: generation rounds after the seeds (each seeded by the previous round's hits)
+    recurse: also bruteforce `recurse_words` under every hit that is not a wildcard zone
+    max_depth: most labels a generated name may have below the apex
+    max_candidates: cap per round (lowest-priority tiers are cut first)
+    capacity / error_rate: Bloom filter sizing (names queried over the whole run)
+    """
+
+    def __init__(self, domain: str, words: Iterable[str] = ENV_WORDS, rounds: int = 2,
+                 recurse: bool = False, recurse_words: Iterable[str] = RECURSE_WORDS,
+                 max_depth: int = 3, max_candidates: int = 500_000,
+                 capacity: int = 10_000_000, error_rate: float = 0.001):
+        self.domain = domain.rstrip(".").lower()
+        self.words = tuple(dict.fromkeys(w.lower() for w in words))
+        self.max_rounds = rounds
+        self.recurse = recurse
+        self.recurse_words = tuple(dict.fromkeys(w.lower() for w in recurse_words))
+        self.max_depth = max_depth
+        self.max_candidates = max_candidates
+        self.seen = BloomFilter(capacity, error_rate)
+        self.rounds: List[Dict] = []
+        self._suffix = "." + self.domain
+
+    def _relative(self, fqdn: str) -> Optional[str]:
+        fqdn = fqdn.rstrip(".").lower()
+        return fqdn[:-len(self._suffix)] if fqdn.endswith(self._suffix) else None
+
+    def mark_seen(self, names: Iterable[str]) -> int:
+        """Record already queried names (fqdns) so they are not generated again."""
+        n = 0
+        for name in names:
+            n += self.seen.add(name.rstrip(".").lower())
+        return n
+
+    def track(self, words: Iterable[str]) -> Iterator[str]:
+        """Pass a bruteforce wordlist through, marking each queried name as seen (lazy)."""
+        add = self.seen.add
+        for w in words:
+            add(f"{w}.{self.domain}".lower())
+            yield w
+
+    def _tier(self, tier: str, rel: str) -> Iterator[str]:
+        label, _, rest = rel.partition(".")
+        if tier == "recurse":
+            for w in self.recurse_words:
+                yield f"{w}.{rel}"
+            return
+        if tier == "numbers":
+            mutated = _numbers(label)
+        elif tier == "env-swap":
+            mutated = _env_swap(label, self.words)
+        elif tier == "dashes":
+            mutated = _dashes(label, self.words)
+        elif tier == "concat":
+            mutated = _concat(label, self.words)
+        else:
+            mutated = _levels(label, self.words)
+        for m in mutated:
+            yield f"{m}.{rest}" if rest else m
+
+    def candidates(self, hits: Iterable[str], wildcard: Optional[Callable[[str], bool]] = None,
+                   stats: Optional[Dict] = None) -> Iterator[str]:
+        """
+        New candidate names (relative to the domain) derived from `hits`, in
+        priority order, each at most once over the engine's life. `wildcard`
+        (fqdn -> bool) keeps the recurse tier out of wildcard zones.
+        """
+        seeds = [r for r in (self._relative(h) for h in hits) if r]
+        tiers = TIERS if self.recurse else TIERS[:-1]
+        produced = 0
+        for tier in tiers:
+            for rel in seeds:
+                if tier == "recurse" and wildcard is not None and wildcard(f"{rel}.{self.domain}"):
+                    continue
+                for cand in self._tier(tier, rel):
+                    if cand.count(".") + 1 > self.max_depth or not all(_valid(p) for p in cand.split(".")):
+                        continue
+                    if not self.seen.add(f"{cand}.{self.domain}"):
+                        continue
+                    if stats is not None:
+                        stats["candidates"] += 1
+                        stats["by_tier"][tier] = stats["by_tier"].get(tier, 0) + 1
+                    yield cand
+                    produced += 1
+                    if produced >= self.max_candidates:
+                        if stats is not None:
+                            stats["capped"] = True
+                        return
+
+    def iter_resolve(self, seeds: Iterable[str], on_round: Optional[Callable[[Dict], None]] = None,
+                     pool: Optional[ResolverPool] = None, nameservers: Optional[List[str]] = None,
+                     retries: int = 1, timeout: float = 3.0,
+                     wildcard_filter: Optional[WildcardFilter] = None,
+                     **dns_opts) -> Iterator[Tuple[str, List[str]]]:
+        """
+        Resolve generated candidates round by round, yielding (fqdn, ips) for
+        every new hit as soon as it resolves. `seeds` are the hits to start
+        from (fqdns); the rest is passed to iter_subdomains (workers, engine,
+        rate, cache, adaptive). Pass the bruteforce's `pool` and
+        `wildcard_filter` so the zones it fingerprinted are not queried again
+        and both passes drop the same wildcard answers. `on_round` gets each
+        round's stats when the round is done.
+        """
+        pool = pool or ResolverPool(nameservers or DEFAULT_RESOLVERS, retries=retries)
+        wf = wildcard_filter or make_wildcard_filter(self.domain, pool, timeout)
+        seeds = [s.rstrip(".").lower() for s in seeds]
+        self.mark_seen(seeds)
+
+        def is_wildcard(zone: str) -> bool:
+            return wf.analyze(zone).is_wildcard
+
+        for n in range(1, self.max_rounds + 1):
+            if not seeds:
+                break
+            stats = {"round": n, "seeds": len(seeds), "candidates": 0, "by_tier": {}, "hits": 0,
+                     "capped": False}
+            t0 = time.monotonic()
+            found = []
+            cands = self.candidates(seeds, wildcard=is_wildcard, stats=stats)
+            for fqdn, ips in iter_subdomains(self.domain, cands, pool=pool, timeout=timeout,
+                                             wildcard_filter=wf, **dns_opts):
+                found.append(fqdn)
+                yield fqdn, ips
+            stats["hits"] = len(found)
+            stats["yield"] = round(len(found) / stats["candidates"], 5) if stats["candidates"] else 0.0
+            stats["seconds"] = round(time.monotonic() - t0, 3)
+            stats["bloom_items"] = len(self.seen)
+            stats["bloom_error_rate"] = round(self.seen.current_error_rate(), 6)
+            self.rounds.append(stats)
+            if on_round is not None:
+                on_round(stats)
+            seeds = found
+
+
+def permute_subdomains(domain: str, found: Dict[str, List[str]], **opts) -> Dict[str, List[str]]:
+    """
+    New hits generated from the results of bruteforce_subdomains. `opts` go
+    to PermutationEngine (words, rounds, recurse, ...) and its iter_resolve.
+    """
+    engine_opts = {k: opts.pop(k) for k in ("words", "rounds", "recurse", "recurse_words", "max_depth",
+                                             "max_candidates", "capacity", "error_rate") if k in opts}
+    engine = PermutationEngine(domain, **engine_opts)
+    return dict(engine.iter_resolve(found, **opts))
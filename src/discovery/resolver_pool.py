@@ -0,0 +1,218 @@
+# src/discovery/resolver_pool.py
+"""
+Health-scored pool of DNS resolvers.
+
+Every query goes to a single nameserver picked with "power of two choices":
+two random non-quarantined resolvers are sampled and the one with the better
+score (latency EWMA inflated by failure rate) wins. That keeps picking O(1)
+even with thousands of resolvers while steering traffic toward healthy ones.
+Resolvers that fail repeatedly are quarantined with exponential backoff.
+"""
+import ipaddress
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import dns.exception
+import dns.resolver
+
+from utils import adaptive, metrics
+from utils.streams import iter_wordlist
+
+# outcomes that mean "the resolver answered" (even if the name does not exist)
+HEALTHY = ("ok", "nxdomain")
+
+# how query outcomes count for an adaptive concurrency controller (SERVFAIL/REFUSED
+# from public resolvers is usually rate limiting)
+_CONTROL = {"ok": adaptive.OK, "nxdomain": adaptive.OK, "timeout": adaptive.TIMEOUT,
+            "servfail": adaptive.THROTTLED, "error": adaptive.ERROR}
+
+
+class Upstream:
+    """One nameserver and its running health statistics."""
+
+    def __init__(self, nameserver: str, prior_latency: float = 0.1):
+        self.nameserver = nameserver
+        self.queries = 0
+        self.answers = 0
+        self.nxdomain = 0
+        self.timeouts = 0
+        self.servfails = 0
+        self.errors = 0
+        self.latency = prior_latency      # EWMA seconds
+        self.fail_rate = 0.0              # EWMA of timeout/servfail/error
+        self.consecutive_failures = 0
+        self.quarantines = 0
+        self.quarantined_until = 0.0
+        self._resolver: Optional[dns.resolver.Resolver] = None
+
+    @property
+    def resolver(self) -> dns.resolver.Resolver:
+        if self._resolver is None:
+            r = dns.resolver.Resolver(configure=False)
+            r.nameservers = [self.nameserver]
+            self._resolver = r
+        return self._resolver
+
+    def score(self) -> float:
+        """Lower is better."""
+        return self.latency * (1.0 + 10.0 * self.fail_rate)
+
+    def as_dict(self) -> Dict:
+        return {
+            "resolver": self.nameserver,
+            "queries": self.queries,
+            "answers": self.answers,
+            "nxdomain": self.nxdomain,
+            "timeouts": self.timeouts,
+            "servfails": self.servfails,
+            "errors": self.errors,
+            "avg_latency_ms": round(self.latency * 1000, 1),
+            "fail_rate": round(self.fail_rate, 3),
+            "quarantines": self.quarantines,
+            "quarantined": self.quarantined_until > time.monotonic(),
+        }
+
+
+class ResolverPool:
+    """
+    Pool of single-nameserver resolvers with health tracking.
+
+    `resolve()` mirrors dns.resolver.Resolver.resolve, so the pool can be used
+    anywhere a resolver is expected. Timeouts and SERVFAIL are retried on a
+    different resolver up to `retries` times. Set `controller` to an
+    AimdController to feed it every query's latency and outcome.
+    """
+
+    def __init__(self, nameservers: List[str], retries: int = 1, quarantine_after: int = 5,
+                 base_backoff: float = 10.0, max_backoff: float = 600.0, alpha: float = 0.2):
+        if not nameservers:
+            raise ValueError("ResolverPool needs at least one nameserver")
+        self.upstreams = [Upstream(ns) for ns in dict.fromkeys(nameservers)]
+        self.retries = retries
+        self.quarantine_after = quarantine_after
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.alpha = alpha
+        self.controller: Optional[adaptive.AimdController] = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.upstreams)
+
+    @property
+    def nameservers(self) -> List[str]:
+        return [u.nameserver for u in self.upstreams]
+
+    def _available(self, up: Upstream, now: float) -> bool:
+        return up.quarantined_until <= now
+
+    def pick(self, exclude: Optional[Upstream] = None) -> Upstream:
+        ups = self.upstreams
+        if len(ups) == 1:
+            return ups[0]
+        now = time.monotonic()
+        candidates = []
+        # a few samples are enough to find two usable resolvers unless most are quarantined
+        for _ in range(8):
+            up = ups[random.randrange(len(ups))]
+            if up is not exclude and self._available(up, now):
+                candidates.append(up)
+                if len(candidates) == 2:
+                    break
+        if not candidates:
+            usable = [u for u in ups if self._available(u, now) and u is not exclude]
+            if usable:
+                candidates = random.sample(usable, min(2, len(usable)))
+            else:
+                # everything is quarantined: use the one released soonest
+                return min(ups, key=lambda u: u.quarantined_until)
+        return min(candidates, key=Upstream.score)
+
+    def record(self, up: Upstream, outcome: str, latency: float):
+        metrics.observe("dns_query_seconds", latency)
+        metrics.inc("dns_queries_total", outcome=outcome)
+        if self.controller is not None:
+            self.controller.record(latency, _CONTROL.get(outcome, adaptive.ERROR))
+        a = self.alpha
+        with self._lock:
+            up.queries += 1
+            failed = outcome not in HEALTHY
+            if outcome == "ok":
+                up.answers += 1
+            elif outcome == "nxdomain":
+                up.nxdomain += 1
+            elif outcome == "timeout":
+                up.timeouts += 1
+            elif outcome == "servfail":
+                up.servfails += 1
+            else:
+                up.errors += 1
+            up.latency = (1 - a) * up.latency + a * latency
+            up.fail_rate = (1 - a) * up.fail_rate + a * (1.0 if failed else 0.0)
+            if not failed:
+                up.consecutive_failures = 0
+                return
+            now = time.monotonic()
+            if up.quarantined_until > now:
+                # late failures from queries sent before the quarantine started
+                return
+            up.consecutive_failures += 1
+            if up.consecutive_failures >= self.quarantine_after:
+                backoff = min(self.max_backoff, self.base_backoff * (2 ** up.quarantines))
+                up.quarantines += 1
+                up.consecutive_failures = 0
+                up.quarantined_until = now + backoff
+
+    def resolve(self, qname: str, rdtype: str = "A", lifetime: float = 3.0):
+        last_exc: Optional[Exception] = None
+        up = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                metrics.inc("dns_retries_total")
+            up = self.pick(exclude=up)
+            t0 = time.monotonic()
+            try:
+                ans = up.resolver.resolve(qname, rdtype, lifetime=lifetime)
+            except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+                self.record(up, "nxdomain", time.monotonic() - t0)
+                raise
+            except dns.exception.Timeout as e:
+                self.record(up, "timeout", time.monotonic() - t0)
+                last_exc = e
+                continue
+            except dns.resolver.NoNameservers as e:
+                # single-nameserver resolver: SERVFAIL/REFUSED from that server
+                self.record(up, "servfail", time.monotonic() - t0)
+                last_exc = e
+                continue
+            except dns.exception.DNSException:
+                self.record(up, "error", time.monotonic() - t0)
+                raise
+            self.record(up, "ok", time.monotonic() - t0)
+            return ans
+        raise last_exc
+
+    def report(self) -> List[Dict]:
+        """Per-resolver stats, most used first."""
+        with self._lock:
+            rows = [u.as_dict() for u in self.upstreams]
+        return sorted(rows, key=lambda r: r["queries"], reverse=True)
+
+
+def load_resolvers(path: Path) -> List[str]:
+    """
+    Read resolver IPs from a file (one per line, #comments allowed, .gz ok).
+    Invalid entries are skipped and duplicates removed, order preserved.
+    """
+    out = {}
+    for entry in iter_wordlist(path):
+        ip = entry.split()[0]
+        try:
+            ipaddress.ip_address(ip)
+        except ValueError:
+            continue
+        out[ip] = None
+    return list(out)
@@ -1,82 +1,145 @@
 # src/discovery/subdomains.py
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Dict, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 import dns.resolver
 import dns.exception
-import random
-import time
-import sys
+import logging
+
+from discovery.resolver_pool import ResolverPool
+from discovery.wildcard import DnsAnswer, WildcardFilter, answer_from, fingerprint_zone
+from utils import metrics
+from utils.adaptive import AimdController, ThreadLimiter
+from utils.cache import MISS, ResultCache
+from utils.streams import imap_bounded
+
+logger = logging.getLogger("husk")
 
 # Configurable resolvers: public resolvers reduce false negatives
 DEFAULT_RESOLVERS = ["8.8.8.8", "1.1.1.1"]  # Google, Cloudflare
 
-def _get_resolver(nameservers: Optional[List[str]] = None) -> dns.resolver.Resolver:
-    r = dns.resolver.Resolver()
-    if nameservers:
-        r.nameservers = nameservers
-    return r
+# anything with dns.resolver.Resolver's resolve() signature
+ResolverLike = Union[dns.resolver.Resolver, ResolverPool]
+
+def _get_resolver(nameservers: Optional[List[str]] = None, retries: int = 1) -> ResolverPool:
+    return ResolverPool(nameservers or DEFAULT_RESOLVERS, retries=retries)
 
-def _resolve_a(host: str, resolver: dns.resolver.Resolver, lifetime: float = 3.0) -> List[str]:
+def make_wildcard_filter(domain: str, resolver: ResolverLike, timeout: float = 3.0) -> WildcardFilter:
+    """WildcardFilter fingerprinting zones through `resolver`; share one across passes over a domain."""
+    return WildcardFilter(domain, lambda h: _resolve(h, resolver, timeout))
+
+def _resolve(host: str, resolver: ResolverLike, lifetime: float = 3.0,
+             cache: Optional[ResultCache] = None) -> Optional[DnsAnswer]:
+    if cache is not None:
+        cached = cache.get_dns(host)
+        if cached is not MISS:
+            return DnsAnswer(*cached) if cached else None
     try:
-        ans = resolver.resolve(host, "A", lifetime=lifetime)
-        return [r.to_text() for r in ans]
+        ans = answer_from(resolver.resolve(host, "A", lifetime=lifetime), host)
+    except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+        if cache is not None:
+            cache.put_dns(host, None)
+        return None
     except dns.exception.DNSException:
-        return []
+        # timeouts/SERVFAIL are not cached
+        return None
+    if cache is not None:
+        cache.put_dns(host, ans.ips, ans.cname, ans.ttl)
+    return ans
+
+def _resolve_a(host: str, resolver: ResolverLike, lifetime: float = 3.0) -> List[str]:
+    ans = _resolve(host, resolver, lifetime)
+    return list(ans.ips) if ans else []
 
-def detect_wildcard(domain: str, resolver: dns.resolver.Resolver) -> bool:
+def detect_wildcard(domain: str, resolver: ResolverLike) -> bool:
     """Return True if wildcard A records seem present for domain."""
-    # try a few random labels; if they all resolve to the same IPs, it's likely wildcard
-    tries = []
-    for _ in range(3):
-        rnd = f"w{int(time.time()*1000)%100000}-{random.randint(1000,9999)}"
-        fqdn = f"{rnd}.{domain}"
-        ips = _resolve_a(fqdn, resolver)
+    return fingerprint_zone(domain, lambda h: _resolve(h, resolver)).is_wildcard
+
+ENGINES = ("thread", "async")
+
+def iter_subdomains(domain: str, wordlist: Iterable[str], workers: int = 40,
+                    nameservers: Optional[List[str]] = None, engine: str = "thread",
+                    rate: Optional[float] = None, timeout: float = 3.0,
+                    retries: int = 1, pool: Optional[ResolverPool] = None,
+                    wildcard_filter: Optional[WildcardFilter] = None,
+                    cache: Optional[ResultCache] = None,
+                    adaptive: Optional[AimdController] = None) -> Iterator[Tuple[str, List[str]]]:
+    """
+    Bruteforce subdomains by DNS A record resolution, yielding (fqdn, [ip, ...])
+    as soon as each hit resolves. `wordlist` may be any (lazy) iterable; only a
+    bounded window of queries is pending at a time.
+
+    engine="thread" uses a blocking resolver on a thread pool; engine="async"
+    uses dns.asyncresolver with `workers` as the in-flight query window,
+    `rate` as a per-resolver qps limit and `timeout`/`retries` per query.
+
+    Queries are spread over a health-scored ResolverPool built from
+    `nameservers`; pass `pool` to reuse one and read its stats afterwards.
+    Hits are checked against cached per-zone wildcard fingerprints (see
+    discovery.wildcard); pass `wildcard_filter` to read its counts afterwards.
+    With `cache`, fresh cached answers (positive and negative) skip the query.
+    With `adaptive`, the number of queries in flight follows that controller
+    (fed by the pool) instead of `workers`.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"unknown DNS engine {engine!r}, expected one of {ENGINES}")
+    resolver = pool or _get_resolver(nameservers, retries=retries)
+    if adaptive is not None:
+        resolver.controller = adaptive
+        workers = adaptive.max_limit
+    wf = wildcard_filter or make_wildcard_filter(domain, resolver, timeout)
+
+    # fingerprint the apex up front; intermediate zones are fingerprinted on first hit
+    if wf.analyze(wf.domain).is_wildcard:
+        logger.warning(f"[subdomains] wildcard DNS detected for {domain}. Matching answers will be filtered.")
+
+    if engine == "async":
+        from discovery.async_dns import iter_async_bruteforce
+        hits = iter_async_bruteforce(domain, wordlist, resolver, wf,
+                                     concurrency=workers, rate=rate, timeout=timeout,
+                                     cache=cache, adaptive=adaptive)
+    else:
+        limiter = ThreadLimiter(adaptive) if adaptive is not None else None
+
+        def task(sub):
+            fqdn = f"{sub}.{domain}"
+            if limiter is None:
+                ans = _resolve(fqdn, resolver, lifetime=timeout, cache=cache)
+            else:
+                with limiter.slot():
+                    ans = _resolve(fqdn, resolver, lifetime=timeout, cache=cache)
+            if ans is None or not ans.ips or wf.check(fqdn, ans):
+                return fqdn, []
+            return fqdn, list(ans.ips)
+
+        # threads are only started for the calls the controller lets through
+        hits = imap_bounded(task, wordlist, workers, name="dns",
+                            limit=(lambda: adaptive.limit) if adaptive is not None else None)
+
+    for fqdn, ips in hits:
         if ips:
-            tries.append(tuple(sorted(ips)))
-    # if we got consistent non-empty results, treat as wildcard
-    if len(tries) >= 2 and all(t == tries[0] for t in tries):
-        return True
-    return False
-
-def bruteforce_subdomains(domain: str, wordlist: List[str], workers: int = 40,
-                          nameservers: Optional[List[str]] = None) -> Dict[str, List[str]]:
+            logger.info(f"[subdomains] found: {fqdn} -> {ips}")
+            yield fqdn, ips
+
+    if wf.filtered:
+        s = wf.summary()
+        logger.info(f"[subdomains] wildcard filter: kept {s['kept']}, filtered {s['filtered']} {s['filtered_by_reason']}")
+
+@metrics.timed("bruteforce_subdomains_seconds")
+def bruteforce_subdomains(domain: str, wordlist: Iterable[str], workers: int = 40,
+                          nameservers: Optional[List[str]] = None, engine: str = "thread",
+                          rate: Optional[float] = None, timeout: float = 3.0,
+                          retries: int = 1, pool: Optional[ResolverPool] = None,
+                          wildcard_filter: Optional[WildcardFilter] = None,
+                          cache: Optional[ResultCache] = None,
+                          adaptive: Optional[AimdController] = None) -> Dict[str, List[str]]:
     """
-    Bruteforce subdomains by DNS A record resolution.
+    Bruteforce subdomains by DNS A record resolution (see iter_subdomains).
 
     Returns: dict mapping 'sub.domain' -> [ip, ...]
     """
-    resolver = _get_resolver(nameservers or DEFAULT_RESOLVERS)
-
-    # detect wildcard DNS — if present, we'll try to filter results later
-    wildcard = detect_wildcard(domain, resolver)
-    if wildcard:
-        print(f"[subdomains] Warning: wildcard DNS detected for {domain}. Results may contain false positives.", file=sys.stderr)
-
-    found: Dict[str, List[str]] = {}
-
-    def task(sub):
-        fqdn = f"{sub}.{domain}"
-        ips = _resolve_a(fqdn, resolver)
-        # if wildcard present, we still keep only if different from wildcard sample
-        return fqdn, ips
-
-    with ThreadPoolExecutor(max_workers=workers) as exe:
-        futures = {exe.submit(task, w): w for w in wordlist}
-        for fut in as_completed(futures):
-            fqdn, ips = fut.result()
-            if ips:
-                # if wildcard was detected, do one extra check against a random unseen label
-                if wildcard:
-                    # quick check: resolve a random unlikely name; if equal, skip
-                    rnd = f"random-skip-{random.randint(10000,99999)}.{domain}"
-                    sample = _resolve_a(rnd, resolver)
-                    if sample and sorted(sample) == sorted(ips):
-                        # likely wildcard match — skip
-                        continue
-                # record hit
-                found[fqdn] = ips
-                print(f"[subdomains] found: {fqdn} -> {ips}")
-    return found
+    return dict(iter_subdomains(domain, wordlist, workers=workers, nameservers=nameservers,
+                                engine=engine, rate=rate, timeout=timeout, retries=retries,
+                                pool=pool, wildcard_filter=wildcard_filter, cache=cache,
+                                adaptive=adaptive))
 
 # quick manual test
 if __name__ == "__main__":
@@ -0,0 +1,148 @@
+# src/discovery/wildcard.py
+"""
+Wildcard DNS analysis.
+
+Each zone (the apex domain and every intermediate zone a hit lives in) is
+probed once with a few random labels. The answers are folded into a
+fingerprint -- the set of wildcard IPs (round-robin pools included), CNAME
+targets and the largest TTL seen -- which is cached, so filtering a hit is a
+couple of set lookups and never costs another query.
+"""
+import random
+import string
+import threading
+from typing import Callable, Dict, FrozenSet, NamedTuple, Optional, Tuple
+
+
+class DnsAnswer(NamedTuple):
+    ips: Tuple[str, ...]
+    cname: Optional[str]  # final canonical name if the answer went through a CNAME chain
+    ttl: int
+
+
+def answer_from(ans, qname: str) -> DnsAnswer:
+    """Build a DnsAnswer from a dns.resolver.Answer."""
+    canonical = ans.canonical_name.to_text().rstrip(".")
+    cname = canonical if canonical.lower() != qname.rstrip(".").lower() else None
+    return DnsAnswer(tuple(sorted(r.to_text() for r in ans)), cname, ans.rrset.ttl)
+
+
+def _random_label(n: int = 12) -> str:
+    return "".join(random.choices(string.ascii_lowercase + string.digits, k=n))
+
+
+class WildcardFingerprint:
+    """What a wildcard answer under `zone` looks like."""
+
+    def __init__(self, zone: str, answers):
+        self.zone = zone
+        self.samples = len(answers)
+        self.ips: FrozenSet[str] = frozenset(ip for a in answers for ip in a.ips)
+        self.cnames: FrozenSet[str] = frozenset(a.cname.lower() for a in answers if a.cname)
+        self.max_ttl = max((a.ttl for a in answers), default=0)
+
+    @property
+    def is_wildcard(self) -> bool:
+        return self.samples > 0
+
+    def match(self, answer: DnsAnswer) -> Optional[str]:
+        """Return the reason `answer` looks like a wildcard answer, else None."""
+        if not self.is_wildcard:
+            return None
+        if answer.cname and answer.cname.lower() in self.cnames:
+            return "wildcard-cname"
+        # IPs inside the wildcard pool, and a TTL no larger than the wildcard's
+        # (cached answers only count down); an explicit record with a longer
+        # TTL on the same IPs is kept.
+        if answer.ips and self.ips.issuperset(answer.ips) and answer.ttl <= self.max_ttl:
+            return "wildcard-ip"
+        return None
+
+    def as_dict(self) -> Dict:
+        return {"zone": self.zone, "samples": self.samples, "ips": sorted(self.ips),
+                "cnames": sorted(self.cnames), "max_ttl": self.max_ttl}
+
+
+def fingerprint_zone(zone: str, resolve: Callable[[str], Optional[DnsAnswer]],
+                     probes: int = 4, patience: int = 6, max_probes: int = 32) -> WildcardFingerprint:
+    """
+    Resolve random labels under zone and fingerprint whatever answers. If the
+    first `probes` labels show a wildcard, probing continues until `patience`
+    consecutive answers reveal no new IP (or `max_probes` is reached), so
+    round-robin pools that hand out a subset per answer are fully captured.
+    """
+    answers = []
+    seen = set()
+    stale = 0
+    for i in range(max_probes):
+        a = resolve(f"{_random_label()}.{zone}")
+        if a is not None and a.ips:
+            answers.append(a)
+            stale = 0 if not seen.issuperset(a.ips) else stale + 1
+            seen.update(a.ips)
+        if i + 1 >= probes and (not answers or stale >= patience):
+            break
+    # a single stray answer is not enough to call it a wildcard
+    if len(answers) < 2:
+        answers = []
+    return WildcardFingerprint(zone, answers)
+
+
+class WildcardFilter:
+    """
+    Per-run cache of zone fingerprints plus hit/filter accounting.
+    `resolve` is a blocking fqdn -> DnsAnswer|None callable used for probing.
+    """
+
+    def __init__(self, domain: str, resolve: Callable[[str], Optional[DnsAnswer]], **probe_opts):
+        self.domain = domain.rstrip(".").lower()
+        self.resolve = resolve
+        self.probe_opts = probe_opts
+        self.fingerprints: Dict[str, WildcardFingerprint] = {}
+        self.kept = 0
+        self.filtered: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._zone_locks: Dict[str, threading.Lock] = {}
+
+    def zone_for(self, fqdn: str) -> str:
+        fqdn = fqdn.rstrip(".").lower()
+        if fqdn == self.domain or "." not in fqdn:
+            return self.domain
+        parent = fqdn.split(".", 1)[1]
+        if parent == self.domain or parent.endswith("." + self.domain):
+            return parent
+        return self.domain
+
+    def needs_analysis(self, fqdn: str) -> bool:
+        return self.zone_for(fqdn) not in self.fingerprints
+
+    def analyze(self, zone: str) -> WildcardFingerprint:
+        """Fingerprint zone once; concurrent callers for the same zone wait for the first."""
+        fp = self.fingerprints.get(zone)
+        if fp is not None:
+            return fp
+        with self._lock:
+            zlock = self._zone_locks.setdefault(zone, threading.Lock())
+        with zlock:
+            fp = self.fingerprints.get(zone)
+            if fp is None:
+                fp = fingerprint_zone(zone, self.resolve, **self.probe_opts)
+                self.fingerprints[zone] = fp
+        return fp
+
+    def check(self, fqdn: str, answer: DnsAnswer) -> Optional[str]:
+        """Return a filter reason for a wildcard hit (and count it), else None."""
+        reason = self.analyze(self.zone_for(fqdn)).match(answer)
+        with self._lock:
+            if reason:
+                self.filtered[reason] = self.filtered.get(reason, 0) + 1
+            else:
+                self.kept += 1
+        return reason
+
+    def wildcard_zones(self):
+        return [fp.as_dict() for fp in self.fingerprints.values() if fp.is_wildcard]
+
+    def summary(self) -> Dict:
+        return {"kept": self.kept, "filtered": sum(self.filtered.values()),
+                "filtered_by_reason": dict(self.filtered), "wildcard_zones": self.wildcard_zones()}
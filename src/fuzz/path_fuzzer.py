@@ -1,25 +1,187 @@
 # src/fuzz/path_fuzzer.py
-from concurrent.futures import ThreadPoolExecutor
-from typing import List, Dict, Optional
+"""
+Async path fuzzer.
+
+Requests run on one pooled httpx client with a bounded number in flight and
+an optional requests/sec cap. Bodies are streamed and hashed/sized
+incrementally up to `max_bytes`, so large pages never sit in memory, and
+redirects are reported (Location) rather than followed unless asked for.
+Hits are yielded as soon as each response is done.
+
+Unless disabled, each host is calibrated first (fuzz.soft404) and responses
+matching its soft-404 baseline are dropped, or reported with the reason when
+report_filtered is set.
+"""
+import asyncio
+import hashlib
+import ssl
+import time
+from typing import Dict, Iterable, Iterator, List, Optional
 from urllib.parse import urljoin
-from utils.helpers import requests_session
+
+import httpx
+
 import config
+from fuzz import soft404
+from fuzz.soft404 import Baseline
+from utils import metrics
+from utils.helpers import async_http_client
+from utils.ratelimit import AsyncTokenBucket
+from utils.streams import iter_from_async
 
-session = requests_session(timeout=config.HTTP_TIMEOUT)
-
-def fuzz_paths(base_url: str, paths: List[str], workers: int = 30) -> List[Dict]:
-    found = []
-    def check(p):
-        url = urljoin(base_url if base_url.endswith("/") else base_url + "/", p)
-        try:
-            r = session.get(url, timeout=config.HTTP_TIMEOUT, allow_redirects=True)
-            if r.status_code != 404 and len(r.content) > 0:
-                return {"url": url, "status": r.status_code, "len": len(r.content)}
-        except Exception:
-            return None
+
+def _join(base_url: str, path: str) -> str:
+    return urljoin(base_url if base_url.endswith("/") else base_url + "/", path)
+
+
+async def fetch_path(client: httpx.AsyncClient, url: str, max_bytes: int = 65536,
+                     follow_redirects: bool = False, sample_bytes: int = 8192) -> Optional[Dict]:
+    """
+    GET url, hashing at most max_bytes of the body; None on network errors.
+    The first sample_bytes of the body are kept under "_sample" and the
+    Retry-After header under "_retry_after" (neither is for output).
+    """
+    t0 = time.monotonic()
+    try:
+        async with client.stream("GET", url, follow_redirects=follow_redirects) as r:
+            digest = hashlib.sha1()
+            size = 0
+            truncated = False
+            sample = bytearray()
+            async for chunk in r.aiter_bytes():
+                chunk = chunk[:max_bytes - size]
+                digest.update(chunk)
+                if len(sample) < sample_bytes:
+                    sample += chunk[:sample_bytes - len(sample)]
+                size += len(chunk)
+                if size >= max_bytes:
+                    truncated = True
+                    break
+            clen = r.headers.get("content-length")
+            metrics.observe_http("fuzz", time.monotonic() - t0, r.status_code)
+            return {
+                "url": url,
+                "status": r.status_code,
+                "len": size,
+                "truncated": truncated,
+                "content_length": int(clen) if clen and clen.isdigit() else None,
+                "sha1": digest.hexdigest(),
+                "location": r.headers.get("location"),
+                "elapsed_ms": round((time.monotonic() - t0) * 1000, 1),
+                "_sample": bytes(sample),
+                "_retry_after": r.headers.get("retry-after"),
+            }
+    except httpx.TimeoutException:
+        metrics.observe_http("fuzz", time.monotonic() - t0, "timeout")
         return None
-    with ThreadPoolExecutor(max_workers=workers) as exe:
-        for res in exe.map(check, paths):
-            if res:
-                found.append(res)
-    return found
+    except (httpx.HTTPError, ssl.SSLError, OSError):
+        metrics.observe_http("fuzz", time.monotonic() - t0, "error")
+        return None
+
+
+def is_hit(res: Optional[Dict]) -> bool:
+    # same rule as before (non-404 with a body), plus redirects now that they are not followed
+    return bool(res) and res["status"] != 404 and (res["len"] > 0 or bool(res["location"]))
+
+
+class PathFuzzer:
+    """
+    concurrency: max requests in flight
+    rate: max requests/sec (None = unlimited)
+    max_bytes: body bytes read/hashed per response
+    follow_redirects: follow 3xx instead of reporting Location
+    calibrate: build a soft-404 baseline per host and drop matching hits
+    report_filtered: emit dropped hits too, tagged with a "soft404" reason
+    """
+
+    def __init__(self, concurrency: int = 50, rate: Optional[float] = None, max_bytes: int = 65536,
+                 follow_redirects: bool = False, timeout: Optional[float] = None,
+                 calibrate: bool = True, report_filtered: bool = False):
+        self.concurrency = max(1, concurrency)
+        self.limiter = AsyncTokenBucket(rate)
+        self.max_bytes = max_bytes
+        self.follow_redirects = follow_redirects
+        self.timeout = timeout or config.HTTP_TIMEOUT
+        self.calibrate = calibrate
+        self.report_filtered = report_filtered
+        self.stats = {"requests": 0, "hits": 0, "soft404": 0}
+
+    async def _fetch(self, client, base_url: str, path: str) -> Optional[Dict]:
+        await self.limiter.acquire()
+        self.stats["requests"] += 1
+        return await fetch_path(client, _join(base_url, path), self.max_bytes, self.follow_redirects)
+
+    async def baseline(self, client, base_url: str, paths: List[str]) -> Optional[Baseline]:
+        if not self.calibrate:
+            return None
+        return await soft404.calibrate(lambda p: self._fetch(client, base_url, p),
+                                       soft404.extension_classes(paths))
+
+    async def check(self, client, base_url: str, path: str, baseline: Optional[Baseline]) -> Optional[Dict]:
+        """Fetch one path; return the output record (hit or tagged soft-404) or None."""
+        return self.classify(path, await self._fetch(client, base_url, path), baseline)
+
+    def classify(self, path: str, res: Optional[Dict], baseline: Optional[Baseline]) -> Optional[Dict]:
+        """Turn a fetch_path result into an output record (see check)."""
+        if not is_hit(res):
+            return None
+        reason = baseline.match(path, res) if baseline is not None else None
+        res.pop("_sample", None)
+        res.pop("_retry_after", None)
+        if reason:
+            self.stats["soft404"] += 1
+            if not self.report_filtered:
+                return None
+            res["soft404"] = reason
+        else:
+            self.stats["hits"] += 1
+        return res
+
+    async def run(self, base_url: str, paths: Iterable[str], emit, stop=None):
+        """Fuzz every path under base_url, awaiting emit(result) for each hit."""
+        paths = list(paths)
+        slots = asyncio.Semaphore(self.concurrency)
+        pending = set()
+
+        async def one(path):
+            try:
+                res = await self.check(client, base_url, path, baseline)
+                if res is not None:
+                    await emit(res)
+            finally:
+                slots.release()
+
+        async with async_http_client(self.concurrency, self.timeout) as client:
+            baseline = await self.baseline(client, base_url, paths)
+            for p in paths:
+                if stop is not None and stop.is_set():
+                    break
+                await slots.acquire()
+                t = asyncio.create_task(one(p))
+                pending.add(t)
+                t.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending)
+
+
+def iter_fuzz(base_url: str, paths: Iterable[str], fuzzer: Optional[PathFuzzer] = None,
+              **opts) -> Iterator[Dict]:
+    """
+    Yield hits for base_url as they arrive. Options are PathFuzzer's; pass a
+    `fuzzer` instead to read its stats afterwards.
+    """
+    fuzzer = fuzzer or PathFuzzer(**opts)
+
+    def produce(emit, stop):
+        return fuzzer.run(base_url, paths, emit, stop)
+
+    return iter_from_async(produce, name="path-fuzz")
+
+
+@metrics.timed("fuzz_paths_seconds")
+def fuzz_paths(base_url: str, paths: List[str], workers: int = 50, **opts) -> List[Dict]:
+    """
+    Fuzz paths on base_url and return all hits (`workers` = requests in flight).
+    With report_filtered=True, soft-404 matches are included with a "soft404" reason.
+    """
+    return list(iter_fuzz(base_url, paths, concurrency=workers, **opts))
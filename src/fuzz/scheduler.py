@@ -0,0 +1,326 @@
+# src/fuzz/scheduler.py
+"""
+Multi-host fuzz scheduler.
+
+Every target gets a feeder that walks the path list; all feeders share one
+pooled client and one global slot semaphore (FIFO), so (host, path) work
+units from different hosts interleave instead of running host after host.
+Each host also has its own concurrency cap and optional requests/sec cap.
+
+A 429/503 pauses only that host (Retry-After, else exponential backoff) and
+the path is retried later. A host that keeps failing at the network level,
+or keeps answering 429/503, is abandoned, and a slow host can never hold more
+than its own `per_host` slots, so neither holds the rest of the job back.
+"""
+import asyncio
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Deque, Dict, Iterable, Iterator, List, Optional
+
+from fuzz import soft404
+from fuzz.path_fuzzer import PathFuzzer
+from utils import adaptive as aimd, metrics
+from utils.helpers import async_http_client
+from utils.ratelimit import AsyncTokenBucket
+from utils.streams import aiter_sync, iter_from_async
+
+BACKOFF_STATUSES = (429, 503)
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class _Host:
+    def __init__(self, base_url: str, per_host: int, rate: Optional[float]):
+        self.base_url = base_url
+        self.slots = asyncio.Semaphore(per_host)
+        self.limiter = AsyncTokenBucket(rate)
+        self.retry: Deque[str] = deque()
+        self.attempts: Dict[str, int] = {}
+        self.inflight = 0
+        self.done = 0
+        self.resume_at = 0.0
+        self.strikes = 0       # consecutive 429/503
+        self.errors = 0        # consecutive network errors
+        self.baseline = None
+        self.dead: Optional[str] = None
+        self.finished = False
+        self.stats = {"requests": 0, "hits": 0, "soft404": 0, "errors": 0, "backoffs": 0, "throttled": 0}
+
+    def summary(self) -> Dict:
+        return dict(self.stats, target=self.base_url, done=self.done, dead=self.dead)
+
+
+class FuzzScheduler:
+    """
+    concurrency: max requests in flight over all hosts
+    per_host: max requests in flight per host
+    per_host_rate: max requests/sec per host (None = unlimited)
+    max_errors: consecutive network errors (or 429/503s) before a host is abandoned
+    max_retries: times a path is retried after a 429/503
+    backoff / max_backoff: first and largest pause (s) when no Retry-After is sent
+    progress: show a live progress bar on stderr
+    adaptive: AimdController setting the global in-flight limit instead of
+              `concurrency` (fed with every request's latency and outcome)
+    Remaining options (rate, max_bytes, calibrate, ...) are PathFuzzer's.
+    """
+
+    def __init__(self, concurrency: int = 200, per_host: int = 10, per_host_rate: Optional[float] = None,
+                 max_errors: int = 20, max_retries: int = 3, backoff: float = 2.0,
+                 max_backoff: float = 120.0, progress: bool = False,
+                 fuzzer: Optional[PathFuzzer] = None, adaptive: Optional[aimd.AimdController] = None,
+                 **fuzzer_opts):
+        self.concurrency = max(1, concurrency)
+        self.per_host = max(1, per_host)
+        self.per_host_rate = per_host_rate
+        self.max_errors = max(1, max_errors)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.progress = progress
+        self.adaptive = adaptive
+        self.fuzzer = fuzzer or PathFuzzer(**fuzzer_opts)
+        self.hosts: List[_Host] = []
+        self.started = None
+        self.elapsed = 0.0
+
+    @property
+    def stats(self) -> Dict:
+        elapsed = self.elapsed or (time.monotonic() - self.started if self.started else 0.0)
+        st = dict(self.fuzzer.stats)
+        st.update(hosts=len(self.hosts), dead=sum(1 for h in self.hosts if h.dead),
+                  elapsed=round(elapsed, 2),
+                  rps=round(st["requests"] / elapsed, 1) if elapsed else 0.0)
+        return st
+
+    def host_summaries(self) -> List[Dict]:
+        return [h.summary() for h in self.hosts]
+
+    async def _fetch(self, client, host: _Host, path: str) -> Optional[Dict]:
+        await host.limiter.acquire()
+        host.stats["requests"] += 1
+        if self.adaptive is None:
+            return await self.fuzzer._fetch(client, host.base_url, path)
+        t0 = time.monotonic()
+        res = await self.fuzzer._fetch(client, host.base_url, path)
+        self.adaptive.record(time.monotonic() - t0, aimd.http_outcome(res["status"] if res else None))
+        return res
+
+    async def _calibration_fetch(self, client, host: _Host, path: str) -> Optional[Dict]:
+        # calibration requests count against the same per-host and global caps as fuzzing
+        async with host.slots:
+            await self._slots.acquire()
+            try:
+                return await self._fetch(client, host, path)
+            finally:
+                self._slots.release()
+
+    def _backoff(self, host: _Host, path: str, res: Dict) -> bool:
+        """Pause the host after a 429/503; True if the path was queued for a retry."""
+        now = time.monotonic()
+        # late answers to requests sent before the current pause do not escalate it
+        if now >= host.resume_at:
+            host.strikes += 1
+            host.stats["backoffs"] += 1
+            metrics.inc("fuzz_backoffs_total")
+            delay = _retry_after(res.get("_retry_after"))
+            if delay is None:
+                delay = self.backoff * 2 ** (host.strikes - 1)
+            host.resume_at = now + min(delay, self.max_backoff)
+            if host.strikes >= self.max_errors:
+                host.dead = f"{host.strikes} consecutive {res['status']} responses"
+                metrics.inc("fuzz_dead_hosts_total")
+        attempts = host.attempts.get(path, 0) + 1
+        if attempts > self.max_retries or host.dead:
+            host.attempts.pop(path, None)
+            return False
+        host.attempts[path] = attempts
+        host.retry.append(path)
+        metrics.inc("fuzz_retries_total")
+        return True
+
+    async def _unit(self, client, host: _Host, path: str, emit, bar):
+        finished = True
+        try:
+            res = await self._fetch(client, host, path)
+            if res is None:
+                host.errors += 1
+                host.stats["errors"] += 1
+                if host.errors >= self.max_errors and not host.dead:
+                    host.dead = f"{host.errors} consecutive network errors"
+                return
+            host.errors = 0
+            if res["status"] in BACKOFF_STATUSES:
+                if self._backoff(host, path, res):
+                    finished = False
+                else:
+                    # retries used up (or host abandoned): a throttle answer is never a finding
+                    host.stats["throttled"] += 1
+                    metrics.inc("fuzz_throttled_paths_total")
+                return
+            host.strikes = 0
+            host.attempts.pop(path, None)
+            out = self.fuzzer.classify(path, res, host.baseline)
+            if out is not None:
+                host.stats["soft404" if "soft404" in out else "hits"] += 1
+                out["target"] = host.base_url
+                await emit(out)
+        finally:
+            if finished:
+                host.done += 1
+                if bar is not None:
+                    bar.advance()
+            host.inflight -= 1
+            host.slots.release()
+            self._slots.release()
+
+    async def _feed(self, client, host: _Host, paths: List[str], emit, stop, spawn, bar):
+        try:
+            if self.fuzzer.calibrate:
+                host.baseline = await soft404.calibrate(lambda p: self._calibration_fetch(client, host, p),
+                                                        soft404.extension_classes(paths))
+                if not host.baseline.samples:
+                    host.dead = "no answer during calibration"
+            todo = iter(paths)
+            while not host.dead and not (stop is not None and stop.is_set()):
+                path = host.retry.popleft() if host.retry else next(todo, None)
+                if path is None:
+                    if not host.inflight:
+                        break
+                    # paths exhausted: wait for in-flight units, they may queue retries
+                    await asyncio.sleep(0.05)
+                    continue
+                await host.slots.acquire()
+                wait = host.resume_at - time.monotonic()
+                while wait > 0:
+                    await asyncio.sleep(wait)
+                    wait = host.resume_at - time.monotonic()
+                await self._slots.acquire()
+                host.inflight += 1
+                spawn(self._unit(client, host, path, emit, bar))
+        except Exception as e:  # one broken host must not take the others down
+            host.dead = f"error: {e}"
+        finally:
+            host.finished = True
+            if host.dead and bar is not None:
+                bar.advance(len(paths) - host.done - host.inflight)
+
+    async def run(self, targets: Iterable[str], paths: Iterable[str], emit, stop=None):
+        """
+        Fuzz every path on every target, awaiting emit(result) for each hit.
+        `targets` may be a lazy iterator; each host starts as soon as it arrives.
+        """
+        paths = list(paths)
+        self.hosts = []
+        if self.adaptive is not None:
+            self._slots = aimd.AsyncLimiter(self.adaptive)
+        else:
+            self._slots = asyncio.Semaphore(self.concurrency)
+        self.started = time.monotonic()
+        pending = set()
+
+        def spawn(coro):
+            t = asyncio.create_task(coro)
+            pending.add(t)
+            t.add_done_callback(pending.discard)
+
+        bar = _Progress(self) if self.progress else None
+        try:
+            limit = self.adaptive.max_limit if self.adaptive is not None else self.concurrency
+            async with async_http_client(limit, self.fuzzer.timeout) as client:
+                feeders = []
+                seen = set()
+                async for target in aiter_sync(targets):
+                    if stop is not None and stop.is_set():
+                        break
+                    if target in seen:
+                        continue
+                    seen.add(target)
+                    host = _Host(target, self.per_host, self.per_host_rate)
+                    self.hosts.append(host)
+                    if bar is not None:
+                        bar.add_total(len(paths))
+                    feeders.append(asyncio.create_task(self._feed(client, host, paths, emit, stop, spawn, bar)))
+                await asyncio.gather(*feeders)
+                if pending:
+                    await asyncio.gather(*pending)
+        finally:
+            self.elapsed = time.monotonic() - self.started
+            if bar is not None:
+                bar.close()
+
+
+class _Progress:
+    """Single rich progress bar (stderr) with host counts and throughput."""
+
+    def __init__(self, scheduler: FuzzScheduler):
+        from rich.console import Console
+        from rich.progress import BarColumn, MofNCompleteColumn, Progress, TextColumn, TimeElapsedColumn
+
+        self.scheduler = scheduler
+        self._progress = Progress(TextColumn("[bold blue]fuzz"), BarColumn(), MofNCompleteColumn(),
+                                  TextColumn("{task.description}"), TimeElapsedColumn(),
+                                  console=Console(stderr=True), transient=False)
+        self._task = self._progress.add_task("", total=0)
+        self._total = 0
+        self._last = 0.0
+        self._progress.start()
+
+    def add_total(self, n: int):
+        self._total += n
+        self._progress.update(self._task, total=self._total)
+
+    def advance(self, n: int = 1):
+        self._progress.advance(self._task, n)
+        now = time.monotonic()
+        if now - self._last >= 0.5:
+            self._last = now
+            self._refresh()
+
+    def _refresh(self):
+        hosts = self.scheduler.hosts
+        st = self.scheduler.stats
+        active = sum(1 for h in hosts if not h.finished)
+        paused = sum(1 for h in hosts if h.resume_at > time.monotonic())
+        self._progress.update(self._task, description=(
+            f"{active}/{len(hosts)} hosts active, {paused} backing off, {st['dead']} abandoned | "
+            f"{st['hits']} hits | {st['rps']} req/s"))
+
+    def close(self):
+        self._refresh()
+        self._progress.stop()
+
+
+def iter_fuzz_hosts(targets: Iterable[str], paths: Iterable[str],
+                    scheduler: Optional[FuzzScheduler] = None, **opts) -> Iterator[Dict]:
+    """
+    Fuzz all targets (base URLs) at once and yield hits as they arrive; each
+    hit carries its "target". Options are FuzzScheduler's; pass a `scheduler`
+    instead to read its stats afterwards.
+    """
+    scheduler = scheduler or FuzzScheduler(**opts)
+
+    def produce(emit, stop):
+        return scheduler.run(targets, paths, emit, stop)
+
+    return iter_from_async(produce, name="fuzz-scheduler")
+
+
+def fuzz_hosts(targets: Iterable[str], paths: Iterable[str], **opts) -> Dict[str, List[Dict]]:
+    """Fuzz all targets and return {target: [hits]} (every target is present)."""
+    targets = list(targets)
+    out: Dict[str, List[Dict]] = {t: [] for t in targets}
+    for hit in iter_fuzz_hosts(targets, paths, **opts):
+        out[hit["target"]].append(hit)
+    return out
@@ -0,0 +1,202 @@
+# src/fuzz/soft404.py
+"""
+Soft-404 detection for the path fuzzer.
+
+Before fuzzing a host, a few random (non-existent) paths are requested per
+extension class ("" for bare names, "/" for directories, ".php", ...). Their
+responses form a baseline index keyed by (extension, status, length bucket);
+each entry keeps the body SHA-1, a 64-bit simhash of the body sample and the
+redirect target with the random name replaced by a placeholder. Catch-all
+pages that echo the requested path ("/x7f3k2 was not found") get the same
+treatment: the path and name are replaced in the sample before it is hashed,
+and the echoed bytes are left out of the length.
+
+A response with a Location header (or any 3xx) is judged on its normalized
+redirect target alone: redirect bodies are empty or boilerplate, so a real
+redirect would otherwise match the catch-all's body. Any other response is
+matched with a dict lookup plus a comparison against the handful of baseline
+entries in that slot (and its neighbouring length buckets), so the cost does
+not grow with the wordlist. The simhash is only computed when the lookup
+finds candidates.
+"""
+import asyncio
+import hashlib
+import random
+import re
+import string
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote, urlsplit
+
+BUCKET = 256          # length bucket width (bytes)
+MAX_DISTANCE = 6      # simhash Hamming distance still considered "same page"
+PLACEHOLDER = "{path}"
+
+_TOKEN_RE = re.compile(rb"[a-z0-9]{2,}")
+
+
+def simhash(data: bytes, max_tokens: int = 256) -> int:
+    """64-bit simhash over (up to max_tokens distinct) lowercase word tokens."""
+    tokens = list(dict.fromkeys(_TOKEN_RE.findall(data.lower())))[:max_tokens]
+    if not tokens:
+        return 0
+    counts = [0] * 64
+    for tok in tokens:
+        h = int.from_bytes(hashlib.blake2b(tok, digest_size=8).digest(), "big")
+        for i in range(64):
+            counts[i] += 1 if (h >> i) & 1 else -1
+    out = 0
+    for i, c in enumerate(counts):
+        if c > 0:
+            out |= 1 << i
+    return out
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def path_class(path: str) -> Tuple[str, str]:
+    """Return (extension class, last path segment without extension)."""
+    path = path.split("?", 1)[0]
+    if path.endswith("/"):
+        return "/", path.rstrip("/").rsplit("/", 1)[-1]
+    name = path.rsplit("/", 1)[-1]
+    if "." in name.strip("."):
+        stem, ext = name.rsplit(".", 1)
+        return "." + ext.lower(), stem
+    return "", name
+
+
+def extension_classes(paths: Iterable[str], limit: int = 8) -> List[str]:
+    """Most common extension classes in a wordlist (always including "" and "/")."""
+    counts: Dict[str, int] = defaultdict(int)
+    for p in paths:
+        counts[path_class(p)[0]] += 1
+    ranked = sorted((c for c in counts if c not in ("", "/")), key=counts.get, reverse=True)
+    return ["", "/"] + ranked[:limit]
+
+
+def random_path(ext: str, length: int) -> Tuple[str, str]:
+    name = "".join(random.choices(string.ascii_lowercase + string.digits, k=length))
+    if ext == "/":
+        return name + "/", name
+    return name + ext, name
+
+
+def _normalize_location(location: Optional[str], name: str) -> Optional[str]:
+    if not location:
+        return None
+    loc = location
+    if name:
+        loc = re.sub(re.escape(name), PLACEHOLDER, loc, flags=re.IGNORECASE)
+    parts = urlsplit(loc)
+    # compare path + query only; absolute vs relative Location should not matter
+    return (parts.path or "/") + ("?" + parts.query if parts.query else "")
+
+
+def _normalize_body(sample: bytes, path: str, name: str) -> Tuple[bytes, int]:
+    """
+    Replace the requested path (as sent and URL-quoted) and name in a body
+    sample with the placeholder; returns (sample, bytes removed).
+    """
+    rel = path.lstrip("/")
+    variants = {v.encode("utf-8", "replace") for v in ("/" + rel, rel, quote(rel), name) if len(v) > 1}
+    if not variants or not sample:
+        return sample, 0
+    pattern = re.compile(b"|".join(re.escape(v) for v in sorted(variants, key=len, reverse=True)),
+                         re.IGNORECASE)
+    removed = 0
+
+    def sub(m):
+        nonlocal removed
+        removed += len(m.group(0)) - len(PLACEHOLDER)
+        return PLACEHOLDER.encode()
+
+    return pattern.sub(sub, sample), removed
+
+
+class _Entry:
+    def __init__(self, res: Dict, path: str, name: str):
+        sample, removed = _normalize_body(res.get("_sample", b""), path, name)
+        self.status = res["status"]
+        self.length = res["len"] - removed
+        self.sha1 = res["sha1"]
+        self.body_sha1 = hashlib.sha1(sample).hexdigest()
+        self.simhash = simhash(sample)
+        self.location = _normalize_location(res.get("location"), name)
+        self.url = res["url"]
+        self.echoes = removed != 0
+
+
+class Baseline:
+    """Per-host soft-404 fingerprint index."""
+
+    def __init__(self):
+        self.index: Dict[Tuple[str, int, int], List[_Entry]] = defaultdict(list)
+        self.redirects: Dict[Tuple[str, int], set] = defaultdict(set)
+        self.classes = set()
+        self.samples = 0
+        self.echoes = 0
+
+    def add(self, path: str, res: Dict):
+        ext, name = path_class(path)
+        e = _Entry(res, path, name)
+        self.classes.add(ext)
+        self.samples += 1
+        self.echoes += e.echoes
+        self.index[(ext, e.status, e.length // BUCKET)].append(e)
+        if e.location:
+            self.redirects[(ext, e.status)].add(e.location)
+
+    def match(self, path: str, res: Dict) -> Optional[str]:
+        """Return why `res` looks like a soft-404 for `path`, else None."""
+        ext, name = path_class(path)
+        if ext not in self.classes:
+            ext = ""
+        status = res["status"]
+        loc = _normalize_location(res.get("location"), name)
+        if loc or 300 <= status < 400:
+            if loc and loc in self.redirects.get((ext, status), ()):
+                return f"redirect to baseline target {loc} ({status})"
+            return None
+        sample, removed = _normalize_body(res.get("_sample", b""), path, name)
+        bucket = (res["len"] - removed) // BUCKET
+        candidates = [e for b in (bucket - 1, bucket, bucket + 1)
+                      for e in self.index.get((ext, status, b), ())]
+        if not candidates:
+            return None
+        for e in candidates:
+            if e.sha1 == res["sha1"]:
+                return f"identical body to baseline {e.url} ({status}, {res['len']}b)"
+        if removed:
+            body_sha1 = hashlib.sha1(sample).hexdigest()
+            for e in candidates:
+                if e.body_sha1 == body_sha1:
+                    return f"identical body to baseline {e.url} apart from the echoed path ({status})"
+        h = simhash(sample)
+        for e in candidates:
+            d = hamming(h, e.simhash)
+            if d <= MAX_DISTANCE:
+                return f"similar body to baseline {e.url} ({status}, simhash d={d})"
+        return None
+
+    def summary(self) -> Dict:
+        return {"samples": self.samples, "classes": sorted(self.classes), "echoes": self.echoes,
+                "statuses": sorted({k[1] for k in self.index} | {k[1] for k in self.redirects})}
+
+
+async def calibrate(fetch, classes: Iterable[str], probes: int = 3) -> Baseline:
+    """
+    Build a Baseline from random paths in each extension class. `fetch(path)`
+    must be an async callable returning a fuzzer result dict (with `_sample`)
+    or None.
+    """
+    # vary the name length so bodies that echo the path are recognised
+    paths = [random_path(ext, 8 + 8 * i)[0] for ext in classes for i in range(probes)]
+    results = await asyncio.gather(*(fetch(p) for p in paths))
+    baseline = Baseline()
+    for path, res in zip(paths, results):
+        if res is not None:
+            baseline.add(path, res)
+    return baseline
@@ -1,13 +1,16 @@
 # src/logging_conf.py
 import logging
+from rich.console import Console
 from rich.logging import RichHandler
 
-def setup_logging(level="INFO"):
+def setup_logging(level="INFO", stderr=False):
+    # stderr=True keeps stdout clean for machine-readable output (--json)
     logging.basicConfig(
         level=level,
         format="%(asctime)s %(levelname)s %(message)s",
         datefmt="%H:%M:%S",
-        handlers=[RichHandler()]
+        handlers=[RichHandler(console=Console(stderr=True) if stderr else None)]
     )
     logging.getLogger("urllib3").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
     return logging.getLogger("husk")
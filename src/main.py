@@ -8,19 +8,26 @@ Run examples:
 """
 
 from pathlib import Path
+import atexit
+import json
 import multiprocessing
-from typing import List, Optional
+import time
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
 
 import typer
 
 import config
-from logging_conf import setup_logging
-from utils.output import save_json, pretty
-from discovery.subdomains import bruteforce_subdomains
-from discovery.hosts import filter_live
-from screenshots.screenshots import screenshot_url
-from scanner.nmap_integration import run_nmap
-from fuzz.path_fuzzer import fuzz_paths
+from utils import metrics
+from utils.output import save_json, pretty, result_path
+
+# command modules (dnspython, httpx, requests, selenium, nmap parsing, ...) are
+# imported inside the commands that use them, so --help and cheap commands
+# start fast
+if TYPE_CHECKING:
+    from fuzz.scheduler import FuzzScheduler
+    from scanner.orchestrator import NmapOrchestrator
+    from utils.adaptive import AimdController
+    from utils.cache import ResultCache
 
 app = typer.Typer(help="husk — Recon automation helper (use responsibly)")
 
@@ -38,23 +45,338 @@ BANNER = r"""
 """
 
 def _make_logger(level: str = "INFO"):
-    # setup_logging returns a logger configured with RichHandler
+    from logging_conf import setup_logging
+    # setup_logging returns a logger configured with RichHandler; --json keeps
+    # stdout for the result document and only lets warnings through
+    if _settings["json"]:
+        return setup_logging("WARNING" if level == "INFO" else level, stderr=True)
     logger = setup_logging(level)
     return logger
 
+def _echo(text: str, **style):
+    # progress/cosmetic output is silenced by --json so stdout stays parseable;
+    # errors (red) still go to stderr
+    if not _settings["json"]:
+        typer.echo(typer.style(text, **style))
+    elif style.get("fg") == typer.colors.RED:
+        typer.echo(text, err=True)
+        _json_doc.setdefault("errors", []).append(text)
+
 def load_wordlist(path: Path) -> List[str]:
-    if not path.exists():
-        return []
-    with path.open(encoding="utf-8") as f:
-        return [l.strip() for l in f if l.strip() and not l.startswith("#")]
+    from utils.streams import iter_wordlist
+    return list(iter_wordlist(path))
+
+def _words(path: Path, stream: bool, domain: Optional[str] = None) -> Iterable[str]:
+    from utils.streams import iter_wordlist
+    # stream=True reads the wordlist lazily so memory stays flat for huge lists
+    words = iter_wordlist(path) if stream else load_wordlist(path)
+    shard = _settings["shard"]
+    if shard is None or domain is None:
+        return words
+    # --shard i/N: only the candidate hosts of this shard
+    words = shard.words(words, domain)
+    return words if stream else list(words)
+
+def _entries_label(words: Iterable[str]) -> str:
+    return str(len(words)) if isinstance(words, list) else "streamed"
+
+def _open_cache(enabled: bool, max_age: float) -> Optional["ResultCache"]:
+    if not enabled:
+        return None
+    from utils.cache import ResultCache
+    cache = ResultCache(max_age=max_age)
+    atexit.register(cache.close)
+    return cache
+
+_settings: Dict = {"store": "json", "compress": None, "export_json": False, "summary": False, "command": None,
+             "started": None, "adaptive": False, "max_concurrency": None, "json": False,
+             "banner": True, "shard": None, "metrics": False}
+_stores: Dict[str, object] = {}
+_controllers: List["AimdController"] = []
+# --json: the one document printed on exit ({"command", "results", "saved"})
+_json_doc: Dict = {}
+_ADAPTIVE_MAX = {"dns": config.ADAPTIVE_MAX_DNS, "probe": config.ADAPTIVE_MAX_PROBE, "fuzz": config.ADAPTIVE_MAX_FUZZ}
+
+def _controller(pool: str, initial: int) -> Optional["AimdController"]:
+    """AIMD controller for one engine when --adaptive is on, starting from its fixed setting."""
+    if not _settings["adaptive"]:
+        return None
+    from utils.adaptive import AimdController
+    upper = _settings["max_concurrency"] or _ADAPTIVE_MAX[pool]
+    ctl = AimdController(initial, min_limit=min(config.ADAPTIVE_MIN, upper), max_limit=upper, name=pool)
+    _controllers.append(ctl)
+    return ctl
+
+def _save_concurrency():
+    reports = [c.report() for c in _controllers]
+    if not reports:
+        return
+    for r in reports:
+        best = f", best latency {r['best_latency_ms']}ms" if r["best_latency_ms"] is not None else ""
+        _echo(f"[adaptive] {r['pool']}: limit {r['history'][0]['limit']} -> {r['limit']} "
+              f"(range {r['min_seen']}-{r['max_seen']}, {r['decreases']} decreases{best})",
+              fg=typer.colors.BLUE)
+    saved = _save(_run_name(), "concurrency", reports, records=[dict(h, pool=r["pool"]) for r in reports for h in r["history"]])
+    _echo(f"[adaptive] limits over time -> {saved}", fg=typer.colors.GREEN)
+
+def _store_for(name: str, timestamp: bool):
+    # one store per result name (domain) and run; None means JSON files only
+    if name not in _stores:
+        from utils.store import open_store
+        store = open_store(_settings["store"], name, command=_settings["command"],
+                           compress=_settings["compress"], timestamp=timestamp,
+                           started=_settings["started"])
+        if store is not None:
+            atexit.register(store.close)
+        _stores[name] = store
+    return _stores[name]
+
+def _save(name: str, kind: str, data, timestamp: bool = False, records: Optional[Iterable[Dict]] = None) -> str:
+    """
+    Save one result set: to the selected store (as `records`, default derived
+    from `data`) and/or as the pretty {name}_{kind}.json export. Returns where it went.
+    """
+    where = []
+    if _settings["store"] == "json" or _settings["export_json"]:
+        where.append(str(save_json(f"{name}_{kind}", data, timestamp=timestamp).resolve()))
+    store = _store_for(name, timestamp)
+    if store is not None:
+        from utils.store import records_from
+        store.write_many(kind, records_from(data) if records is None else records)
+        store.flush()
+        where.append(store.location(kind))
+    if _settings["json"]:
+        _json_doc.setdefault("saved", {})[kind] = where
+    return ", ".join(where)
+
+def _run_name() -> str:
+    # results of a run are named after its target (first one saved), else the command
+    return next(iter(_stores), None) or _settings["command"] or TOOL_NAME
+
+def _save_metrics(prom: bool):
+    metrics.observe("command_seconds", time.time() - _settings["started"], command=_settings["command"])
+    name = _run_name()
+    paths = [save_json(f"{name}_metrics", metrics.report())]
+    if prom:
+        path = result_path(f"{name}_metrics", ".prom")
+        path.write_text(metrics.prometheus(), encoding="utf-8")
+        paths.append(path)
+    _echo(f"[metrics] saved -> {', '.join(str(p.resolve()) for p in paths)}", fg=typer.colors.GREEN)
+
+def _save_profile(profiler):
+    paths = profiler.stop(_run_name())
+    _echo(f"[profile] saved -> {', '.join(str(p.resolve()) for p in paths) or 'nothing recorded'}", fg=typer.colors.GREEN)
+
+def _count(data) -> int:
+    if isinstance(data, dict) and data and all(isinstance(v, list) for v in data.values()):
+        return sum(len(v) for v in data.values())
+    return len(data) if isinstance(data, (list, dict)) else 1
+
+def _emit_json():
+    typer.echo(json.dumps(dict(_json_doc, command=_settings["command"]), default=str))
+
+def _show(label: str, data):
+    # --json: the results go into the exit document instead (counts with --summary)
+    if _settings["json"]:
+        _json_doc["results"] = {"count": _count(data)} if _settings["summary"] else data
+    # --summary prints counts only; full dumps get slow and unreadable on big runs
+    elif _settings["summary"]:
+        _echo(f"[{label}] {_count(data)} results", fg=typer.colors.BLUE)
+    else:
+        pretty(data)
+
+def resolve_and_probe(domain: str, words: Iterable[str], cache: Optional["ResultCache"] = None,
+                      probe_opts: Optional[Dict] = None,
+                      **dns_opts) -> Tuple[Dict[str, List[str]], List[str], List[Dict]]:
+    """
+    Bruteforce subdomains and probe them for liveness in one overlapping pass:
+    each resolved host is handed to the HTTP prober as soon as it arrives.
+    Returns (subdomain results, live hosts, probe details of live hosts).
+    """
+    from discovery.http_probe import iter_probe
+    from discovery.subdomains import iter_subdomains
+    sub_result: Dict[str, List[str]] = {}
+
+    def resolved():
+        if "adaptive" not in dns_opts:
+            dns_opts["adaptive"] = _controller("dns", dns_opts.get("workers", 40))
+        for fqdn, ips in iter_subdomains(domain, words, cache=cache, **dns_opts):
+            sub_result[fqdn] = ips
+            yield fqdn
+
+    probe_opts = dict(probe_opts or {})
+    if "adaptive" not in probe_opts:
+        probe_opts["adaptive"] = _controller("probe", probe_opts.get("concurrency", 100))
+    probes = [r for r in iter_probe(resolved(), cache=cache, **probe_opts) if r["live"]]
+    return sub_result, [r["host"] for r in probes], probes
+
+def _permutation_engine(domain: str, rounds: int, recurse: bool):
+    from discovery.permutations import PermutationEngine
+    return PermutationEngine(domain, rounds=rounds, recurse=recurse)
+
+def _echo_round(tag: str):
+    def echo(r: Dict):
+        tiers = ", ".join(f"{t} {n}" for t, n in r["by_tier"].items()) or "none"
+        _echo(f"[{tag}] permutation round {r['round']}: {r['seeds']} seeds -> {r['candidates']} candidates "
+              f"({tiers}{', capped' if r['capped'] else ''}), {r['hits']} new hits, "
+              f"yield {r['yield'] * 100:.2f}% in {r['seconds']}s", fg=typer.colors.BLUE)
+    return echo
+
+def _echo_resolver_stats(stats: List[Dict], limit: int = 20):
+    _echo(f"[subs] resolver stats (top {min(limit, len(stats))} of {len(stats)} by queries):", fg=typer.colors.BLUE)
+    for row in stats[:limit]:
+        color = typer.colors.RED if row["quarantined"] else typer.colors.WHITE
+        _echo(
+            f"  {row['resolver']:<40} q={row['queries']:<7} ok={row['answers']:<6} nx={row['nxdomain']:<6} "
+            f"timeout={row['timeouts']:<5} servfail={row['servfails']:<5} avg={row['avg_latency_ms']}ms "
+            f"quarantines={row['quarantines']}", fg=color)
+
+def _target_url(probe: Dict) -> str:
+    # use each live host on the scheme its probe answered on
+    return f"{probe['scheme']}://{probe['host']}"
+
+def _fuzz_targets(probes: List[Dict]) -> List[str]:
+    return [_target_url(p) for p in probes]
+
+def _echo_timeline(timeline: Dict):
+    _echo(f"[recon] pipeline finished in {timeline['wall_seconds']}s", fg=typer.colors.BLUE)
+    for s in timeline["stages"]:
+        _echo(
+            f"  {s['stage']:<12} {s['start']}s -> {s['end']}s  in={s['items_in']:<6} out={s['items_out']:<6} "
+            f"{s['items_per_sec']}/s  max queue={s['max_queue']}  errors={s['errors']}", fg=typer.colors.WHITE)
+
+_CHANGE_MARK = {"added": ("+", typer.colors.GREEN), "removed": ("-", typer.colors.RED),
+                "changed": ("~", typer.colors.YELLOW)}
+
+def _echo_delta(d: Dict):
+    mark, color = _CHANGE_MARK[d["change"]]
+    detail = d["new"] if d["change"] == "added" else d["old"] if d["change"] == "removed" else f"{d['old']} -> {d['new']}"
+    _echo(f"  {mark} [{d['kind']}] {d['key']} {detail}", fg=color)
+
+def _echo_diff_summary(tag: str, deltas: List[Dict]):
+    from utils.diff import summarize
+    counts = summarize(deltas)
+    if not counts:
+        _echo(f"[{tag}] no changes", fg=typer.colors.BLUE)
+    for kind, per in counts.items():
+        _echo(f"[{tag}] {kind}: " + ", ".join(f"{n} {c}" for c, n in per.items()), fg=typer.colors.BLUE)
+
+def _previous_run(domain: str) -> Tuple[Optional[str], Dict[str, List[Dict]]]:
+    from utils.diff import KINDS as DIFF_KINDS, load_snapshot, previous_sources
+    # fully read, since it is both carried over and diffed against
+    sources = previous_sources(domain, count=1)
+    if not sources:
+        return None, {}
+    snap = load_snapshot(domain, sources[-1], kinds=DIFF_KINDS + ("screenshots",))
+    return sources[-1], {kind: list(recs) for kind, recs in snap.items()}
+
+def _carry_over(previous: Dict[str, List[Dict]], hosts: set, rescanned: set) -> Dict[str, List[Dict]]:
+    """Previous results of the hosts an incremental recon did not probe again."""
+    probes = [r for r in previous.get("probes", []) if r.get("host") in hosts and r.get("live", True)]
+    targets = {_target_url(r) for r in probes}
+    return {
+        "probes": probes,
+        "screenshots": [r for r in previous.get("screenshots", []) if r.get("host") in hosts],
+        "nmap": [r for r in previous.get("nmap", [])
+                 if r.get("addr") not in rescanned and set(r.get("vhosts") or []) <= hosts],
+        "fuzz": [r for r in previous.get("fuzz", []) if r.get("target") in targets],
+    }
+
+def _collect_nmap(hosts: Iterable[Dict]) -> List[Dict]:
+    # report each address as soon as nmap finishes it
+    res = []
+    for h in hosts:
+        open_ports = [f"{p['port']}/{p['service'] or '?'}" for p in h["ports"] if p["state"] == "open"]
+        _echo(f"[nmap] {h['addr']} ({', '.join(h['vhosts']) or '-'}): {', '.join(open_ports) or 'no open ports'}", fg=typer.colors.WHITE)
+        res.append(h)
+    return res
+
+def _screenshot_records(shots: Dict[str, Dict]) -> List[Dict]:
+    return [dict(rec, host=h) for h, rec in shots.items()]
+
+def _echo_screenshot(tag: str, res: Dict):
+    if res["error"]:
+        _echo(f"[{tag}] screenshot error for {res['url']}: {res['error']}", fg=typer.colors.RED)
+    elif res["duplicate_of"]:
+        _echo(f"[{tag}] {res['url']} looks like {res['duplicate_of']}, skipped", fg=typer.colors.YELLOW)
+    else:
+        _echo(f"[{tag}] screenshot -> {res['path']}", fg=typer.colors.GREEN)
+
+def _echo_nmap_errors(orch: "NmapOrchestrator"):
+    for err in orch.errors:
+        _echo(f"[nmap] batch {', '.join(err['targets'])} failed: {err['error']}", fg=typer.colors.RED)
+
+def _echo_fuzz_stats(scheduler: "FuzzScheduler"):
+    st = scheduler.stats
+    _echo(f"[fuzz] {st['requests']} requests to {st['hosts']} hosts in {st['elapsed']}s "
+          f"({st['rps']} req/s), {st['hits']} hits, {st['soft404']} filtered as soft-404",
+          fg=typer.colors.BLUE)
+    for h in scheduler.host_summaries():
+        if h["dead"]:
+            _echo(f"  abandoned {h['target']} after {h['done']} paths: {h['dead']}", fg=typer.colors.YELLOW)
 
 # callback runs before every command (including --help)
 @app.callback(invoke_without_command=True)
-def main_callback(ctx: typer.Context):
-    # print colored banner and welcome/warning using typer.style
-    typer.echo(typer.style(BANNER, fg=typer.colors.GREEN, bold=True))
-    typer.echo(typer.style(f"{TOOL_NAME} v{VERSION}", fg=typer.colors.CYAN, bold=True))
-    typer.echo(typer.style("⚠ Use responsibly. Only run against authorized targets.\n", fg=typer.colors.YELLOW))
+def main_callback(ctx: typer.Context,
+                  store: str = typer.Option("json", help="result store: json (pretty files), ndjson or sqlite"),
+                  compress: Optional[str] = typer.Option(None, help="compress the ndjson store: gzip or zstd"),
+                  export_json: bool = typer.Option(False, "--export-json", help="also write the pretty JSON files when using --store ndjson/sqlite"),
+                  summary: bool = typer.Option(False, "--summary", "--quiet", "-q", help="print result counts instead of full dumps"),
+                  metrics_on: bool = typer.Option(False, "--metrics", help="collect timers, latency histograms and counters; saved as {name}_metrics.json"),
+                  prometheus: bool = typer.Option(False, "--prometheus", help="with --metrics, also write {name}_metrics.prom (Prometheus text format)"),
+                  profile: Optional[str] = typer.Option(None, help="profile the command: cprofile or sample; saved next to the results"),
+                  adaptive: bool = typer.Option(False, "--adaptive", help="tune DNS/probe/fuzz concurrency live (AIMD) from latency, errors and 429s"),
+                  max_concurrency: Optional[int] = typer.Option(None, help="with --adaptive, upper bound for every pool (default per pool from config)"),
+                  no_banner: bool = typer.Option(False, "--no-banner", help="skip the banner and welcome lines"),
+                  json_mode: bool = typer.Option(False, "--json", help="machine-readable: no banner or progress output, one JSON document (results and saved files) on stdout, logs on stderr"),
+                  shard: Optional[str] = typer.Option(None, help="run only shard i/N of the wordlist (1-based, e.g. 2/8); results go to results/shard-i-of-N/")):
+    _settings["json"] = json_mode
+    if store != "json" or compress is not None:
+        from utils.store import STORES, check_compression
+        if store not in STORES:
+            _echo(f"unknown store {store!r}, expected one of {', '.join(STORES)}", fg=typer.colors.RED)
+            raise typer.Exit(code=1)
+        try:
+            check_compression(compress)
+        except ValueError as e:
+            _echo(str(e), fg=typer.colors.RED)
+            raise typer.Exit(code=1)
+    if profile is not None:
+        from utils.profiling import PROFILERS, make_profiler
+        if profile not in PROFILERS:
+            _echo(f"unknown profiler {profile!r}, expected one of {', '.join(PROFILERS)}", fg=typer.colors.RED)
+            raise typer.Exit(code=1)
+    if shard is not None:
+        from sharding import Shard
+        try:
+            shard = Shard.parse(shard)
+        except ValueError as e:
+            _echo(str(e), fg=typer.colors.RED)
+            raise typer.Exit(code=1)
+        # every shard keeps its own result set (and cache) next to the others
+        config.RESULTS_DIR = config.RESULTS_DIR / shard.dirname
+    _settings.update(store=store, compress=compress, export_json=export_json, summary=summary,
+                     command=ctx.invoked_subcommand, started=time.time(),
+                     adaptive=adaptive, max_concurrency=max_concurrency, banner=not no_banner,
+                     shard=shard, metrics=metrics_on or prometheus)
+    if json_mode and ctx.invoked_subcommand is not None:
+        # registered first so it runs last, after the metrics/profile/concurrency saves
+        ctx.call_on_close(_emit_json)
+    if metrics_on or prometheus:
+        metrics.enable()
+    if profile is not None and ctx.invoked_subcommand is not None:
+        profiler = make_profiler(profile)
+        profiler.start()
+        ctx.call_on_close(lambda: _save_profile(profiler))
+    if metrics.enabled() and ctx.invoked_subcommand is not None:
+        ctx.call_on_close(lambda: _save_metrics(prometheus))
+    if adaptive:
+        ctx.call_on_close(_save_concurrency)
+    if _settings["banner"]:
+        # print colored banner and welcome/warning using typer.style
+        _echo(BANNER, fg=typer.colors.GREEN, bold=True)
+        _echo(f"{TOOL_NAME} v{VERSION}", fg=typer.colors.CYAN, bold=True)
+        _echo("⚠ Use responsibly. Only run against authorized targets.\n", fg=typer.colors.YELLOW)
 
     # if no subcommand, show help
     if ctx.invoked_subcommand is None:
@@ -68,176 +390,608 @@ def subs(
     wl: Path = typer.Option(config.DEFAULT_WORDLIST, help="subdomain wordlist"),
     workers: Optional[int] = typer.Option(None, help="number of threads (auto if omitted)"),
     resolvers: str = typer.Option("", help="comma-separated DNS resolvers, e.g. 8.8.8.8,1.1.1.1"),
+    resolvers_file: Optional[Path] = typer.Option(None, help="file with one resolver IP per line (merged with --resolvers)"),
+    engine: str = typer.Option("thread", "--engine", help="DNS engine: thread or async"),
+    rate: Optional[float] = typer.Option(None, help="per-resolver queries/sec limit (async engine)"),
+    dns_timeout: float = typer.Option(3.0, help="per-query DNS timeout in seconds"),
+    retries: int = typer.Option(1, help="DNS retries on timeout/SERVFAIL (on another resolver)"),
+    stream: bool = typer.Option(False, "--stream", help="read the wordlist lazily (plain or .gz)"),
+    cache: bool = typer.Option(True, "--cache/--no-cache", help="reuse cached DNS answers and liveness probes"),
+    max_age: float = typer.Option(3600.0, help="max age (s) of cached entries; DNS answers are also bounded by their TTL"),
+    permute: bool = typer.Option(False, "--permute", help="generate permutations of the hits (numbers, dashes, env words) and resolve them in rounds"),
+    rounds: int = typer.Option(2, help="with --permute, generation rounds, each seeded by the previous round's hits"),
+    recurse: bool = typer.Option(False, "--recurse", help="with --permute, also bruteforce common labels under discovered non-wildcard subzones"),
     timestamp: bool = typer.Option(False, "--timestamp", "-t", help="append UTC timestamp to results filename"),
     debug: bool = typer.Option(False, "--debug", "-d", help="enable debug logging"),
 ):
     """
     Run subdomain bruteforce resolution and save results.
     """
+    from discovery.resolver_pool import ResolverPool, load_resolvers
+    from discovery.subdomains import DEFAULT_RESOLVERS, ENGINES, iter_subdomains, make_wildcard_filter
     logger = _make_logger("DEBUG" if debug else "INFO")
 
     workers_count = workers if workers else min(200, multiprocessing.cpu_count() * 10)
     wl_path = Path(wl)
     if not wl_path.exists():
-        typer.echo(typer.style(f"[subs] Wordlist not found: {wl_path.resolve()}", fg=typer.colors.RED))
+        _echo(f"[subs] Wordlist not found: {wl_path.resolve()}", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+
+    if engine not in ENGINES:
+        _echo(f"[subs] unknown engine {engine!r}, expected one of {', '.join(ENGINES)}", fg=typer.colors.RED)
         raise typer.Exit(code=1)
 
-    entries = load_wordlist(wl_path)
-    typer.echo(typer.style(f"[subs] domain={domain} wordlist={wl_path.resolve()} entries={len(entries)} workers={workers_count}", fg=typer.colors.BLUE))
+    entries = _words(wl_path, stream, domain)
+    _echo(f"[subs] domain={domain} wordlist={wl_path.resolve()} entries={_entries_label(entries)} workers={workers_count} engine={engine}", fg=typer.colors.BLUE)
 
     resolvers_list = [r.strip() for r in resolvers.split(",") if r.strip()]
-    if resolvers_list:
-        typer.echo(typer.style(f"[subs] using resolvers: {resolvers_list}", fg=typer.colors.MAGENTA))
+    if resolvers_file:
+        if not resolvers_file.exists():
+            _echo(f"[subs] Resolvers file not found: {resolvers_file.resolve()}", fg=typer.colors.RED)
+            raise typer.Exit(code=1)
+        resolvers_list += load_resolvers(resolvers_file)
+    if len(resolvers_list) > 10:
+        _echo(f"[subs] using {len(resolvers_list)} resolvers", fg=typer.colors.MAGENTA)
+    elif resolvers_list:
+        _echo(f"[subs] using resolvers: {resolvers_list}", fg=typer.colors.MAGENTA)
     else:
-        typer.echo(typer.style(f"[subs] using default public resolvers (Google/Cloudflare)", fg=typer.colors.MAGENTA))
-
-    found = bruteforce_subdomains(domain, entries, workers=workers_count,
-                                  nameservers=resolvers_list if resolvers_list else None)
-
-    saved_path = save_json(f"{domain}_subdomains", found, timestamp=timestamp)
-    typer.echo(typer.style(f"[subs] saved results -> {saved_path.resolve()}", fg=typer.colors.GREEN))
-    pretty(found)
+        _echo(f"[subs] using default public resolvers (Google/Cloudflare)", fg=typer.colors.MAGENTA)
+
+    pool = ResolverPool(resolvers_list or DEFAULT_RESOLVERS, retries=retries)
+    found = {}
+    store = _store_for(domain, timestamp)
+    gen = _permutation_engine(domain, rounds, recurse) if permute else None
+    dns_opts = dict(workers=workers_count, pool=pool, engine=engine, rate=rate, timeout=dns_timeout,
+                    cache=_open_cache(cache, max_age), adaptive=_controller("dns", workers_count),
+                    wildcard_filter=make_wildcard_filter(domain, pool, dns_timeout))
+
+    def hits():
+        yield from iter_subdomains(domain, gen.track(entries) if gen else entries, **dns_opts)
+        if gen is not None:
+            # generated candidates go through the same pool, cache, limits and wildcard fingerprints
+            yield from gen.iter_resolve(list(found), on_round=_echo_round("subs"), **dns_opts)
+
+    for fqdn, ips in hits():
+        found[fqdn] = ips
+        if store is not None:
+            store.write("subdomains", {"host": fqdn, "ips": ips})
+
+    saved_path = _save(domain, "subdomains", found, timestamp=timestamp, records=())
+    _echo(f"[subs] saved results -> {saved_path}", fg=typer.colors.GREEN)
+    if gen is not None:
+        rounds_path = _save(domain, "permutations", gen.rounds, timestamp=timestamp)
+        _echo(f"[subs] generation rounds -> {rounds_path}", fg=typer.colors.GREEN)
+    _show("subs", found)
+
+    stats = pool.report()
+    stats_path = _save(domain, "resolvers", stats, timestamp=timestamp)
+    _echo_resolver_stats(stats)
+    _echo(f"[subs] resolver stats -> {stats_path}", fg=typer.colors.GREEN)
 
 
 @app.command()
 def hosts_cmd(domain: str, wl: Path = typer.Option(config.DEFAULT_WORDLIST, help="subdomain wordlist"),
+              stream: bool = typer.Option(False, "--stream", help="read the wordlist lazily (plain or .gz)"),
+              probe_concurrency: int = typer.Option(100, help="hosts probed concurrently"),
+              probe_mode: str = typer.Option("race", help="race: first scheme to answer wins; both: probe http and https fully"),
+              head_first: bool = typer.Option(False, "--head-first", help="try HEAD before GET (no title capture on HEAD)"),
+              cache: bool = typer.Option(True, "--cache/--no-cache", help="reuse cached DNS answers and liveness probes"),
+              max_age: float = typer.Option(3600.0, help="max age (s) of cached entries; DNS answers are also bounded by their TTL"),
               timestamp: bool = typer.Option(False, "--timestamp", "-t", help="append UTC timestamp to results filename"),
               debug: bool = typer.Option(False, "--debug", "-d", help="enable debug logging")):
     """
     Find live hosts from subdomain wordlist and save results.
     """
+    from discovery.http_probe import MODES as PROBE_MODES
     logger = _make_logger("DEBUG" if debug else "INFO")
-    wl_list = load_wordlist(wl)
-    typer.echo(typer.style(f"[hosts] domain={domain} wordlist_entries={len(wl_list)}", fg=typer.colors.BLUE))
-    subs_result = bruteforce_subdomains(domain, wl_list)
-    live = filter_live(list(subs_result.keys()))
-    saved = save_json(f"{domain}_live", {"live": live}, timestamp=timestamp)
-    typer.echo(typer.style(f"[hosts] found {len(live)} live hosts, saved -> {saved.resolve()}", fg=typer.colors.GREEN))
-    pretty({"live": live})
+    wl_list = _words(wl, stream, domain)
+    _echo(f"[hosts] domain={domain} wordlist_entries={_entries_label(wl_list)}", fg=typer.colors.BLUE)
+    if probe_mode not in PROBE_MODES:
+        _echo(f"[hosts] unknown probe mode {probe_mode!r}, expected one of {', '.join(PROBE_MODES)}", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+    probe_opts = {"concurrency": probe_concurrency, "mode": probe_mode, "head_first": head_first}
+    subs_result, live, probes = resolve_and_probe(domain, wl_list, cache=_open_cache(cache, max_age),
+                                                  probe_opts=probe_opts)
+    saved = _save(domain, "live", {"live": live}, timestamp=timestamp, records=[{"host": h} for h in live])
+    details = _save(domain, "probes", probes, timestamp=timestamp)
+    _echo(f"[hosts] found {len(live)} live hosts, saved -> {saved} (details -> {details})", fg=typer.colors.GREEN)
+    _show("hosts", {"live": live})
 
 
 @app.command()
 def screenshots_cmd(domain: str,
                     wl: Path = typer.Option(config.DEFAULT_WORDLIST, help="subdomain wordlist"),
                     outdir: Path = typer.Option(config.SCREENSHOT_DIR, help="output directory for screenshots"),
+                    workers: int = typer.Option(4, help="browsers capturing in parallel"),
+                    recycle_after: int = typer.Option(50, help="captures per browser before it is restarted"),
+                    page_timeout: float = typer.Option(15.0, help="page load timeout in seconds"),
+                    dedupe: bool = typer.Option(True, "--dedupe/--no-dedupe", help="store pages with identical content only once"),
+                    cache: bool = typer.Option(True, "--cache/--no-cache", help="reuse cached DNS answers and liveness probes"),
+                    max_age: float = typer.Option(3600.0, help="max age (s) of cached entries; DNS answers are also bounded by their TTL"),
                     timestamp: bool = typer.Option(False, "--timestamp", "-t", help="append UTC timestamp to results filename"),
                     debug: bool = typer.Option(False, "--debug", "-d", help="enable debug logging")):
     """
     Take screenshots of live hosts and save mapping.
     """
+    from screenshots.screenshots import ScreenshotEngine
     logger = _make_logger("DEBUG" if debug else "INFO")
-    wl_list = load_wordlist(wl)
-    sub_result = bruteforce_subdomains(domain, wl_list)
-    live = filter_live(list(sub_result.keys()))
-    typer.echo(typer.style(f"[screenshots] taking screenshots of {len(live)} live hosts", fg=typer.colors.BLUE))
+    wl_list = _words(wl, False, domain)
+    sub_result, live, probes = resolve_and_probe(domain, wl_list, cache=_open_cache(cache, max_age))
+    _echo(f"[screenshots] taking screenshots of {len(live)} live hosts", fg=typer.colors.BLUE)
     shots = {}
-    for h in live:
-        url = f"https://{h}"
-        try:
-            p = screenshot_url(url, outdir=outdir)
-            shots[h] = str(p)
-            typer.echo(typer.style(f"[screenshots] saved -> {p}", fg=typer.colors.GREEN))
-        except Exception as e:
-            shots[h] = f"error:{e}"
-            typer.echo(typer.style(f"[screenshots] error for {h}: {e}", fg=typer.colors.RED))
-    saved = save_json(f"{domain}_screenshots", shots, timestamp=timestamp)
-    typer.echo(typer.style(f"[screenshots] saved mapping -> {saved.resolve()}", fg=typer.colors.GREEN))
-    pretty(shots)
+    hosts = {_target_url(p): p["host"] for p in probes}
+    with ScreenshotEngine(workers=workers, recycle_after=recycle_after, timeout=page_timeout,
+                          outdir=outdir, dedupe=dedupe) as engine:
+        for res in engine.iter_capture(list(hosts)):
+            shots[hosts[res["url"]]] = res
+            _echo_screenshot("screenshots", res)
+        st = engine.stats
+    _echo(f"[screenshots] {st['captured']} captured, {st['duplicates']} duplicates skipped, {st['errors']} errors", fg=typer.colors.BLUE)
+    saved = _save(domain, "screenshots", shots, timestamp=timestamp, records=_screenshot_records(shots))
+    _echo(f"[screenshots] saved mapping -> {saved}", fg=typer.colors.GREEN)
+    _show("screenshots", shots)
 
 
 @app.command()
-def nmap_cmd(target: str,
+def nmap_cmd(targets: List[str] = typer.Argument(..., help="hosts or IPs to scan"),
+             procs: int = typer.Option(config.NMAP_PROCS, help="nmap processes run in parallel"),
+             batch_size: int = typer.Option(config.NMAP_BATCH_SIZE, help="targets per nmap process"),
+             two_phase: bool = typer.Option(False, "--two-phase", help="top-ports discovery first, then service scan of open ports"),
+             top_ports: int = typer.Option(config.NMAP_TOP_PORTS, help="ports checked by the --two-phase discovery pass"),
              timestamp: bool = typer.Option(False, "--timestamp", "-t", help="append UTC timestamp to results filename"),
              debug: bool = typer.Option(False, "--debug", "-d", help="enable debug logging")):
     """
-    Run nmap on a target host and save results.
+    Run nmap on one or more targets (deduplicated by IP) and save results.
     """
+    from scanner.orchestrator import NmapOrchestrator
     logger = _make_logger("DEBUG" if debug else "INFO")
-    typer.echo(typer.style(f"[nmap] running nmap against {target} (this requires system 'nmap' installed)", fg=typer.colors.BLUE))
+    # every shard saves under the same name, whatever slice of the targets it got
+    name = targets[0] if len(targets) == 1 else f"{targets[0]}+{len(targets) - 1}"
+    if _settings["shard"] is not None:
+        targets = [t for t in targets if _settings["shard"].owns(t.lower())]
+        if not targets:
+            _echo(f"[nmap] shard {_settings['shard']} owns none of the targets, nothing to do", fg=typer.colors.YELLOW)
+            raise typer.Exit(code=0)
+    _echo(f"[nmap] running nmap against {len(targets)} targets (this requires system 'nmap' installed)", fg=typer.colors.BLUE)
+    orch = NmapOrchestrator(procs=procs, batch_size=batch_size, two_phase=two_phase, top_ports=top_ports)
     try:
-        res = run_nmap(target)
+        res = _collect_nmap(orch.iter_scan({t: [] for t in targets}))
     except Exception as e:
         res = {"error": str(e)}
-    saved = save_json(f"{target}_nmap", res, timestamp=timestamp)
-    typer.echo(typer.style(f"[nmap] saved -> {saved.resolve()}", fg=typer.colors.GREEN))
-    pretty(res)
+    _echo_nmap_errors(orch)
+    saved = _save(name, "nmap", res, timestamp=timestamp)
+    _echo(f"[nmap] saved -> {saved}", fg=typer.colors.GREEN)
+    _show("nmap", res)
 
 
 @app.command()
 def fuzz_cmd(domain: str, paths: Path = typer.Option(config.DEFAULT_PATH_WORDLIST, help="paths wordlist"),
+             concurrency: int = typer.Option(200, help="requests in flight over all hosts"),
+             per_host: int = typer.Option(10, help="requests in flight per host"),
+             rate: Optional[float] = typer.Option(None, help="max requests/sec over all hosts"),
+             per_host_rate: Optional[float] = typer.Option(None, help="max requests/sec per host"),
+             max_bytes: int = typer.Option(65536, help="body bytes read and hashed per response"),
+             follow_redirects: bool = typer.Option(False, "--follow-redirects", help="follow 3xx instead of reporting Location"),
+             ndjson: Optional[Path] = typer.Option(None, help="stream hits as NDJSON to this file ('-' for stdout)"),
+             calibrate: bool = typer.Option(True, "--calibrate/--no-calibrate", help="drop soft-404 responses using a per-host baseline"),
+             report_filtered: bool = typer.Option(False, "--report-filtered", help="also output soft-404 matches with the reason"),
+             progress: bool = typer.Option(True, "--progress/--no-progress", help="show live progress and throughput"),
+             cache: bool = typer.Option(True, "--cache/--no-cache", help="reuse cached DNS answers and liveness probes"),
+             max_age: float = typer.Option(3600.0, help="max age (s) of cached entries; DNS answers are also bounded by their TTL"),
              timestamp: bool = typer.Option(False, "--timestamp", "-t", help="append UTC timestamp to results filename"),
              debug: bool = typer.Option(False, "--debug", "-d", help="enable debug logging")):
     """
-    Fuzz paths on the first live host found and save results.
+    Fuzz paths on every live host at once and save results.
     """
+    from fuzz.scheduler import FuzzScheduler, iter_fuzz_hosts
+    from utils.output import NdjsonWriter
     logger = _make_logger("DEBUG" if debug else "INFO")
-    wl_list = load_wordlist(config.DEFAULT_WORDLIST)
-    subs_result = bruteforce_subdomains(domain, wl_list)
-    live = filter_live(list(subs_result.keys()))
+    wl_list = _words(config.DEFAULT_WORDLIST, False, domain)
+    subs_result, live, probes = resolve_and_probe(domain, wl_list, cache=_open_cache(cache, max_age))
     if not live:
-        typer.echo(typer.style("[fuzz] no live hosts found for fuzzing.", fg=typer.colors.YELLOW))
+        _echo("[fuzz] no live hosts found for fuzzing.", fg=typer.colors.YELLOW)
         raise typer.Exit(code=1)
-    target = f"https://{live[0]}"
-    typer.echo(typer.style(f"[fuzz] fuzzing {target} with {paths} entries", fg=typer.colors.BLUE))
+    targets = _fuzz_targets(probes)
     path_list = load_wordlist(paths)
-    res = fuzz_paths(target, path_list)
-    saved = save_json(f"{domain}_fuzz_first", res, timestamp=timestamp)
-    typer.echo(typer.style(f"[fuzz] saved -> {saved.resolve()}", fg=typer.colors.GREEN))
-    pretty(res)
+    _echo(f"[fuzz] fuzzing {len(targets)} hosts with {len(path_list)} paths each", fg=typer.colors.BLUE)
+    scheduler = FuzzScheduler(concurrency=concurrency, per_host=per_host, per_host_rate=per_host_rate,
+                              progress=progress and not _settings["json"], rate=rate, max_bytes=max_bytes,
+                              follow_redirects=follow_redirects, calibrate=calibrate,
+                              report_filtered=report_filtered, adaptive=_controller("fuzz", concurrency))
+    res: Dict[str, List[Dict]] = {t: [] for t in targets}
+    filtered = []
+    sink = NdjsonWriter(ndjson) if ndjson else None
+    store = _store_for(domain, timestamp)
+    try:
+        for hit in iter_fuzz_hosts(targets, path_list, scheduler=scheduler):
+            if "soft404" in hit:
+                filtered.append(hit)
+            else:
+                res[hit["target"]].append(hit)
+            if store is not None:
+                store.write("fuzz_soft404" if "soft404" in hit else "fuzz", hit)
+            if sink:
+                sink.write(hit)
+    finally:
+        if sink:
+            sink.close()
+    _echo_fuzz_stats(scheduler)
+    if filtered:
+        soft = _save(domain, "fuzz_soft404", filtered, timestamp=timestamp, records=())
+        _echo(f"[fuzz] soft-404 matches with reasons -> {soft}", fg=typer.colors.GREEN)
+    saved = _save(domain, "fuzz", res, timestamp=timestamp, records=())
+    _echo(f"[fuzz] saved -> {saved}", fg=typer.colors.GREEN)
+    _show("fuzz", res)
+
+
+@app.command()
+def diff(domain: str,
+         old: Optional[str] = typer.Option(None, help="older run: stored run id, --timestamp label or results directory (default: the run before --new)"),
+         new: Optional[str] = typer.Option(None, help="newer run, same forms as --old (default: the newest run)"),
+         db: Optional[Path] = typer.Option(None, help="SQLite result store to read run ids from (default results/results.sqlite)"),
+         timestamp: bool = typer.Option(False, "--timestamp", "-t", help="append UTC timestamp to results filename"),
+         debug: bool = typer.Option(False, "--debug", "-d", help="enable debug logging")):
+    """
+    Show what changed between two runs: subdomains/IPs, live hosts, open ports and fuzz hits.
+    """
+    from utils.diff import iter_diff, load_snapshot, previous_sources
+    logger = _make_logger("DEBUG" if debug else "INFO")
+    if old is None or new is None:
+        sources = previous_sources(domain, db, count=None)
+        if new is None and sources:
+            new = sources[-1]
+        if old is None:
+            # the run before --new when it is one of the known runs, else the newest
+            earlier = sources[:sources.index(new)] if new in sources else sources
+            old = earlier[-1] if earlier else None
+        if old is None or new is None:
+            _echo(f"[diff] need two runs of {domain} to compare; pass --old/--new", fg=typer.colors.RED)
+            raise typer.Exit(code=1)
+    _echo(f"[diff] {domain}: {old} -> {new}", fg=typer.colors.BLUE)
+
+    try:
+        before, after = load_snapshot(domain, old, db), load_snapshot(domain, new, db)
+    except ValueError as e:
+        _echo(f"[diff] {e}", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+    deltas = []
+    for d in iter_diff(before, after):
+        deltas.append(d)
+        if not _settings["summary"]:
+            _echo_delta(d)
+    saved = _save(domain, "diff", deltas, timestamp=timestamp)
+    _echo_diff_summary("diff", deltas)
+    _echo(f"[diff] saved -> {saved}", fg=typer.colors.GREEN)
+    if _settings["json"]:
+        _show("diff", deltas)
 
 
 @app.command()
 def recon(domain: str,
           wl: Path = typer.Option(config.DEFAULT_WORDLIST, help="subdomain wordlist"),
           paths: Path = typer.Option(config.DEFAULT_PATH_WORDLIST, help="paths wordlist"),
+          engine: str = typer.Option("thread", "--engine", help="DNS engine: thread or async"),
+          stream: bool = typer.Option(False, "--stream", help="read the wordlist lazily (plain or .gz)"),
+          probe_concurrency: int = typer.Option(100, help="hosts probed concurrently"),
           no_screenshots: bool = typer.Option(False, "--no-screenshots", "-n", help="skip screenshots"),
+          screenshot_workers: int = typer.Option(4, help="screenshots taken in parallel"),
+          nmap_procs: int = typer.Option(config.NMAP_PROCS, help="nmap processes run in parallel"),
+          two_phase: bool = typer.Option(False, "--two-phase", help="nmap top-ports discovery first, then service scan of open ports"),
+          cache: bool = typer.Option(True, "--cache/--no-cache", help="reuse cached DNS answers and liveness probes"),
+          max_age: float = typer.Option(3600.0, help="max age (s) of cached entries; DNS answers are also bounded by their TTL"),
+          incremental: bool = typer.Option(False, "--incremental", "-i", help="only probe/scan/fuzz hosts that are new or resolve differently since the last run, and save the diff"),
+          permute: bool = typer.Option(False, "--permute", help="generate permutations of the hits (numbers, dashes, env words) and resolve them in rounds"),
+          rounds: int = typer.Option(2, help="with --permute, generation rounds, each seeded by the previous round's hits"),
+          recurse: bool = typer.Option(False, "--recurse", help="with --permute, also bruteforce common labels under discovered non-wildcard subzones"),
           timestamp: bool = typer.Option(False, "--timestamp", "-t", help="append UTC timestamp to results filenames"),
           debug: bool = typer.Option(False, "--debug", "-d", help="enable debug logging")):
     """
-    Full recon pipeline (subdomains -> hosts -> screenshots -> nmap -> fuzz).
+    Full recon pipeline (subdomains -> hosts -> screenshots + nmap + fuzz), stages overlapping per host.
     """
+    from discovery.http_probe import iter_probe
+    from discovery.resolver_pool import ResolverPool
+    from discovery.subdomains import DEFAULT_RESOLVERS, ENGINES, iter_subdomains, make_wildcard_filter
+    from fuzz.scheduler import FuzzScheduler, iter_fuzz_hosts
+    from pipeline import Pipeline
+    from scanner.orchestrator import NmapOrchestrator
+    from screenshots.screenshots import ScreenshotEngine
+    from utils.diff import iter_diff
     logger = _make_logger("DEBUG" if debug else "INFO")
-    typer.echo(typer.style(BANNER, fg=typer.colors.GREEN, bold=True))
-    typer.echo(typer.style(f"Welcome to {TOOL_NAME} — use responsibly. Only run against authorized targets.\n", fg=typer.colors.CYAN, bold=True))
-
-    wl_list = load_wordlist(wl)
-    typer.echo(typer.style(f"[recon] running subdomain bruteforce ({len(wl_list)} entries)", fg=typer.colors.BLUE))
-    sub_result = bruteforce_subdomains(domain, wl_list)
-    save_json(f"{domain}_subdomains", sub_result, timestamp=timestamp)
-
-    live = filter_live(list(sub_result.keys()))
-    save_json(f"{domain}_live", {"live": live}, timestamp=timestamp)
-    typer.echo(typer.style(f"[recon] {len(live)} live hosts found", fg=typer.colors.BLUE))
+    if engine not in ENGINES:
+        _echo(f"[recon] unknown engine {engine!r}, expected one of {', '.join(ENGINES)}", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+    if _settings["banner"]:
+        _echo(BANNER, fg=typer.colors.GREEN, bold=True)
+        _echo(f"Welcome to {TOOL_NAME} — use responsibly. Only run against authorized targets.\n", fg=typer.colors.CYAN, bold=True)
 
-    shots = {}
+    wl_list = _words(wl, stream, domain)
+    path_list = load_wordlist(paths)
+    cache_db = _open_cache(cache, max_age)
+    sub_result: Dict[str, List[str]] = {}
+    prev_source, previous = _previous_run(domain) if incremental else (None, {})
+    prev_ips = {r["host"]: sorted(r.get("ips") or []) for r in previous.get("subdomains", [])}
+    unchanged = set()
+    if incremental:
+        label = f"run {prev_source}" if prev_source else "nothing (full run)"
+        _echo(f"[recon] incremental: comparing against {label}", fg=typer.colors.MAGENTA)
+    orch = NmapOrchestrator(procs=1, two_phase=two_phase)
+    scheduler = FuzzScheduler(adaptive=_controller("fuzz", 200))
+    dns_ctl, probe_ctl = _controller("dns", 40), _controller("probe", probe_concurrency)
+    shooter = ScreenshotEngine(workers=screenshot_workers)
+    atexit.register(shooter.close)
+    _echo(f"[recon] running subdomains -> liveness -> screenshots/nmap/fuzz as one pipeline ({_entries_label(wl_list)} entries)", fg=typer.colors.BLUE)
+
+    # each stage starts on a host as soon as the previous stage hands it over
+    gen = _permutation_engine(domain, rounds, recurse) if permute else None
+    pool = ResolverPool(DEFAULT_RESOLVERS)
+    dns_opts = dict(pool=pool, cache=cache_db, engine=engine, adaptive=dns_ctl,
+                    wildcard_filter=make_wildcard_filter(domain, pool))
+
+    def resolved():
+        yield from iter_subdomains(domain, gen.track(wl_list) if gen else wl_list, **dns_opts)
+        if gen is not None:
+            # generated hosts flow into the probe stage like bruteforce hits
+            yield from gen.iter_resolve(list(sub_result), on_round=_echo_round("recon"), **dns_opts)
+
+    def subdomains():
+        for fqdn, ips in resolved():
+            sub_result[fqdn] = ips
+            if prev_ips.get(fqdn) == sorted(ips):
+                unchanged.add(fqdn)
+                continue
+            yield fqdn
+
+    def probe(hosts):
+        for r in iter_probe(hosts, cache=cache_db, concurrency=probe_concurrency, adaptive=probe_ctl):
+            if r["live"]:
+                _echo(f"[recon] live: {_target_url(r)}", fg=typer.colors.GREEN)
+                yield r
+
+    def screenshot(r):
+        res = shooter.capture(_target_url(r))
+        _echo_screenshot("recon", res)
+        return r["host"], res
+
+    def nmap(r):
+        return _collect_nmap(orch.scan_one(r["host"], sub_result.get(r["host"], [])))
+
+    def fuzz(probes):
+        return iter_fuzz_hosts((_target_url(r) for r in probes), path_list, scheduler=scheduler)
+
+    pipe = Pipeline()
+    pipe.add("subdomains", subdomains)
+    pipe.add("probe", probe, after="subdomains", stream=True, collect=True)
     if not no_screenshots:
-        for h in live:
-            url = f"https://{h}"
-            try:
-                p = screenshot_url(url)
-                shots[h] = str(p)
-                typer.echo(typer.style(f"[recon] screenshot -> {p}", fg=typer.colors.GREEN))
-            except Exception as e:
-                shots[h] = f"error:{e}"
-    save_json(f"{domain}_screenshots", shots, timestamp=timestamp)
-
-    nmap_res = []
+        pipe.add("screenshots", screenshot, after="probe", workers=screenshot_workers, collect=True)
+    pipe.add("nmap", nmap, after="probe", workers=nmap_procs, collect=True)
+    pipe.add("fuzz", fuzz, after="probe", stream=True, collect=True)
+    results = pipe.run()
+    shooter.close()
+
+    nmap_res = [h for batch in results["nmap"] for h in batch]
+    if incremental:
+        kept = _carry_over(previous, unchanged, {h.get("addr") for h in nmap_res})
+        _echo(f"[recon] incremental: {len(unchanged)} hosts unchanged, "
+              f"{len(sub_result) - len(unchanged)} new or changed", fg=typer.colors.MAGENTA)
+        results["probe"] += kept["probes"]
+        results["fuzz"] += kept["fuzz"]
+        nmap_res += kept["nmap"]
+        if not no_screenshots:
+            results["screenshots"] += [(r["host"], {k: v for k, v in r.items() if k != "host"}) for r in kept["screenshots"]]
+
+    probes = results["probe"]
+    live = [r["host"] for r in probes]
+    fuzz_res: Dict[str, List[Dict]] = {_target_url(r): [] for r in probes}
+    for hit in results["fuzz"]:
+        fuzz_res.setdefault(hit["target"], []).append(hit)
+    shots = dict(results.get("screenshots", []))
+    _save(domain, "subdomains", sub_result, timestamp=timestamp,
+          records=[{"host": h, "ips": ips} for h, ips in sub_result.items()])
+    _save(domain, "live", {"live": live}, timestamp=timestamp, records=[{"host": h} for h in live])
+    _save(domain, "probes", probes, timestamp=timestamp)
+    _save(domain, "screenshots", shots, timestamp=timestamp, records=_screenshot_records(shots))
+    _save(domain, "nmap", nmap_res, timestamp=timestamp)
+    _save(domain, "fuzz", fuzz_res, timestamp=timestamp)
+    if prev_source:
+        current = {"subdomains": [{"host": h, "ips": ips} for h, ips in sub_result.items()],
+                   "probes": probes, "nmap": nmap_res, "fuzz": results["fuzz"]}
+        deltas = list(iter_diff(previous, current))
+        saved = _save(domain, "diff", deltas, timestamp=timestamp)
+        _echo_diff_summary("recon", deltas)
+        _echo(f"[recon] changes since run {prev_source} -> {saved}", fg=typer.colors.GREEN)
+    _echo(f"[recon] {len(live)} live hosts found", fg=typer.colors.BLUE)
+    _echo_nmap_errors(orch)
     if live:
-        try:
-            nmap_res = run_nmap(live[0])
-        except Exception as e:
-            nmap_res = {"error": str(e)}
-    save_json(f"{domain}_nmap_first", nmap_res, timestamp=timestamp)
+        _echo_fuzz_stats(scheduler)
+    timeline = pipe.timeline()
+    _save(domain, "timeline", timeline, timestamp=timestamp, records=timeline["stages"])
+    if gen is not None:
+        _save(domain, "permutations", gen.rounds, timestamp=timestamp)
+    _echo_timeline(timeline)
+
+    _echo(f"Recon for {domain} complete. Results saved in {config.RESULTS_DIR.resolve()}", fg=typer.colors.CYAN)
+    if _settings["json"]:
+        out = {"subdomains": sub_result, "live": live, "probes": probes, "screenshots": shots,
+               "nmap": nmap_res, "fuzz": fuzz_res}
+        _json_doc["results"] = {k: len(v) for k, v in out.items()} if _settings["summary"] else out
+
+
+# ---- sharding ----
+
+shard_app = typer.Typer(help="split large scopes into domain x wordlist shards run by many processes or nodes")
+app.add_typer(shard_app, name="shard")
+
+def _scope(domains: Optional[List[str]], scope: Optional[Path]) -> List[str]:
+    from utils.streams import iter_wordlist
+    out = list(domains or [])
+    if scope is not None:
+        if not scope.exists():
+            _echo(f"[shard] scope file not found: {scope.resolve()}", fg=typer.colors.RED)
+            raise typer.Exit(code=1)
+        out += list(iter_wordlist(scope))
+    if not out:
+        _echo("[shard] no domains given (pass them as arguments or with --scope)", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+    return list(dict.fromkeys(out))
+
+def _scope_name(domains: List[str]) -> str:
+    return domains[0] if len(domains) == 1 else f"{domains[0]}+{len(domains) - 1}"
+
+def _shard_global_opts() -> List[str]:
+    # settings of this run that the shard processes should share
+    opts = []
+    if _settings["adaptive"]:
+        opts.append("--adaptive")
+    if _settings["max_concurrency"]:
+        opts += ["--max-concurrency", str(_settings["max_concurrency"])]
+    if _settings["metrics"]:
+        opts.append("--metrics")
+    return opts
+
+def _shard_tasks(command: str, domains: List[str], shards: int, opts: str) -> List[Dict]:
+    import shlex
+    from sharding import make_tasks
+    try:
+        return make_tasks(command, domains, shards, shlex.split(opts), _shard_global_opts())
+    except ValueError as e:
+        _echo(f"[shard] {e}", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
 
-    fuzz_res = []
-    if live:
-        try:
-            fuzz_res = fuzz_paths(f"https://{live[0]}", load_wordlist(paths))
-        except Exception as e:
-            fuzz_res = {"error": str(e)}
-    save_json(f"{domain}_fuzz_first", fuzz_res, timestamp=timestamp)
+def _echo_shard(res: Dict):
+    tag = f"[shard] {res['shard']} {res['domain']} ({res['command']})"
+    if res["returncode"] == 0:
+        _echo(f"{tag}: {json.dumps(res['results'])} in {res['elapsed']}s", fg=typer.colors.GREEN)
+    else:
+        reason = "; ".join(res["errors"]) or f"exit code {res['returncode']}"
+        _echo(f"{tag} failed: {reason} (log: {res['log']})", fg=typer.colors.RED)
+
+def _save_merged(domain: str, dirs: List[Path], timestamp: bool) -> Dict[str, int]:
+    """Merge the shard results of `domain` into its normal result set; returns counts per kind."""
+    from sharding import merge_shards
+    merged, used = merge_shards(domain, dirs)
+    if not used:
+        return {}
+    counts = {kind: len(recs) for kind, recs in merged.items()}
+    if "subdomains" in merged:
+        _save(domain, "subdomains", {r["host"]: r.get("ips") or [] for r in merged["subdomains"]},
+              timestamp=timestamp, records=merged["subdomains"])
+    if "probes" in merged:
+        live = [r["host"] for r in merged["probes"] if r.get("live", True)]
+        _save(domain, "live", {"live": live}, timestamp=timestamp, records=[{"host": h} for h in live])
+        _save(domain, "probes", merged["probes"], timestamp=timestamp)
+    if "screenshots" in merged:
+        shots = {r["host"]: {k: v for k, v in r.items() if k != "host"} for r in merged["screenshots"]}
+        _save(domain, "screenshots", shots, timestamp=timestamp, records=merged["screenshots"])
+    if "nmap" in merged:
+        _save(domain, "nmap", merged["nmap"], timestamp=timestamp)
+    if "fuzz" in merged:
+        fuzz_res: Dict[str, List[Dict]] = {}
+        for hit in merged["fuzz"]:
+            fuzz_res.setdefault(hit.get("target"), []).append(hit)
+        _save(domain, "fuzz", fuzz_res, timestamp=timestamp, records=merged["fuzz"])
+    _echo(f"[shard] {domain}: merged {len(used)} shards -> " + ", ".join(f"{n} {k}" for k, n in counts.items()),
+          fg=typer.colors.BLUE)
+    return counts
+
+def _merge_scope(domains: List[str], base: Path, shards: Optional[int], timestamp: bool) -> Dict[str, Dict[str, int]]:
+    from sharding import shard_dirs
+    dirs = shard_dirs(base, shards)
+    if not dirs:
+        _echo(f"[shard] no shard results under {Path(base).resolve()}", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+    return {d: _save_merged(d, dirs, timestamp) for d in domains}
+
+
+@shard_app.command("run")
+def shard_run(command: str = typer.Argument(..., help="command to shard: subs, hosts-cmd, screenshots-cmd, fuzz-cmd or recon"),
+              domains: Optional[List[str]] = typer.Argument(None, help="apex domains"),
+              scope: Optional[Path] = typer.Option(None, help="file with one apex domain per line"),
+              shards: int = typer.Option(4, help="shards per domain (N)"),
+              workers: int = typer.Option(0, help="shard processes run at once (default: CPU count)"),
+              opts: str = typer.Option("", help='options passed to the command, e.g. "--no-screenshots --two-phase"'),
+              timeout: Optional[float] = typer.Option(None, help="seconds before a shard process is killed"),
+              merge: bool = typer.Option(True, "--merge/--no-merge", help="merge the shard results into one result set per domain"),
+              timestamp: bool = typer.Option(False, "--timestamp", "-t", help="append UTC timestamp to results filenames")):
+    """
+    Run every domain x shard of a command on a local pool of processes, then merge.
+    """
+    from sharding import run_tasks
+    domains = _scope(domains, scope)
+    tasks = _shard_tasks(command, domains, shards, opts)
+    _echo(f"[shard] {command}: {len(domains)} domains x {shards} shards = {len(tasks)} tasks", fg=typer.colors.BLUE)
+    done = run_tasks(tasks, config.RESULTS_DIR, workers=workers, timeout=timeout, on_done=_echo_shard)
+    failed = [r for r in done if r["returncode"] != 0]
+    saved = _save(_scope_name(domains), "shards", done, timestamp=timestamp)
+    _echo(f"[shard] {len(done) - len(failed)} shards done, {len(failed)} failed; report -> {saved}",
+          fg=typer.colors.RED if failed else typer.colors.GREEN)
+    merged = _merge_scope(domains, config.RESULTS_DIR, shards, timestamp) if merge else {}
+    _show("shard", {"tasks": len(done), "failed": len(failed), "merged": merged})
+    if failed:
+        raise typer.Exit(code=1)
 
-    typer.echo(typer.style(f"Recon for {domain} complete. Results saved in {config.RESULTS_DIR.resolve()}", fg=typer.colors.CYAN))
+
+@shard_app.command("enqueue")
+def shard_enqueue(command: str = typer.Argument(..., help="command to shard: subs, hosts-cmd, screenshots-cmd, fuzz-cmd or recon"),
+                  domains: Optional[List[str]] = typer.Argument(None, help="apex domains"),
+                  queue: Path = typer.Option(..., help="queue directory (shared by the worker nodes)"),
+                  scope: Optional[Path] = typer.Option(None, help="file with one apex domain per line"),
+                  shards: int = typer.Option(4, help="shards per domain (N)"),
+                  opts: str = typer.Option("", help='options passed to the command, e.g. "--no-screenshots --two-phase"')):
+    """
+    Write domain x shard tasks to a file queue for `shard worker` processes.
+    """
+    from sharding import FileQueue
+    domains = _scope(domains, scope)
+    n = FileQueue(queue).put(_shard_tasks(command, domains, shards, opts))
+    _echo(f"[shard] queued {n} tasks in {queue.resolve()}", fg=typer.colors.GREEN)
+
+
+@shard_app.command("worker")
+def shard_worker(queue: Path = typer.Option(..., help="queue directory written by `shard enqueue`"),
+                 workers: int = typer.Option(0, help="shard processes run at once on this node (default: CPU count)"),
+                 timeout: Optional[float] = typer.Option(None, help="seconds before a shard process is killed"),
+                 wait: bool = typer.Option(False, "--wait", help="keep polling while other nodes still run tasks"),
+                 requeue_after: Optional[float] = typer.Option(None, help="first put back tasks claimed longer ago than this (s), e.g. by a dead node")):
+    """
+    Claim and run tasks from a file queue until it is empty.
+    """
+    import os
+    from sharding import FileQueue
+    q = FileQueue(queue)
+    if requeue_after is not None:
+        n = q.requeue_stale(requeue_after)
+        if n:
+            _echo(f"[shard] requeued {n} stale tasks", fg=typer.colors.YELLOW)
+    ran = q.work(workers=workers or os.cpu_count() or 1, timeout=timeout, wait=wait, on_done=_echo_shard)
+    _echo(f"[shard] ran {ran} tasks; queue: {q.status()}", fg=typer.colors.BLUE)
+
+
+@shard_app.command("status")
+def shard_status(queue: Path = typer.Option(..., help="queue directory")):
+    """
+    Show task counts of a file queue and its failed tasks.
+    """
+    from sharding import FileQueue
+    q = FileQueue(queue)
+    status = q.status()
+    _echo(f"[shard] {queue.resolve()}: " + ", ".join(f"{n} {s}" for s, n in status.items()), fg=typer.colors.BLUE)
+    for res in q.results("failed"):
+        _echo_shard(res)
+    _show("shard", status)
+
+
+@shard_app.command("merge")
+def shard_merge(domains: Optional[List[str]] = typer.Argument(None, help="apex domains"),
+                scope: Optional[Path] = typer.Option(None, help="file with one apex domain per line"),
+                source: Optional[Path] = typer.Option(None, "--from", help="directory holding the shard-i-of-N dirs (default results/; a queue's results/ dir for queued runs)"),
+                shards: Optional[int] = typer.Option(None, help="only merge shard dirs of this N"),
+                timestamp: bool = typer.Option(False, "--timestamp", "-t", help="append UTC timestamp to results filenames")):
+    """
+    Merge shard results into one result set per domain (in results/).
+    """
+    domains = _scope(domains, scope)
+    merged = _merge_scope(domains, source or config.RESULTS_DIR, shards, timestamp)
+    _show("shard", merged)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,220 @@
+# src/pipeline.py
+"""
+Stage-level DAG pipeline.
+
+Each stage is a node fed by a bounded queue from its upstream stage; every
+item a stage produces is passed to all of its downstream stages as soon as
+it exists, so later stages work on early items while earlier ones are still
+running. A full queue blocks the producer (backpressure), and each stage has
+its own worker budget.
+
+Stage kinds:
+  source  (after=None)  fn() -> iterable of items
+  map                   fn(item) -> result or None (dropped); `workers` threads
+  stream  (stream=True) fn(iterable) -> iterable; one thread, for engines that
+                        already take a lazy input (prober, fuzz scheduler)
+
+The engine records a per-stage timeline (start, end, items in/out, items/sec,
+queue depth samples).
+"""
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from utils import metrics
+
+logger = logging.getLogger("husk")
+
+_END = object()
+
+
+class Stage:
+    def __init__(self, name: str, fn: Callable, after: Optional[str] = None, workers: int = 1,
+                 queue_size: int = 100, stream: bool = False, collect: bool = False):
+        self.name = name
+        self.fn = fn
+        self.after = after
+        self.workers = max(1, workers) if after is not None and not stream else 1
+        self.stream = stream
+        self.collect = collect
+        self.inbox: Optional[queue.Queue] = queue.Queue(maxsize=queue_size) if after is not None else None
+        self.downstream: List["Stage"] = []
+        self.results: List[Any] = []
+        self.items_in = 0
+        self.items_out = 0
+        self.errors = 0
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.max_queue = 0
+        self.queue_samples: List[List[float]] = []
+        self._lock = threading.Lock()
+        self._running = self.workers
+
+    @property
+    def kind(self) -> str:
+        if self.after is None:
+            return "source"
+        return "stream" if self.stream else "map"
+
+    def _mark_started(self):
+        with self._lock:
+            if self.started is None:
+                self.started = time.monotonic()
+
+
+class Pipeline:
+    """
+    pipe = Pipeline()
+    pipe.add("subs", lambda: iter_subdomains(...))
+    pipe.add("probe", probe_stream, after="subs", stream=True)
+    pipe.add("shots", shoot_one, after="probe", workers=4, collect=True)
+    results = pipe.run()          # {stage name: [collected items]}
+    """
+
+    def __init__(self, sample_every: float = 0.5):
+        self.stages: Dict[str, Stage] = {}
+        self.sample_every = sample_every
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    def add(self, name: str, fn: Callable, after: Optional[str] = None, workers: int = 1,
+            queue_size: int = 100, stream: bool = False, collect: bool = False) -> "Pipeline":
+        if name in self.stages:
+            raise ValueError(f"duplicate stage {name!r}")
+        if after is not None and after not in self.stages:
+            # stages are added in dependency order, which also rules out cycles
+            raise ValueError(f"stage {name!r} depends on unknown stage {after!r}")
+        stage = Stage(name, fn, after, workers, queue_size, stream, collect)
+        self.stages[name] = stage
+        if after is not None:
+            self.stages[after].downstream.append(stage)
+        return self
+
+    # ---- plumbing ----
+
+    def _emit(self, stage: Stage, item):
+        with stage._lock:
+            stage.items_out += 1
+            if stage.collect:
+                stage.results.append(item)
+        for down in stage.downstream:
+            down.inbox.put(item)
+
+    def _finish(self, stage: Stage):
+        stage.finished = time.monotonic()
+        if stage.started is None:
+            stage.started = stage.finished
+        metrics.observe("stage_seconds", stage.finished - stage.started, stage=stage.name)
+        metrics.inc("stage_items_total", stage.items_out, stage=stage.name)
+        for down in stage.downstream:
+            down.inbox.put(_END)
+
+    def _inputs(self, stage: Stage) -> Iterator:
+        while True:
+            item = stage.inbox.get()
+            if item is _END:
+                # let sibling workers see the end marker too
+                stage.inbox.put(_END)
+                return
+            stage._mark_started()
+            with stage._lock:
+                stage.items_in += 1
+            yield item
+
+    def _drain(self, stage: Stage):
+        # a failed stage keeps consuming so its upstream never blocks on a full queue
+        for _ in self._inputs(stage):
+            pass
+
+    def _run_stage(self, stage: Stage):
+        try:
+            if stage.kind == "map":
+                for item in self._inputs(stage):
+                    try:
+                        out = stage.fn(item)
+                    except Exception as e:
+                        stage.errors += 1
+                        logger.debug("[pipeline] %s failed on %r: %s", stage.name, item, e)
+                        continue
+                    if out is not None:
+                        self._emit(stage, out)
+            else:
+                if stage.kind == "source":
+                    stage._mark_started()
+                    items = stage.fn()
+                else:
+                    items = stage.fn(self._inputs(stage))
+                for out in items:
+                    if stage.kind == "source":
+                        stage.items_in += 1
+                    self._emit(stage, out)
+        except Exception as e:
+            stage.errors += 1
+            logger.error("[pipeline] stage %s aborted: %s", stage.name, e)
+            if stage.inbox is not None:
+                self._drain(stage)
+        finally:
+            with stage._lock:
+                stage._running -= 1
+                last = stage._running == 0
+            if last:
+                self._finish(stage)
+
+    def _sample(self, done: threading.Event):
+        while not done.wait(self.sample_every):
+            now = round(time.monotonic() - self.started, 2)
+            for stage in self.stages.values():
+                if stage.inbox is None or stage.finished is not None:
+                    continue
+                depth = stage.inbox.qsize()
+                stage.max_queue = max(stage.max_queue, depth)
+                stage.queue_samples.append([now, depth])
+                metrics.gauge("stage_queue_depth", depth, stage=stage.name)
+
+    # ---- public ----
+
+    def run(self) -> Dict[str, List[Any]]:
+        """Run every stage to completion; return {stage: collected items}."""
+        self.started = time.monotonic()
+        threads = []
+        for stage in self.stages.values():
+            for i in range(stage.workers):
+                t = threading.Thread(target=self._run_stage, args=(stage,),
+                                     name=f"stage-{stage.name}-{i}", daemon=True)
+                threads.append(t)
+        done = threading.Event()
+        sampler = threading.Thread(target=self._sample, args=(done,), name="stage-sampler", daemon=True)
+        sampler.start()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        done.set()
+        sampler.join()
+        self.finished = time.monotonic()
+        return {name: stage.results for name, stage in self.stages.items() if stage.collect}
+
+    def timeline(self) -> Dict:
+        """Per-stage timing relative to the pipeline start, plus the total wall time."""
+        base = self.started or 0.0
+        stages = []
+        for s in self.stages.values():
+            duration = (s.finished - s.started) if s.started is not None and s.finished is not None else None
+            stages.append({
+                "stage": s.name,
+                "kind": s.kind,
+                "after": s.after,
+                "workers": s.workers,
+                "start": round(s.started - base, 3) if s.started is not None else None,
+                "end": round(s.finished - base, 3) if s.finished is not None else None,
+                "items_in": s.items_in,
+                "items_out": s.items_out,
+                "errors": s.errors,
+                "items_per_sec": round(s.items_in / duration, 2) if duration else None,
+                "max_queue": s.max_queue,
+                "queue_samples": s.queue_samples,
+            })
+        wall = (self.finished - self.started) if self.started and self.finished else None
+        return {"wall_seconds": round(wall, 3) if wall is not None else None, "stages": stages}
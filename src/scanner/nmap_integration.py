@@ -1,36 +1,149 @@
 # src/scanner/nmap_integration.py
+"""
+nmap runner and incremental XML parser.
+
+nmap writes its -oX file as it goes; the parser follows that file while the
+process runs, feeds it to an XMLPullParser and emits each host as soon as
+its </host> closes. Finished top-level elements are dropped from the tree
+right away, so memory stays bounded by one host, not by the scan size.
+"""
+import os
 import subprocess
+import tempfile
+import time
 import xml.etree.ElementTree as ET
 from pathlib import Path
-from typing import List, Dict
+from typing import Dict, Iterable, Iterator, List, Optional
 import config
+from utils import metrics
+
+CHUNK = 65536
 
-def run_nmap(target: str, ports: str = None, extra_args: str = None) -> List[Dict]:
+@metrics.timed("run_nmap_seconds")
+def run_nmap(target: str, ports: str = None, extra_args: str = None, nmap_bin: str = None) -> List[Dict]:
     ports = ports or config.NMAP_PORTS
     extra_args = extra_args or config.NMAP_EXTRA_ARGS
-    tmp_xml = Path("tmp_nmap.xml")
-    cmd = ["nmap", *extra_args.split(), "-p", ports, "-oX", str(tmp_xml), target]
-    subprocess.run(cmd, check=False)
-    return parse_nmap_xml(tmp_xml)
+    return run_nmap_batch([target], [*extra_args.split(), "-p", ports], nmap_bin=nmap_bin)
+
+def run_nmap_batch(targets: List[str], args: List[str], nmap_bin: str = None,
+                   timeout: Optional[float] = None, tmp_dir: Optional[Path] = None) -> List[Dict]:
+    return list(iter_nmap_batch(targets, args, nmap_bin, timeout, tmp_dir))
+
+def iter_nmap_batch(targets: List[str], args: List[str], nmap_bin: str = None,
+                    timeout: Optional[float] = None, tmp_dir: Optional[Path] = None,
+                    poll: float = 0.2) -> Iterator[Dict]:
+    """
+    Run one nmap process over `targets` and yield each host while the scan is
+    still running. Output goes to a unique temp file (removed afterwards), so
+    concurrent runs never collide. Closing the iterator early stops nmap.
+    """
+    fd, name = tempfile.mkstemp(prefix="husk-nmap-", suffix=".xml", dir=tmp_dir)
+    os.close(fd)
+    xml_path = Path(name)
+    cmd = [nmap_bin or config.NMAP_BIN, *args, "-oX", str(xml_path), *targets]
+    with tempfile.TemporaryFile() as err, metrics.timer("nmap_process_seconds"):
+        proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=err)
+        metrics.inc("nmap_processes_total")
+        emitted = 0
+        try:
+            for host in iter_nmap_xml(follow_file(xml_path, proc, poll, timeout)):
+                emitted += 1
+                yield host
+            if proc.wait() != 0 and not emitted:
+                err.seek(0)
+                msg = err.read().decode(errors="replace").strip()
+                raise RuntimeError(f"nmap exited with {proc.returncode}: {msg[-500:]}")
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            xml_path.unlink(missing_ok=True)
+
+def follow_file(path: Path, proc: subprocess.Popen, poll: float = 0.2,
+                timeout: Optional[float] = None) -> Iterator[bytes]:
+    """Yield chunks appended to `path` until `proc` has exited and the file is drained."""
+    deadline = time.monotonic() + timeout if timeout else None
+    with open(path, "rb") as f:
+        while True:
+            running = proc.poll() is None
+            data = f.read(CHUNK)
+            if data:
+                yield data
+            elif not running:
+                return
+            elif deadline is not None and time.monotonic() > deadline:
+                raise subprocess.TimeoutExpired(proc.args, timeout)
+            else:
+                time.sleep(poll)
+
+def iter_nmap_xml(chunks: Iterable[bytes]) -> Iterator[Dict]:
+    """
+    Incrementally parse nmap XML and yield one dict per <host>. A document
+    cut short (nmap killed or timed out) still yields every completed host.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    root = None
+    depth = 0
+    for chunk in chunks:
+        parser.feed(chunk)
+        for event, el in parser.read_events():
+            if event == "start":
+                if root is None:
+                    root = el
+                depth += 1
+                continue
+            depth -= 1
+            if depth == 1:  # direct child of <nmaprun> is complete
+                if el.tag == "host":
+                    yield _host_record(el)
+                el.clear()
+                root.remove(el)
+    try:
+        parser.close()
+    except ET.ParseError:
+        pass
 
 def parse_nmap_xml(xml_path: Path) -> List[Dict]:
     if not xml_path.exists():
         return []
-    tree = ET.parse(xml_path)
-    root = tree.getroot()
-    results = []
-    for host in root.findall("host"):
-        addr_el = host.find("address")
-        addr = addr_el.attrib.get("addr") if addr_el is not None else None
-        ports = []
-        for p in host.findall(".//port"):
-            state = p.find("state")
-            svc = p.find("service")
-            ports.append({
-                "port": p.attrib.get("portid"),
-                "protocol": p.attrib.get("protocol"),
-                "state": state.attrib.get("state") if state is not None else None,
-                "service": svc.attrib.get("name") if svc is not None else None,
-            })
-        results.append({"addr": addr, "ports": ports})
-    return results
+    with open(xml_path, "rb") as f:
+        return list(iter_nmap_xml(iter(lambda: f.read(CHUNK), b"")))
+
+def _scripts(el: Optional[ET.Element]) -> Dict[str, str]:
+    if el is None:
+        return {}
+    return {s.get("id"): s.get("output") for s in el.findall("script")}
+
+def _host_record(host: ET.Element) -> Dict:
+    addresses = [{"addr": a.get("addr"), "type": a.get("addrtype"), "vendor": a.get("vendor")}
+                 for a in host.findall("address")]
+    # prefer the IP over a MAC address (LAN scans list both)
+    addr = next((a["addr"] for a in addresses if a["type"] in ("ipv4", "ipv6")),
+                addresses[0]["addr"] if addresses else None)
+    status = host.find("status")
+    ports = []
+    for p in host.findall("ports/port"):
+        state = p.find("state")
+        svc = p.find("service")
+        ports.append({
+            "port": p.get("portid"),
+            "protocol": p.get("protocol"),
+            "state": state.get("state") if state is not None else None,
+            "reason": state.get("reason") if state is not None else None,
+            "service": svc.get("name") if svc is not None else None,
+            "product": svc.get("product") if svc is not None else None,
+            "version": svc.get("version") if svc is not None else None,
+            "extrainfo": svc.get("extrainfo") if svc is not None else None,
+            "tunnel": svc.get("tunnel") if svc is not None else None,
+            "cpe": [c.text for c in p.findall("service/cpe")],
+            "scripts": _scripts(p),
+        })
+    return {
+        "addr": addr,
+        "addresses": addresses,
+        "hostnames": [{"name": h.get("name"), "type": h.get("type")} for h in host.findall("hostnames/hostname")],
+        "status": status.get("state") if status is not None else None,
+        "ports": ports,
+        "os": [{"name": m.get("name"), "accuracy": int(m.get("accuracy") or 0)} for m in host.findall("os/osmatch")],
+        "scripts": _scripts(host.find("hostscript")),
+    }
@@ -0,0 +1,209 @@
+# src/scanner/orchestrator.py
+"""
+Parallel nmap orchestration over many live hosts.
+
+Hosts are deduplicated by resolved IP (vhosts on one box are scanned once),
+the IPs are split into batches, and each batch is one nmap process; up to
+`procs` processes run at a time, each writing to its own temp file.
+Hosts are streamed back as each process reports them (see
+scanner.nmap_integration), with the vhost names attached.
+
+two_phase=True first runs a quick top-ports discovery pass (no service
+detection), then runs the NMAP_EXTRA_ARGS service scan only against the
+open ports found, batching IPs that share the same open-port set.
+"""
+import queue
+import socket
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import config
+from scanner.nmap_integration import iter_nmap_batch
+from utils import metrics
+
+
+def group_by_ip(hosts: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """
+    Map one scan target (IP) to the hostnames it covers. A host with several
+    IPs joins a target already picked for one of them, else its lowest IP is
+    used. Hosts given without IPs are resolved here, and scanned by name if
+    that fails.
+    """
+    targets: Dict[str, List[str]] = {}
+    for host, ips in hosts.items():
+        ips = sorted(set(ips or _lookup(host)))
+        target = next((ip for ip in ips if ip in targets), None)
+        if target is None:
+            target = ips[0] if ips else host
+        targets.setdefault(target, []).append(host)
+    return targets
+
+
+def _lookup(host: str) -> List[str]:
+    try:
+        return socket.gethostbyname_ex(host)[2]
+    except (socket.gaierror, socket.herror, UnicodeError):
+        return []
+
+
+def batched(items: List[str], size: int) -> List[List[str]]:
+    size = max(1, size)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _open_ports(host: Dict) -> Tuple[int, ...]:
+    # the discovery pass is a TCP scan
+    return tuple(sorted({int(p["port"]) for p in host["ports"]
+                         if p["state"] == "open" and p["protocol"] == "tcp"}))
+
+
+class NmapOrchestrator:
+    """
+    procs: nmap processes run at once
+    batch_size: targets per nmap process
+    ports / extra_args: single-phase scan (default NMAP_PORTS / NMAP_EXTRA_ARGS)
+    two_phase: top-ports discovery first, then extra_args on open ports only
+    top_ports / discovery_args: options of the discovery pass
+    timeout: per-process timeout (s), None = no limit
+    """
+
+    def __init__(self, procs: Optional[int] = None, batch_size: Optional[int] = None,
+                 nmap_bin: Optional[str] = None, ports: Optional[str] = None,
+                 extra_args: Optional[str] = None, two_phase: bool = False,
+                 top_ports: Optional[int] = None, discovery_args: Optional[str] = None,
+                 timeout: Optional[float] = None):
+        self.procs = max(1, procs or config.NMAP_PROCS)
+        self.batch_size = max(1, batch_size or config.NMAP_BATCH_SIZE)
+        self.nmap_bin = nmap_bin or config.NMAP_BIN
+        self.ports = ports or config.NMAP_PORTS
+        self.extra_args = (extra_args or config.NMAP_EXTRA_ARGS).split()
+        self.two_phase = two_phase
+        self.top_ports = top_ports or config.NMAP_TOP_PORTS
+        self.discovery_args = (discovery_args or config.NMAP_DISCOVERY_ARGS).split()
+        self.timeout = timeout
+        self.errors: List[Dict] = []
+        self.processes = 0
+        self._seen: Dict[str, List[str]] = {}
+        self._seen_lock = threading.Lock()
+
+    def _job(self, targets: List[str], args: List[str], discovery: bool, out: "queue.Queue",
+             stop: threading.Event, tmp_dir: Path):
+        """One nmap process: stream hosts to `out`, then report done/error."""
+        found = []
+        try:
+            hosts = iter_nmap_batch(targets, args, self.nmap_bin, self.timeout, tmp_dir)
+            try:
+                for host in hosts:
+                    if stop.is_set():
+                        break
+                    if discovery:
+                        found.append(host)
+                    else:
+                        out.put(("host", host))
+            finally:
+                hosts.close()
+            out.put(("done", found))
+        except Exception as e:
+            metrics.inc("nmap_errors_total", error=type(e).__name__)
+            out.put(("error", {"targets": targets, "error": str(e)}))
+
+    def _service_jobs(self, discovered: List[Dict]) -> List[Tuple[List[str], List[str]]]:
+        by_ports: Dict[Tuple[int, ...], List[str]] = {}
+        for host in discovered:
+            ports = _open_ports(host)
+            if ports and host["addr"]:
+                by_ports.setdefault(ports, []).append(host["addr"])
+        jobs = []
+        for ports, addrs in by_ports.items():
+            args = [*self.extra_args, "-p", ",".join(map(str, ports))]
+            jobs += [(b, args) for b in batched(addrs, self.batch_size)]
+        return jobs
+
+    def iter_scan(self, hosts: Dict[str, List[str]]) -> Iterator[Dict]:
+        """
+        Scan {hostname: [ips]} and yield each scanned address as soon as nmap
+        reports it, with the hostnames it covers under "vhosts". In two-phase
+        mode the service scan of a discovery batch starts as soon as that
+        batch is done. Failed batches are collected in self.errors.
+        """
+        groups = group_by_ip(hosts)
+        out: "queue.Queue" = queue.Queue()
+        stop = threading.Event()
+        active = 0
+
+        def tag(host: Dict) -> Dict:
+            host["vhosts"] = sorted(groups.get(host["addr"], ()))
+            return host
+
+        with tempfile.TemporaryDirectory(prefix="husk-nmap-") as tmp, \
+                ThreadPoolExecutor(max_workers=self.procs) as exe:
+
+            def submit(targets, args, discovery):
+                nonlocal active
+                active += 1
+                self.processes += 1
+                exe.submit(self._job, targets, args, discovery, out, stop, Path(tmp))
+
+            first = ([*self.discovery_args, "--top-ports", str(self.top_ports)] if self.two_phase
+                     else [*self.extra_args, "-p", self.ports])
+            for batch in batched(list(groups), self.batch_size):
+                submit(batch, first, self.two_phase)
+            try:
+                while active:
+                    kind, payload = out.get()
+                    if kind == "host":
+                        yield tag(payload)
+                        continue
+                    active -= 1
+                    if kind == "error":
+                        self.errors.append(payload)
+                        continue
+                    for targets, args in self._service_jobs(payload):
+                        submit(targets, args, False)
+                    # hosts with nothing open are still reported, with an empty port list
+                    for host in payload:
+                        if not _open_ports(host):
+                            yield tag(dict(host, ports=[]))
+            finally:
+                # consumer stopped early (or finished): let running jobs wind down
+                stop.set()
+
+    def scan_one(self, host: str, ips: List[str]) -> List[Dict]:
+        """
+        Scan a single host as it arrives (pipeline use; thread-safe). A host on
+        an IP that was already scanned is only added to that result's "vhosts".
+        """
+        with self._seen_lock:
+            ips = sorted(set(ips or _lookup(host)))
+            known = next((ip for ip in ips if ip in self._seen), None)
+            if known is not None:
+                self._seen[known].append(host)
+                return []
+            target = ips[0] if ips else host
+            vhosts = self._seen[target] = [host]
+        found = list(self.iter_scan({host: [target]}))
+        for h in found:
+            h["vhosts"] = vhosts  # shared: later hosts on this IP show up here too
+        return found
+
+    def scan(self, hosts: Dict[str, List[str]]) -> List[Dict]:
+        """Scan {hostname: [ips]} and return all scanned addresses (see iter_scan)."""
+        return sorted(self.iter_scan(hosts), key=lambda e: e["addr"] or "")
+
+
+def iter_scan_hosts(hosts: Dict[str, List[str]], **opts) -> Iterator[Dict]:
+    """Yield scanned addresses as they complete (options are NmapOrchestrator's)."""
+    return NmapOrchestrator(**opts).iter_scan(hosts)
+
+
+def scan_hosts(hosts: Dict[str, List[str]], **opts) -> List[Dict]:
+    """Scan {hostname: [ips]} with a NmapOrchestrator (options are its)."""
+    return NmapOrchestrator(**opts).scan(hosts)
+
+
+def hosts_for(live: Iterable[str], resolved: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """{hostname: [ips]} for the live hosts, from subdomain bruteforce results."""
+    return {h: resolved.get(h, []) for h in live}
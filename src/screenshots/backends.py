@@ -0,0 +1,75 @@
+# src/screenshots/backends.py
+"""
+Browser backends for the screenshot engine.
+
+A backend is one long-lived browser; the pool (screenshots.pool) hands it to
+one capture at a time and recycles it. Anything implementing this interface
+can stand in for a real browser, e.g. a fake renderer in tests.
+"""
+from typing import NamedTuple, Optional
+
+
+class Capture(NamedTuple):
+    png: bytes
+    html: str
+    final_url: str
+    title: Optional[str]
+
+
+class ScreenshotBackend:
+    """Interface: start() once, capture() many times, close() once."""
+
+    def start(self):
+        pass
+
+    def capture(self, url: str, timeout: float) -> Capture:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class SeleniumBackend(ScreenshotBackend):
+    """Headless Chrome through Selenium (driver resolved by webdriver-manager if installed)."""
+
+    def __init__(self, width: int = 1366, height: int = 768, driver_path: Optional[str] = None):
+        self.width = width
+        self.height = height
+        self.driver_path = driver_path
+        self.driver = None
+
+    def start(self):
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+
+        opts = webdriver.ChromeOptions()
+        for arg in ("--headless=new", "--disable-gpu", "--no-sandbox", "--disable-dev-shm-usage",
+                    "--ignore-certificate-errors", "--hide-scrollbars", f"--window-size={self.width},{self.height}"):
+            opts.add_argument(arg)
+        opts.accept_insecure_certs = True
+        path = self.driver_path
+        if path is None:
+            try:
+                from webdriver_manager.chrome import ChromeDriverManager
+                path = ChromeDriverManager().install()
+            except ImportError:
+                path = None  # let Selenium find chromedriver itself
+        service = Service(executable_path=path) if path else Service()
+        self.driver = webdriver.Chrome(service=service, options=opts)
+
+    def capture(self, url: str, timeout: float) -> Capture:
+        d = self.driver
+        d.set_page_load_timeout(timeout)
+        d.set_script_timeout(timeout)
+        d.get(url)
+        return Capture(d.get_screenshot_as_png(), d.page_source or "", d.current_url, d.title or None)
+
+    def close(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            finally:
+                self.driver = None
+
+
+BACKENDS = {"selenium": SeleniumBackend}
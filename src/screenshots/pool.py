@@ -0,0 +1,97 @@
+# src/screenshots/pool.py
+import logging
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List
+
+from screenshots.backends import ScreenshotBackend
+
+logger = logging.getLogger("husk")
+
+
+class _Slot:
+    def __init__(self, backend: ScreenshotBackend):
+        self.backend = backend
+        self.uses = 0
+
+
+class BrowserPool:
+    """
+    Bounded pool of long-lived browsers.
+
+    At most `size` captures run at once and at most `size` backends exist
+    (a new one is started only when none is idle). A backend is closed after
+    `recycle_after` captures (browsers grow in memory) or after a capture
+    fails, since a timed-out page can leave the browser wedged; the next
+    borrower starts a fresh one.
+    """
+
+    def __init__(self, factory: Callable[[], ScreenshotBackend], size: int = 4, recycle_after: int = 50):
+        self.factory = factory
+        self.size = max(1, size)
+        self.recycle_after = max(1, recycle_after)
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._idle: "queue.Queue[_Slot]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._live: List[_Slot] = []
+        self.started = 0
+        self.recycled = 0
+
+    def _new(self) -> _Slot:
+        backend = self.factory()
+        backend.start()
+        slot = _Slot(backend)
+        with self._lock:
+            self.started += 1
+            self._live.append(slot)
+        return slot
+
+    def _retire(self, slot: _Slot, recycled: bool = True):
+        with self._lock:
+            if slot in self._live:
+                self._live.remove(slot)
+            if recycled:
+                self.recycled += 1
+        try:
+            slot.backend.close()
+        except Exception as e:
+            logger.debug("[screenshots] closing browser failed: %s", e)
+
+    @contextmanager
+    def browser(self) -> Iterator[ScreenshotBackend]:
+        """Borrow a backend for one capture (blocks while all are busy)."""
+        self._slots.acquire()
+        try:
+            try:
+                slot = self._idle.get_nowait()
+            except queue.Empty:
+                slot = self._new()
+            ok = False
+            try:
+                yield slot.backend
+                ok = True
+            finally:
+                slot.uses += 1
+                if ok and slot.uses < self.recycle_after:
+                    self._idle.put(slot)
+                else:
+                    self._retire(slot)
+        finally:
+            self._slots.release()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            live = len(self._live)
+        return {"size": self.size, "live": live, "started": self.started, "recycled": self.recycled}
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+        with self._lock:
+            slots = list(self._live)
+        for slot in slots:
+            self._retire(slot, recycled=False)
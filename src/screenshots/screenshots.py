@@ -0,0 +1,140 @@
+# src/screenshots/screenshots.py
+"""
+Concurrent screenshot engine on top of a browser pool.
+
+Captures run on `workers` threads, each borrowing a long-lived browser from
+the pool instead of starting one per URL. Every page gets a load timeout.
+Pages whose content was already captured (same normalized DOM text, or the
+exact same PNG) are not written again; the result points at the first copy
+under "duplicate_of", so default vhosts and parked pages are stored once.
+The text only counts when there is enough of it: blank, image-only, canvas
+or JS-rendered pages all have the same (empty) text and are told apart by
+their PNG alone.
+"""
+import atexit
+import hashlib
+import re
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+import config
+from screenshots.backends import BACKENDS, ScreenshotBackend
+from screenshots.pool import BrowserPool
+from utils import metrics
+from utils.streams import imap_bounded
+
+_TAG_RE = re.compile(r"<(script|style)\b.*?</\1>|<[^>]+>", re.IGNORECASE | re.DOTALL)
+_SAFE_RE = re.compile(r"[^A-Za-z0-9._-]+")
+
+# visible text shorter than this does not identify a page
+MIN_TEXT = 32
+
+
+def content_hash(html: str) -> Optional[str]:
+    """
+    Hash of the visible text of a page (tags, scripts and whitespace ignored),
+    None when there is less than MIN_TEXT characters of it.
+    """
+    text = " ".join(_TAG_RE.sub(" ", html).split()).lower()
+    if len(text) < MIN_TEXT:
+        return None
+    return hashlib.sha1(text.encode("utf-8", errors="replace")).hexdigest()
+
+
+def _filename(url: str) -> str:
+    return _SAFE_RE.sub("_", url.split("://", 1)[-1]).strip("_")[:150] + ".png"
+
+
+class ScreenshotEngine:
+    """
+    workers: captures in flight (also the number of browsers)
+    recycle_after: captures per browser before it is restarted
+    timeout: page load timeout (s)
+    dedupe: skip writing pages already captured in this run
+    backend: factory returning a ScreenshotBackend (default: Selenium)
+    """
+
+    def __init__(self, workers: int = 4, recycle_after: int = 50, timeout: float = 15.0,
+                 outdir: Optional[Path] = None, dedupe: bool = True,
+                 backend: Optional[Callable[[], ScreenshotBackend]] = None):
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.outdir = Path(outdir or config.SCREENSHOT_DIR)
+        self.dedupe = dedupe
+        self.pool = BrowserPool(backend or BACKENDS["selenium"], size=self.workers, recycle_after=recycle_after)
+        self._seen: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.stats = {"captured": 0, "duplicates": 0, "errors": 0}
+
+    def capture(self, url: str) -> Dict:
+        """
+        Screenshot one URL. Returns {"url", "path", "final_url", "title", "hash",
+        "duplicate_of", "error"}; "path" is None on errors and for duplicates.
+        """
+        res = {"url": url, "path": None, "final_url": None, "title": None,
+               "hash": None, "duplicate_of": None, "error": None}
+        try:
+            with self.pool.browser() as browser, metrics.timer("screenshot_seconds"):
+                shot = browser.capture(url, self.timeout)
+        except Exception as e:
+            with self._lock:
+                self.stats["errors"] += 1
+            metrics.inc("screenshot_errors_total")
+            res["error"] = str(e).strip().splitlines()[0] if str(e).strip() else type(e).__name__
+            return res
+        res.update(final_url=shot.final_url, title=shot.title, hash=content_hash(shot.html))
+        keys = [k for k in (res["hash"], hashlib.sha1(shot.png).hexdigest()) if k]
+        path = self.outdir / _filename(url)
+        with self._lock:
+            first = next((self._seen[k] for k in keys if k in self._seen), None) if self.dedupe else None
+            if first is None:
+                for k in keys:
+                    self._seen[k] = str(path)
+                self.stats["captured"] += 1
+            else:
+                self.stats["duplicates"] += 1
+        if first is not None:
+            res["duplicate_of"] = first
+            return res
+        self.outdir.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(shot.png)
+        res["path"] = str(path)
+        return res
+
+    def iter_capture(self, urls: Iterable[str]) -> Iterator[Dict]:
+        """Capture many URLs concurrently, yielding results as they finish."""
+        return imap_bounded(self.capture, urls, self.workers, name="screenshots")
+
+    def close(self):
+        self.pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_default: Dict[Path, ScreenshotEngine] = {}
+_default_lock = threading.Lock()
+
+
+def _engine_for(outdir: Path) -> ScreenshotEngine:
+    with _default_lock:
+        engine = _default.get(outdir)
+        if engine is None:
+            engine = _default[outdir] = ScreenshotEngine(outdir=outdir)
+            atexit.register(engine.close)
+        return engine
+
+
+def screenshot_url(url: str, outdir: Optional[Path] = None) -> Path:
+    """
+    Screenshot a single URL with a shared default engine (browsers are reused
+    across calls). Returns the PNG path (the first copy for duplicate pages).
+    """
+    res = _engine_for(Path(outdir or config.SCREENSHOT_DIR)).capture(url)
+    if res["error"]:
+        raise RuntimeError(res["error"])
+    return Path(res["path"] or res["duplicate_of"])
@@ -0,0 +1,317 @@
+# src/sharding.py
+"""
+Sharded execution of large scopes.
+
+Work is split into domain x wordlist shards: shard i/N of a domain owns the
+candidate hosts "{word}.{domain}" whose stable hash falls in bucket i, so
+every shard resolves a disjoint, deterministic slice of the wordlist and the
+later stages (probe, screenshots, nmap, fuzz) only see the hosts it found.
+Any process given the same i/N (`--shard i/N`) picks the same slice, on any
+machine.
+
+A sharded command writes into {results}/shard-i-of-N/. Shards run as
+separate husk processes, so each has its own GIL, sockets and caches:
+
+- run_tasks: a local pool of worker processes (`husk shard run`);
+- FileQueue: a directory of task files that workers on any node sharing it
+  claim with an atomic rename (`husk shard enqueue` / `husk shard worker`).
+
+merge_shards reads the shard directories back and de-duplicates their
+records into one result set per domain (`husk shard merge`, also done by
+`husk shard run`).
+"""
+import hashlib
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from utils.diff import load_files, load_sqlite, sqlite_runs
+
+# commands taking a domain and a subdomain wordlist, i.e. the ones that can be sharded
+SHARDABLE = ("subs", "hosts-cmd", "screenshots-cmd", "fuzz-cmd", "recon")
+
+# result kinds merged back from shard directories
+MERGE_KINDS = ("subdomains", "probes", "screenshots", "nmap", "fuzz")
+
+_DIR_RE = re.compile(r"shard-(\d+)-of-(\d+)$")
+
+MAIN = Path(__file__).resolve().parent / "main.py"
+
+
+class Shard:
+    """Shard `index` (1-based) of `count`."""
+
+    def __init__(self, index: int, count: int):
+        if count < 1 or not 1 <= index <= count:
+            raise ValueError(f"invalid shard {index}/{count}: expected 1 <= i <= N")
+        self.index = index
+        self.count = count
+
+    @classmethod
+    def parse(cls, spec: str) -> "Shard":
+        """'2/8' -> Shard(2, 8)"""
+        try:
+            index, count = (int(x) for x in spec.split("/"))
+        except ValueError:
+            raise ValueError(f"invalid shard {spec!r}: expected i/N, e.g. 2/8") from None
+        return cls(index, count)
+
+    def __str__(self):
+        return f"{self.index}/{self.count}"
+
+    @property
+    def dirname(self) -> str:
+        return f"shard-{self.index}-of-{self.count}"
+
+    def owns(self, key: str) -> bool:
+        return shard_of(key, self.count) == self.index
+
+    def words(self, words: Iterable[str], domain: str) -> Iterator[str]:
+        """The wordlist entries whose candidate host belongs to this shard (lazy)."""
+        for w in words:
+            if self.owns(f"{w}.{domain}".lower()):
+                yield w
+
+
+def shard_of(key: str, count: int) -> int:
+    """Stable 1-based shard of `key` (same on every machine and Python run, unlike hash())."""
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count + 1
+
+
+def shard_dirs(base: Path, count: Optional[int] = None) -> List[Path]:
+    """shard-i-of-N directories under `base` (only those of `count` shards if given)."""
+    base = Path(base)
+    if not base.is_dir():
+        return []
+    found = []
+    for p in base.iterdir():
+        m = _DIR_RE.match(p.name)
+        if p.is_dir() and m and (count is None or int(m.group(2)) == count):
+            found.append((int(m.group(2)), int(m.group(1)), p))
+    return [p for _, _, p in sorted(found)]
+
+
+# ---- tasks ----
+
+def make_tasks(command: str, domains: Iterable[str], count: int, opts: Iterable[str] = (),
+               global_opts: Iterable[str] = ()) -> List[Dict]:
+    """One task per (domain, shard); shards of different domains are interleaved."""
+    if command not in SHARDABLE:
+        raise ValueError(f"cannot shard {command!r}, expected one of {', '.join(SHARDABLE)}")
+    domains = list(dict.fromkeys(domains))
+    return [{"id": f"{i:04d}-{_safe(d)}-{command}", "command": command, "domain": d,
+             "shard": f"{i}/{count}", "opts": list(opts), "global_opts": list(global_opts)}
+            for i in range(1, count + 1) for d in domains]
+
+
+def _safe(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", name)
+
+
+def task_argv(task: Dict) -> List[str]:
+    # shards always write ndjson: cheap to append, and what merge_shards reads fastest
+    return [sys.executable, str(MAIN), "--no-banner", "--json", "-q", "--store", "ndjson",
+            "--shard", task["shard"], *task.get("global_opts", []),
+            task["command"], task["domain"], *task.get("opts", [])]
+
+
+def run_task(task: Dict, results_dir: Path, timeout: Optional[float] = None) -> Dict:
+    """
+    Run one shard as a husk subprocess writing under `results_dir`; its stderr
+    goes to {shard dir}/{domain}_{command}.log. Returns the task with
+    "returncode", "elapsed", "results" (counts) and "errors" added.
+    """
+    results_dir = Path(results_dir)
+    out_dir = results_dir / Shard.parse(task["shard"]).dirname
+    out_dir.mkdir(parents=True, exist_ok=True)
+    log = out_dir / f"{_safe(task['domain'])}_{task['command']}.log"
+    env = dict(os.environ, RESULTS_DIR=str(results_dir))
+    t0 = time.monotonic()
+    with log.open("w", encoding="utf-8") as err:
+        try:
+            proc = subprocess.run(task_argv(task), stdout=subprocess.PIPE, stderr=err, env=env,
+                                  timeout=timeout, text=True)
+            code, out = proc.returncode, proc.stdout
+        except subprocess.TimeoutExpired:
+            code, out = None, ""
+    try:
+        doc = json.loads(out.strip().splitlines()[-1]) if out.strip() else {}
+    except ValueError:
+        doc = {}
+    errors = doc.get("errors", [])
+    if code is None:
+        errors = errors + [f"timed out after {timeout}s"]
+    return dict(task, returncode=code, elapsed=round(time.monotonic() - t0, 3),
+                results=doc.get("results"), errors=errors, log=str(log), host=socket.gethostname())
+
+
+def run_tasks(tasks: List[Dict], results_dir: Path, workers: int = 0, timeout: Optional[float] = None,
+              on_done: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+    """Run tasks on a local pool of `workers` processes (default: CPU count)."""
+    workers = workers or os.cpu_count() or 1
+    done = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="shard") as ex:
+        # each thread only waits on its subprocess; the work happens in the children
+        for res in ex.map(lambda t: run_task(t, results_dir, timeout), tasks):
+            done.append(res)
+            if on_done is not None:
+                on_done(res)
+    return done
+
+
+class FileQueue:
+    """
+    Work queue in a directory (local or shared, e.g. NFS):
+
+      pending/<id>.json  -> running/<id>.json  -> done/<id>.json | failed/<id>.json
+      results/shard-i-of-N/...                    shard outputs
+
+    Workers claim a task by renaming it out of pending/, which only one of
+    them can win.
+    """
+
+    STATES = ("pending", "running", "done", "failed")
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.results_dir = self.root / "results"
+
+    def _dir(self, state: str) -> Path:
+        d = self.root / state
+        d.mkdir(parents=True, exist_ok=True)
+        return d
+
+    def put(self, tasks: Iterable[Dict]) -> int:
+        n = 0
+        pending = self._dir("pending")
+        for task in tasks:
+            tmp = pending / f".{task['id']}.tmp"
+            tmp.write_text(json.dumps(task), encoding="utf-8")
+            tmp.rename(pending / f"{task['id']}.json")
+            n += 1
+        return n
+
+    def claim(self) -> Optional[Tuple[Path, Dict]]:
+        """Take the next pending task, or None when there is none left."""
+        running = self._dir("running")
+        for p in sorted(self._dir("pending").glob("*.json")):
+            target = running / p.name
+            try:
+                p.rename(target)
+            except FileNotFoundError:
+                continue  # another worker got it
+            os.utime(target)  # running/ mtimes tell how long a task has been claimed
+            return target, json.loads(target.read_text(encoding="utf-8"))
+        return None
+
+    def finish(self, claimed: Path, result: Dict):
+        state = "done" if result.get("returncode") == 0 else "failed"
+        out = self._dir(state) / claimed.name
+        out.write_text(json.dumps(result), encoding="utf-8")
+        claimed.unlink(missing_ok=True)
+
+    def requeue_stale(self, max_age: float) -> int:
+        """Put tasks claimed more than `max_age` seconds ago (dead workers) back in pending/."""
+        n = 0
+        now = time.time()
+        for p in self._dir("running").glob("*.json"):
+            try:
+                if now - p.stat().st_mtime > max_age:
+                    p.rename(self._dir("pending") / p.name)
+                    n += 1
+            except FileNotFoundError:
+                continue
+        return n
+
+    def status(self) -> Dict[str, int]:
+        return {s: len(list(self._dir(s).glob("*.json"))) for s in self.STATES}
+
+    def results(self, state: str = "done") -> List[Dict]:
+        return [json.loads(p.read_text(encoding="utf-8")) for p in sorted(self._dir(state).glob("*.json"))]
+
+    def work(self, workers: int = 1, timeout: Optional[float] = None, wait: bool = False,
+             poll: float = 2.0, on_done: Optional[Callable[[Dict], None]] = None) -> int:
+        """
+        Run claimed tasks on `workers` local processes until the queue is empty
+        (or, with wait=True, until nothing is pending or running any more).
+        Returns the number of tasks this call ran.
+        """
+        count = [0]
+
+        def loop():
+            while True:
+                claimed = self.claim()
+                if claimed is None:
+                    if wait and self.status()["running"]:
+                        time.sleep(poll)
+                        continue
+                    return
+                path, task = claimed
+                res = run_task(task, self.results_dir, timeout)
+                self.finish(path, res)
+                count[0] += 1
+                if on_done is not None:
+                    on_done(res)
+
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="shard-worker") as ex:
+            for f in [ex.submit(loop) for _ in range(max(1, workers))]:
+                f.result()
+        return count[0]
+
+
+# ---- merging ----
+
+def _shard_snapshot(name: str, directory: Path) -> Dict[str, Iterator[Dict]]:
+    snap = load_files(name, directory=directory, kinds=MERGE_KINDS)
+    if snap:
+        return snap
+    # shards run by hand with --store sqlite keep their records in the shard's database
+    db = directory / "results.sqlite"
+    runs = sqlite_runs(name, db, kinds=MERGE_KINDS)
+    return load_sqlite(runs[-1], db, kinds=MERGE_KINDS) if runs else {}
+
+
+def _merge_key(kind: str, rec: Dict) -> Optional[str]:
+    if kind == "nmap":
+        return rec.get("addr")
+    if kind == "fuzz":
+        return rec.get("url")
+    return rec.get("host") or rec.get("key")
+
+
+def merge_shards(name: str, dirs: Iterable[Path]) -> Tuple[Dict[str, List[Dict]], List[str]]:
+    """
+    Records of `name` from every shard directory, de-duplicated per kind
+    (hosts owned by one shard can still share an IP, so nmap records of one
+    address are merged and their vhosts united). Returns (records by kind,
+    the directories that had results).
+    """
+    merged: Dict[str, Dict[str, Dict]] = {k: {} for k in MERGE_KINDS}
+    used = []
+    for d in dirs:
+        snap = _shard_snapshot(name, Path(d))
+        if not snap:
+            continue
+        used.append(str(d))
+        for kind, recs in snap.items():
+            seen = merged[kind]
+            for rec in recs:
+                key = _merge_key(kind, rec)
+                if key is None:
+                    continue
+                prev = seen.get(key)
+                if prev is None:
+                    seen[key] = rec
+                elif kind == "nmap":
+                    prev["vhosts"] = sorted(set(prev.get("vhosts") or []) | set(rec.get("vhosts") or []))
+                elif kind == "subdomains":
+                    prev["ips"] = sorted(set(prev.get("ips") or []) | set(rec.get("ips") or []))
+    return {k: list(v.values()) for k, v in merged.items() if v}, used
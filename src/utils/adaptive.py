@@ -0,0 +1,240 @@
+# src/utils/adaptive.py
+"""
+AIMD concurrency control for the DNS, probe and fuzz engines.
+
+An AimdController owns an in-flight limit between min_limit and max_limit.
+Engines report every finished request (latency and outcome); once per window
+of about `limit` completions (one "round trip" of the pool) the controller
+decides:
+
+  - congested (throttle rate, error/timeout rate or latency against the best
+    latency seen is too high): multiply the limit by `decrease`, at most once
+    per round trip: requests started before the last decrease are not
+    counted again, and a window of only those decides nothing;
+  - healthy and the limit was actually reached: grow it, doubling per window
+    until the first congestion (slow start), then by `increase` per window.
+
+ThreadLimiter and AsyncLimiter enforce the current limit for thread pools and
+asyncio tasks. Every change is kept in `history` (and exported as a metrics
+gauge) so the chosen limits can be reported after a run.
+"""
+import asyncio
+import collections
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, List, Optional
+
+from utils import metrics
+
+# request outcomes engines report
+OK, THROTTLED, TIMEOUT, ERROR = "ok", "throttled", "timeout", "error"
+
+THROTTLE_STATUS = (429, 503)
+
+
+def http_outcome(status: Optional[int]) -> str:
+    """Outcome of an HTTP request from its status (None: no response)."""
+    if status is None:
+        return ERROR
+    return THROTTLED if status in THROTTLE_STATUS else OK
+
+
+class AimdController:
+    """
+    initial: starting limit (clamped to the bounds)
+    min_limit / max_limit: bounds of the limit
+    increase: additive step per healthy window after slow start
+    decrease: multiplicative factor on congestion
+    max_error_rate: timeouts+errors share of a window that counts as congestion
+    max_throttle_rate: 429/503/SERVFAIL share of a window that counts as congestion
+    latency_factor: window mean latency above factor * the no-load latency (the
+                    fastest answer seen, drifting up slowly) is congestion
+    latency_floor: no-load latency used when the fastest answer was quicker, so
+                   sub-millisecond jitter (cache hits, localhost) is not congestion
+    min_window: fewest completions a decision is based on
+    """
+
+    def __init__(self, initial: int, min_limit: int = 1, max_limit: int = 1000, name: str = "pool",
+                 increase: int = 2, decrease: float = 0.7, max_error_rate: float = 0.1,
+                 max_throttle_rate: float = 0.02, latency_factor: float = 3.0, latency_floor: float = 0.02,
+                 min_window: int = 10):
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError(f"invalid concurrency bounds {min_limit}..{max_limit}")
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = max(1, increase)
+        self.decrease = decrease
+        self.max_error_rate = max_error_rate
+        self.max_throttle_rate = max_throttle_rate
+        self.latency_factor = latency_factor
+        self.latency_floor = latency_floor
+        self.min_window = max(1, min_window)
+        self.limit = min(max_limit, max(min_limit, initial))
+        self.in_flight = 0
+        self.slow_start = True
+        self.best_latency: Optional[float] = None
+        self.started = time.monotonic()
+        self.history: List[Dict] = []
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+        self._reset_window()
+        self._change("start")
+
+    def _reset_window(self):
+        self._n = 0
+        self._throttled = 0
+        self._failed = 0
+        self._latency = 0.0
+        self._ok = 0
+        self._stale = 0
+        self._peak = self.in_flight
+
+    def _change(self, reason: str, **info):
+        self.history.append(dict({"t": round(time.monotonic() - self.started, 3), "limit": self.limit,
+                                  "reason": reason}, **info))
+        metrics.gauge("adaptive_limit", self.limit, pool=self.name)
+
+    # ---- limiter hooks ----
+
+    def _acquired(self):
+        self.in_flight += 1
+        if self.in_flight > self._peak:
+            self._peak = self.in_flight
+
+    def _released(self):
+        self.in_flight -= 1
+
+    # ---- feedback ----
+
+    def record(self, latency: float, outcome: str = OK):
+        """Report one finished request."""
+        now = time.monotonic()
+        with self._lock:
+            self._n += 1
+            if now - latency < self._last_decrease:
+                # sent before the last decrease: its congestion was already acted on
+                self._stale += 1
+            elif outcome == THROTTLED:
+                self._throttled += 1
+            elif outcome in (TIMEOUT, ERROR):
+                self._failed += 1
+            else:
+                self._ok += 1
+                self._latency += latency
+                if self.best_latency is None or latency < self.best_latency:
+                    self.best_latency = latency
+            if self._n >= max(self.min_window, self.limit):
+                self._decide(now)
+
+    def _decide(self, now: float):
+        if self._stale == self._n:
+            # only answers to requests sent before the last decrease: no signal either way
+            self._reset_window()
+            return
+        counted = self._n - self._stale
+        error_rate = self._failed / counted
+        throttle_rate = self._throttled / counted
+        mean = self._latency / self._ok if self._ok else None
+        slow = (mean is not None and self.best_latency is not None
+                and mean > self.latency_factor * max(self.best_latency, self.latency_floor))
+        info = {"error_rate": round(error_rate, 3), "throttle_rate": round(throttle_rate, 3),
+                "latency_ms": round(mean * 1000, 1) if mean is not None else None}
+        if throttle_rate > self.max_throttle_rate or error_rate > self.max_error_rate or slow:
+            self.slow_start = False
+            new = max(self.min_limit, int(self.limit * self.decrease))
+            self._last_decrease = now
+            if new != self.limit:
+                self.limit = new
+                self._change("decrease", **info)
+        elif self._peak >= self.limit and self.limit < self.max_limit:
+            step = self.limit if self.slow_start else self.increase
+            self.limit = min(self.max_limit, self.limit + step)
+            self._change("slow-start" if self.slow_start else "increase", **info)
+        if self.best_latency is not None:
+            # let the baseline follow a network that got slower for good
+            self.best_latency *= 1.01
+        self._reset_window()
+
+    def report(self) -> Dict:
+        with self._lock:
+            limits = [h["limit"] for h in self.history]
+            return {
+                "pool": self.name,
+                "limit": self.limit,
+                "min_seen": min(limits),
+                "max_seen": max(limits),
+                "bounds": [self.min_limit, self.max_limit],
+                "decreases": sum(1 for h in self.history if h["reason"] == "decrease"),
+                "best_latency_ms": round(self.best_latency * 1000, 1) if self.best_latency is not None else None,
+                "history": list(self.history),
+            }
+
+
+class ThreadLimiter:
+    """Blocking slot acquisition bounded by the controller's current limit."""
+
+    def __init__(self, controller: AimdController):
+        self.controller = controller
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        c = self.controller
+        with self._cond:
+            while c.in_flight >= c.limit:
+                self._cond.wait(0.1)
+            c._acquired()
+
+    def release(self):
+        with self._cond:
+            self.controller._released()
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self):
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+
+class AsyncLimiter:
+    """asyncio counterpart of ThreadLimiter (one event loop); waiters are served FIFO."""
+
+    def __init__(self, controller: AimdController):
+        self.controller = controller
+        self._waiters: "collections.deque[asyncio.Future]" = collections.deque()
+
+    async def acquire(self):
+        c = self.controller
+        if c.in_flight < c.limit and not self._waiters:
+            c._acquired()
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # granted a slot just as we were cancelled: hand it on
+                self.release()
+            raise
+
+    def release(self):
+        c = self.controller
+        c._released()
+        while self._waiters and c.in_flight < c.limit:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                c._acquired()
+                fut.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
@@ -0,0 +1,185 @@
+# src/utils/cache.py
+"""
+Persistent result cache (SQLite under config.RESULTS_DIR).
+
+- dns:   fqdn -> (ips, cname, ttl) or a negative (NXDOMAIN/NoAnswer) entry.
+         Positive entries are fresh for min(record TTL, max_age), negative
+         ones for max_age.
+- probe: (host, scheme) -> live flag and, for live hosts probed by
+         HttpProber, the probe record (status, title, server, TLS names...),
+         fresh for max_age.
+
+Freshness is decided at read time from the stored check time, so a smaller
+--max-age on a later run takes effect immediately. Writes and LRU "last used"
+touches are buffered and flushed in batches; once the store holds more than
+max_entries rows per table, the least recently used rows are evicted.
+"""
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import config
+
+MISS = object()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dns (
+    fqdn TEXT PRIMARY KEY,
+    ips TEXT,            -- JSON list, NULL for a negative answer
+    cname TEXT,
+    ttl INTEGER,
+    checked REAL NOT NULL,
+    used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS dns_used ON dns(used);
+CREATE TABLE IF NOT EXISTS probe (
+    host TEXT NOT NULL,
+    scheme TEXT NOT NULL,
+    live INTEGER NOT NULL,
+    checked REAL NOT NULL,
+    used REAL NOT NULL,
+    record TEXT,         -- JSON probe record of a live host, NULL if not kept
+    PRIMARY KEY (host, scheme)
+);
+CREATE INDEX IF NOT EXISTS probe_used ON probe(used);
+"""
+
+
+class ResultCache:
+    def __init__(self, path: Optional[Path] = None, max_age: float = 3600.0,
+                 max_entries: int = 500_000, flush_every: int = 1000):
+        self.path = Path(path) if path else config.RESULTS_DIR / "cache.sqlite"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.flush_every = flush_every
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        if "record" not in {row[1] for row in self._db.execute("PRAGMA table_info(probe)")}:
+            # caches written before probe records were kept
+            self._db.execute("ALTER TABLE probe ADD COLUMN record TEXT")
+        # pending writes/touches, keyed like the tables so reads see them
+        self._dns_pending: Dict[str, tuple] = {}
+        self._probe_pending: Dict[Tuple[str, str], tuple] = {}
+        self._dns_touched: Dict[str, float] = {}
+        self._probe_touched: Dict[Tuple[str, str], float] = {}
+        self._closed = False
+
+    # ---- dns ----
+
+    def get_dns(self, fqdn: str):
+        """Return MISS, None (cached negative answer) or (ips, cname, ttl)."""
+        now = time.time()
+        with self._lock:
+            row = self._dns_pending.get(fqdn)
+            if row is None:
+                row = self._db.execute("SELECT fqdn, ips, cname, ttl, checked FROM dns WHERE fqdn=?",
+                                       (fqdn,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return MISS
+            _, ips, cname, ttl, checked = row[:5]
+            fresh_for = self.max_age if ips is None else min(ttl or 0, self.max_age)
+            if now - checked > fresh_for:
+                self.misses += 1
+                return MISS
+            self.hits += 1
+            self._dns_touched[fqdn] = now
+        return None if ips is None else (tuple(json.loads(ips)), cname, ttl)
+
+    def put_dns(self, fqdn: str, ips=None, cname: Optional[str] = None, ttl: int = 0):
+        """Store an answer; ips=None records a negative answer."""
+        now = time.time()
+        row = (fqdn, json.dumps(list(ips)) if ips is not None else None, cname, ttl, now, now)
+        with self._lock:
+            self._dns_pending[fqdn] = row
+            self._maybe_flush()
+
+    # ---- probes ----
+
+    def get_probe(self, host: str, scheme: str):
+        """
+        Return MISS, False (not live), the cached probe record of a live
+        (host, scheme), or True if it is live but no record was kept.
+        """
+        now = time.time()
+        key = (host, scheme)
+        with self._lock:
+            row = self._probe_pending.get(key)
+            if row is None:
+                row = self._db.execute("SELECT host, scheme, live, checked, used, record FROM probe "
+                                       "WHERE host=? AND scheme=?", key).fetchone()
+            if row is None or now - row[3] > self.max_age:
+                self.misses += 1
+                return MISS
+            self.hits += 1
+            self._probe_touched[key] = now
+        if not row[2]:
+            return False
+        return json.loads(row[5]) if row[5] else True
+
+    def put_probe(self, host: str, scheme: str, live: bool, record: Optional[Dict] = None):
+        now = time.time()
+        row = (host, scheme, int(live), now, now, json.dumps(record) if live and record else None)
+        with self._lock:
+            self._probe_pending[(host, scheme)] = row
+            self._maybe_flush()
+
+    # ---- maintenance ----
+
+    def _maybe_flush(self):
+        pending = (len(self._dns_pending) + len(self._probe_pending)
+                   + len(self._dns_touched) + len(self._probe_touched))
+        if pending >= self.flush_every:
+            self._flush()
+
+    def _flush(self):
+        db = self._db
+        db.execute("BEGIN")
+        try:
+            db.executemany("INSERT OR REPLACE INTO dns VALUES (?,?,?,?,?,?)", self._dns_pending.values())
+            db.executemany("INSERT OR REPLACE INTO probe VALUES (?,?,?,?,?,?)", self._probe_pending.values())
+            db.executemany("UPDATE dns SET used=? WHERE fqdn=?",
+                           ((t, k) for k, t in self._dns_touched.items()))
+            db.executemany("UPDATE probe SET used=? WHERE host=? AND scheme=?",
+                           ((t, k[0], k[1]) for k, t in self._probe_touched.items()))
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        self._dns_pending.clear()
+        self._probe_pending.clear()
+        self._dns_touched.clear()
+        self._probe_touched.clear()
+
+    def _evict(self):
+        for table in ("dns", "probe"):
+            (count,) = self._db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()
+            excess = count - self.max_entries
+            if excess > 0:
+                self._db.execute(f"DELETE FROM {table} WHERE rowid IN "
+                                 f"(SELECT rowid FROM {table} ORDER BY used LIMIT ?)", (excess,))
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._flush()
+            self._evict()
+            self._db.close()
+            self._closed = True
+
+    def stats(self) -> Dict:
+        return {"path": str(self.path), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,284 @@
+# src/utils/diff.py
+"""
+Run-to-run diffing of recon results.
+
+A snapshot is {kind: iterable of records} for one run, loaded from the
+SQLite store (by run id) or from a result set on disk ({name}_{kind}.json,
+.ndjson, .ndjson.gz or .ndjson.zst, optionally with a --timestamp suffix).
+
+Each kind is joined on a key through a dict built from the old run, then the
+new run is streamed against it, so a diff is one pass over each side and only
+the deltas are kept:
+
+  subdomains  fqdn            -> resolved IPs
+  probes      host            -> scheme/status (a host going live or dark)
+  nmap        ip:port/proto   -> service/product/version of open ports
+  fuzz        url             -> status
+
+A delta is {"kind", "change": "added"|"removed"|"changed", "key", "old", "new"}.
+"""
+import gzip
+import io
+import json
+import re
+import sqlite3
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import config
+
+KINDS = ("subdomains", "probes", "nmap", "fuzz")
+
+_TS_RE = r"\d{8}_\d{6}"
+
+
+# ---- keys ----
+
+def _subdomain_keys(rec: Dict) -> Iterator[Tuple[str, object]]:
+    host = rec.get("host") or rec.get("key")
+    if host:
+        yield host, sorted(rec.get("ips") or rec.get("value") or [])
+
+
+def _probe_keys(rec: Dict) -> Iterator[Tuple[str, object]]:
+    if rec.get("host") and rec.get("live", True):
+        value = {"scheme": rec.get("scheme"), "status": rec.get("status")}
+        if rec.get("cached") and "status" not in rec:
+            # cached liveness without the probe record: the status is unknown, not None
+            del value["status"]
+        yield rec["host"], value
+
+
+def _nmap_keys(rec: Dict) -> Iterator[Tuple[str, object]]:
+    ip = rec.get("addr")
+    for p in rec.get("ports") or []:
+        if p.get("state") != "open":
+            continue
+        key = f"{ip}:{p.get('port')}/{p.get('protocol')}"
+        yield key, {"service": p.get("service"), "product": p.get("product"), "version": p.get("version")}
+
+
+def _fuzz_keys(rec: Dict) -> Iterator[Tuple[str, object]]:
+    if rec.get("url") and "soft404" not in rec:
+        yield rec["url"], {"status": rec.get("status")}
+
+
+KEYS: Dict[str, Callable[[Dict], Iterator[Tuple[str, object]]]] = {
+    "subdomains": _subdomain_keys,
+    "probes": _probe_keys,
+    "nmap": _nmap_keys,
+    "fuzz": _fuzz_keys,
+}
+
+
+# ---- diffing ----
+
+def _same(old: object, new: object) -> bool:
+    if isinstance(old, dict) and isinstance(new, dict):
+        # fields missing on either side (partial cached records) are not a change
+        return all(old[f] == new[f] for f in old.keys() & new.keys())
+    return old == new
+
+
+def iter_diff_kind(kind: str, old: Iterable[Dict], new: Iterable[Dict]) -> Iterator[Dict]:
+    """Deltas between two record streams of one kind (old is indexed, new is streamed)."""
+    keys = KEYS[kind]
+    index: Dict[str, object] = {}
+    for rec in old:
+        for k, v in keys(rec):
+            index[k] = v
+    seen = set()
+    for rec in new:
+        for k, v in keys(rec):
+            if k in seen:
+                continue
+            seen.add(k)
+            if k not in index:
+                yield {"kind": kind, "change": "added", "key": k, "old": None, "new": v}
+                continue
+            before = index.pop(k)
+            if not _same(before, v):
+                yield {"kind": kind, "change": "changed", "key": k, "old": before, "new": v}
+    for k, v in index.items():
+        yield {"kind": kind, "change": "removed", "key": k, "old": v, "new": None}
+
+
+def iter_diff(old: Dict[str, Iterable[Dict]], new: Dict[str, Iterable[Dict]],
+              kinds: Iterable[str] = KINDS) -> Iterator[Dict]:
+    """Deltas for every kind present in both snapshots."""
+    for kind in kinds:
+        if kind in old and kind in new:
+            yield from iter_diff_kind(kind, old[kind], new[kind])
+
+
+def diff_runs(old: Dict[str, Iterable[Dict]], new: Dict[str, Iterable[Dict]],
+              kinds: Iterable[str] = KINDS) -> List[Dict]:
+    return list(iter_diff(old, new, kinds))
+
+
+def summarize(deltas: Iterable[Dict]) -> Dict[str, Dict[str, int]]:
+    """{kind: {change: count}}"""
+    out: Dict[str, Dict[str, int]] = {}
+    for d in deltas:
+        per = out.setdefault(d["kind"], {})
+        per[d["change"]] = per.get(d["change"], 0) + 1
+    return out
+
+
+# ---- loading snapshots ----
+
+def _json_records(kind: str, data) -> List[Dict]:
+    # the pretty JSON exports are shaped per command; ndjson/sqlite already hold records
+    if kind == "subdomains" and isinstance(data, dict):
+        return [{"host": h, "ips": ips} for h, ips in data.items()]
+    if isinstance(data, dict):
+        out = []
+        for k, v in data.items():
+            if isinstance(v, dict):
+                out.append(dict(v, host=k))
+            elif isinstance(v, list):
+                out += [r for r in v if isinstance(r, dict)]
+        return out
+    return [r for r in data if isinstance(r, dict)]
+
+
+def _read_ndjson(path: Path) -> Iterator[Dict]:
+    if path.suffix == ".gz":
+        fh = gzip.open(path, "rt", encoding="utf-8")
+    elif path.suffix == ".zst":
+        import zstandard
+        fh = io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(path, "rb")), encoding="utf-8")
+    else:
+        fh = open(path, encoding="utf-8")
+    with fh:
+        for line in fh:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def _result_file(directory: Path, name: str, kind: str, label: Optional[str]) -> Optional[Path]:
+    ts = f"_({re.escape(label)})" if label else f"(?:_({_TS_RE}))?"
+    pattern = re.compile(rf"{re.escape(f'{name}_{kind}')}{ts}\.(json|ndjson(?:\.gz|\.zst)?)$")
+    best = None
+    for p in directory.iterdir():
+        m = pattern.match(p.name)
+        if m:
+            # timestamps sort chronologically; prefer ndjson over the JSON export of the same run
+            rank = (m.group(1) or "", m.group(2) != "json")
+            if best is None or rank > best[0]:
+                best = (rank, p)
+    return best[1] if best else None
+
+
+def load_files(name: str, directory: Optional[Path] = None, label: Optional[str] = None,
+               kinds: Iterable[str] = KINDS) -> Dict[str, Iterator[Dict]]:
+    """
+    Snapshot from result files in `directory` (default results/). `label` picks
+    a --timestamp suffix (e.g. 20240101_120000); without it the newest file of
+    each kind is used.
+    """
+    directory = Path(directory or config.RESULTS_DIR)
+    snap: Dict[str, Iterator[Dict]] = {}
+    if not directory.is_dir():
+        return snap
+    for kind in kinds:
+        path = _result_file(directory, name, kind, label)
+        if path is None:
+            continue
+        if path.suffix == ".json":
+            with path.open(encoding="utf-8") as f:
+                snap[kind] = iter(_json_records(kind, json.load(f)))
+        else:
+            snap[kind] = _read_ndjson(path)
+    return snap
+
+
+def labels(name: str, directory: Optional[Path] = None) -> List[str]:
+    """--timestamp labels of the result sets saved for `name`, oldest first."""
+    directory = Path(directory or config.RESULTS_DIR)
+    if not directory.is_dir():
+        return []
+    pattern = re.compile(rf"{re.escape(name)}_(?:{'|'.join(KINDS)})_({_TS_RE})\.")
+    return sorted({m.group(1) for p in directory.iterdir() for m in [pattern.match(p.name)] if m})
+
+
+def _db_path(db: Optional[Path]) -> Path:
+    return Path(db) if db else config.RESULTS_DIR / "results.sqlite"
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    # read-only: looking for runs must not leave an empty database behind
+    return sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+
+
+def sqlite_runs(name: str, db: Optional[Path] = None, kinds: Iterable[str] = KINDS) -> List[int]:
+    """Ids of the stored runs of `name` that hold results of `kinds`, oldest first."""
+    path = _db_path(db)
+    if not path.exists():
+        return []
+    kinds = list(kinds)
+    con = _connect(path)
+    try:
+        rows = con.execute(
+            f"SELECT DISTINCT r.id FROM runs r JOIN records c ON c.run = r.id "
+            f"WHERE r.name = ? AND c.kind IN ({','.join('?' * len(kinds))}) ORDER BY r.id",
+            (name, *kinds)).fetchall()
+    except sqlite3.DatabaseError:
+        return []
+    finally:
+        con.close()
+    return [r[0] for r in rows]
+
+
+def load_sqlite(run_id: int, db: Optional[Path] = None, kinds: Iterable[str] = KINDS) -> Dict[str, Iterator[Dict]]:
+    """Snapshot of one stored run; records are streamed from the database."""
+    path = _db_path(db)
+    if not path.exists():
+        raise ValueError(f"no result store at {path} (runs are stored with --store sqlite)")
+    con = _connect(path)
+    try:
+        found = con.execute("SELECT 1 FROM runs WHERE id = ?", (run_id,)).fetchone()
+    except sqlite3.DatabaseError as e:
+        raise ValueError(f"cannot read {path}: {e}") from None
+    if found is None:
+        raise ValueError(f"no run {run_id} in {path}")
+
+    def rows(kind: str) -> Iterator[Dict]:
+        for (data,) in con.execute("SELECT data FROM records WHERE run = ? AND kind = ?", (run_id, kind)):
+            yield json.loads(data)
+
+    present = {k for (k,) in con.execute("SELECT DISTINCT kind FROM records WHERE run = ?", (run_id,))}
+    return {kind: rows(kind) for kind in kinds if kind in present}
+
+
+def load_snapshot(name: str, source: str, db: Optional[Path] = None,
+                  kinds: Iterable[str] = KINDS) -> Dict[str, Iterator[Dict]]:
+    """
+    source: a stored run id ("12"), a --timestamp label ("20240101_120000"),
+    or a directory holding a result set for `name`. Raises ValueError for a
+    run that does not exist.
+    """
+    if source.isdigit():
+        return load_sqlite(int(source), db, kinds)
+    if re.fullmatch(_TS_RE, source):
+        return load_files(name, label=source, kinds=kinds)
+    snap = load_files(name, directory=Path(source), kinds=kinds)
+    if not snap:
+        raise ValueError(f"no results for {name} in {source}")
+    return snap
+
+
+def previous_sources(name: str, db: Optional[Path] = None, count: Optional[int] = 2) -> List[str]:
+    """
+    The last `count` runs (None: all) of `name` as load_snapshot sources,
+    oldest first: stored runs if the SQLite store has any, else timestamped
+    result sets, else the untimestamped result files (one run at most).
+    """
+    runs = sqlite_runs(name, db)
+    if runs:
+        return [str(r) for r in runs[-(count or len(runs)):]]
+    found = labels(name)
+    if found:
+        return found[-(count or len(found)):]
+    return [str(config.RESULTS_DIR)] if load_files(name, kinds=("subdomains",)) else []
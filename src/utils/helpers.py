@@ -1,15 +1,46 @@
 # src/utils/helpers.py
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+import ssl
+from typing import TYPE_CHECKING
 
-def requests_session(timeout: int = 6, max_retries: int = 3) -> requests.Session:
+if TYPE_CHECKING:
+    import httpx
+    import requests
+
+USER_AGENT = "husk-recon/0.1"
+
+def requests_session(timeout: int = 6, max_retries: int = 3) -> "requests.Session":
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
     s = requests.Session()
+    # 429/503 are not retried here: hammering a throttling target again is what
+    # turns rate limits into retry storms; the engines back off on those instead
     retries = Retry(total=max_retries, backoff_factor=0.3,
-                    status_forcelist=(429, 500, 502, 503, 504))
+                    status_forcelist=(500, 502, 504))
     adapter = HTTPAdapter(max_retries=retries)
     s.mount("http://", adapter)
     s.mount("https://", adapter)
-    s.headers.update({"User-Agent": "husk-recon/0.1"})
+    s.headers.update({"User-Agent": USER_AGENT})
     s.request_timeout = timeout
     return s
+
+def insecure_ssl_context() -> ssl.SSLContext:
+    # recon targets often have self-signed/mismatched certs; we still want to talk to them
+    ctx = ssl.create_default_context()
+    ctx.check_hostname = False
+    ctx.verify_mode = ssl.CERT_NONE
+    return ctx
+
+def async_http_client(concurrency: int = 100, timeout: float = 6, http2: bool = True,
+                      follow_redirects: bool = False, max_redirects: int = 5) -> "httpx.AsyncClient":
+    """Pooled httpx.AsyncClient shared by the async prober and fuzzer."""
+    import httpx
+    return httpx.AsyncClient(
+        http2=http2,
+        verify=insecure_ssl_context(),
+        timeout=httpx.Timeout(timeout),
+        limits=httpx.Limits(max_connections=concurrency * 2, max_keepalive_connections=concurrency),
+        follow_redirects=follow_redirects,
+        max_redirects=max_redirects,
+        headers={"User-Agent": USER_AGENT},
+    )
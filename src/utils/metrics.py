@@ -0,0 +1,247 @@
+# src/utils/metrics.py
+"""
+Run metrics: counters, latency histograms and gauges.
+
+Collection is off unless enable() was called (the CLI does that for
+--metrics); until then every helper below returns after one flag check, so
+instrumented hot paths cost next to nothing.
+
+  inc("dns_retries_total")
+  observe("http_request_seconds", dt, op="fuzz")
+  gauge("pool_in_flight", n, pool="screenshots")
+  with timer("nmap_batch_seconds"): ...
+
+report() gives a JSON-able dict, prometheus() the Prometheus text format.
+"""
+import bisect
+import functools
+import math
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Optional, Tuple
+
+# seconds; covers sub-ms DNS cache answers up to slow nmap batches
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+_Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+_enabled = False
+_NULL = nullcontext()
+
+
+def _key(name: str, labels: Dict) -> _Key:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (None if empty)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return self.max
+
+    def as_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "avg": round(self.sum / self.count, 6) if self.count else None,
+            "min": round(self.min, 6) if self.count else None,
+            "max": round(self.max, 6),
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "buckets": {str(b): n for b, n in zip(self.buckets, self.counts) if n},
+            "overflow": self.counts[-1],
+        }
+
+
+class Gauge:
+    """Last value, plus max and mean over every sample taken."""
+
+    def __init__(self):
+        self.value = 0.0
+        self.max = 0.0
+        self.samples = 0
+        self.total = 0.0
+
+    def set(self, value: float):
+        self.value = value
+        self.max = max(self.max, value)
+        self.samples += 1
+        self.total += value
+
+    def as_dict(self) -> Dict:
+        return {"value": self.value, "max": self.max,
+                "mean": round(self.total / self.samples, 4) if self.samples else None}
+
+
+class Registry:
+    def __init__(self):
+        self.counters: Dict[_Key, float] = {}
+        self.histograms: Dict[_Key, Histogram] = {}
+        self.gauges: Dict[_Key, Gauge] = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, n: float = 1, **labels):
+        k = _key(name, labels)
+        with self._lock:
+            self.counters[k] = self.counters.get(k, 0) + n
+
+    def observe(self, name: str, value: float, **labels):
+        k = _key(name, labels)
+        with self._lock:
+            h = self.histograms.get(k)
+            if h is None:
+                h = self.histograms[k] = Histogram()
+            h.observe(value)
+
+    def gauge(self, name: str, value: float, **labels):
+        k = _key(name, labels)
+        with self._lock:
+            g = self.gauges.get(k)
+            if g is None:
+                g = self.gauges[k] = Gauge()
+            g.set(value)
+
+    def report(self) -> Dict:
+        def rows(items, value):
+            return [{"name": n, "labels": dict(lb), **value(v)} for (n, lb), v in sorted(items)]
+
+        with self._lock:
+            return {
+                "started": self.started,
+                "elapsed_seconds": round(time.time() - self.started, 3),
+                "counters": rows(self.counters.items(), lambda v: {"value": v}),
+                "histograms": rows(self.histograms.items(), Histogram.as_dict),
+                "gauges": rows(self.gauges.items(), Gauge.as_dict),
+            }
+
+    def prometheus(self, prefix: str = "husk_") -> str:
+        def fmt(name, labels, extra=()):
+            pairs = list(labels) + list(extra)
+            inner = ",".join(f'{k}="{v}"' for k, v in pairs)
+            return f"{prefix}{name}{{{inner}}}" if inner else f"{prefix}{name}"
+
+        # samples of one metric must be contiguous, after its TYPE line
+        families: Dict[str, Tuple[str, List[str]]] = {}
+
+        def add(name, kind, line):
+            families.setdefault(name, (kind, []))[1].append(line)
+
+        with self._lock:
+            for (name, labels), v in sorted(self.counters.items()):
+                add(name, "counter", f"{fmt(name, labels)} {v}")
+            for (name, labels), g in sorted(self.gauges.items()):
+                add(name, "gauge", f"{fmt(name, labels)} {g.value}")
+                add(f"{name}_max", "gauge", f"{fmt(name + '_max', labels)} {g.max}")
+            for (name, labels), h in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, n in zip(h.buckets, h.counts):
+                    cumulative += n
+                    add(name, "histogram", f"{fmt(name + '_bucket', labels, [('le', bound)])} {cumulative}")
+                add(name, "histogram", f"{fmt(name + '_bucket', labels, [('le', '+Inf')])} {h.count}")
+                add(name, "histogram", f"{fmt(name + '_sum', labels)} {h.sum}")
+                add(name, "histogram", f"{fmt(name + '_count', labels)} {h.count}")
+        out: List[str] = []
+        for name, (kind, lines) in families.items():
+            out.append(f"# TYPE {prefix}{name} {kind}")
+            out += lines
+        return "\n".join(out) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def enable():
+    global _enabled, REGISTRY
+    REGISTRY = Registry()
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def inc(name: str, n: float = 1, **labels):
+    if _enabled:
+        REGISTRY.inc(name, n, **labels)
+
+
+def observe(name: str, value: float, **labels):
+    if _enabled:
+        REGISTRY.observe(name, value, **labels)
+
+
+def gauge(name: str, value: float, **labels):
+    if _enabled:
+        REGISTRY.gauge(name, value, **labels)
+
+
+@contextmanager
+def _timer(name: str, labels: Dict):
+    t0 = time.monotonic()
+    try:
+        yield
+    finally:
+        REGISTRY.observe(name, time.monotonic() - t0, **labels)
+
+
+def timer(name: str, **labels):
+    """Context manager observing its duration into histogram `name`."""
+    return _timer(name, labels) if _enabled else _NULL
+
+
+def timed(name: str, **labels):
+    """Decorator: time every call of a (non-generator) function."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _timer(name, labels):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+def observe_http(op: str, seconds: float, outcome):
+    """One HTTP request: latency histogram, and a counter by status class ("2xx") or "timeout"/"error"."""
+    if _enabled:
+        REGISTRY.observe("http_request_seconds", seconds, op=op)
+        REGISTRY.inc("http_requests_total", op=op, outcome=f"{outcome // 100}xx" if isinstance(outcome, int) else outcome)
+
+
+def report() -> Dict:
+    return REGISTRY.report()
+
+
+def prometheus() -> str:
+    return REGISTRY.prometheus()
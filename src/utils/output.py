@@ -1,25 +1,41 @@
 # src/utils/output.py
 import json
+import sys
 from pathlib import Path
 from datetime import datetime
+from typing import Union
 import config
 
 
-def save_json(name, data, timestamp: bool = False):
+def utc_stamp() -> str:
+    """UTC timestamp in the form result files are labelled with."""
+    return datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+
+
+def result_path(name, suffix: str = ".json", timestamp: Union[bool, str] = False) -> Path:
     """
-    Save dict `data` to results/{name}.json
-    If timestamp=True, append UTC timestamp to filename.
-    Returns Path to saved file.
+    results/{name}{suffix}, with a UTC timestamp appended to the name if
+    timestamp=True, or the given utc_stamp() label if it is a string (so
+    several files of one run share it). Creates the results dir.
     """
     config.RESULTS_DIR.mkdir(parents=True, exist_ok=True)
 
     if timestamp:
-        ts = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-        filename = f"{name}_{ts}.json"
+        ts = timestamp if isinstance(timestamp, str) else utc_stamp()
+        filename = f"{name}_{ts}{suffix}"
     else:
-        filename = f"{name}.json"
+        filename = f"{name}{suffix}"
 
-    path = config.RESULTS_DIR / filename
+    return config.RESULTS_DIR / filename
+
+
+def save_json(name, data, timestamp: bool = False):
+    """
+    Save dict `data` to results/{name}.json
+    If timestamp=True, append UTC timestamp to filename.
+    Returns Path to saved file.
+    """
+    path = result_path(name, ".json", timestamp)
     with path.open("w", encoding="utf-8") as f:
         json.dump(data, f, indent=2)
 
@@ -34,3 +50,34 @@ def pretty(data):
         print(json.dumps(data, indent=2))
     except Exception as e:
         print(f"[pretty] error: {e} -> raw={data}")
+
+
+class NdjsonWriter:
+    """
+    Append results as NDJSON (one compact JSON object per line) as they arrive.
+    path "-" writes to stdout. Use as a context manager or call close().
+    """
+
+    def __init__(self, path):
+        self.path = path
+        if str(path) == "-":
+            self._fh = sys.stdout
+        else:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._fh = open(path, "a", encoding="utf-8")
+        self.count = 0
+
+    def write(self, obj):
+        self._fh.write(json.dumps(obj, separators=(",", ":")) + "\n")
+        self._fh.flush()
+        self.count += 1
+
+    def close(self):
+        if self._fh is not sys.stdout:
+            self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
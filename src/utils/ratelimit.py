@@ -0,0 +1,33 @@
+# src/utils/ratelimit.py
+import asyncio
+import time
+from typing import Optional
+
+
+class AsyncTokenBucket:
+    """
+    Simple token bucket for asyncio code.
+    rate=None (or <= 0) disables limiting; burst defaults to one second of tokens.
+    """
+
+    def __init__(self, rate: Optional[float] = None, burst: Optional[int] = None):
+        self.rate = rate if rate and rate > 0 else None
+        self.burst = burst or (max(1, int(self.rate)) if self.rate else 1)
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    async def acquire(self):
+        if self.rate is None:
+            return
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
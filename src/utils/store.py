@@ -0,0 +1,267 @@
+# src/utils/store.py
+"""
+Result stores for streaming producers.
+
+- ndjson: one file per result kind ({name}_{kind}.ndjson[.gz|.zst]) holding
+          compact JSON lines; writes are buffered and flushed in batches.
+- sqlite: results/results.sqlite; every run is a row in `runs`, every record
+          a row in `records` indexed on host, ip, status and port, and nmap
+          ports are broken out into `ports` so runs can be queried and diffed.
+
+The pretty JSON files written by utils.output.save_json stay available as an
+export next to either store.
+"""
+import gzip
+import io
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import config
+from utils.output import result_path, utc_stamp
+
+STORES = ("json", "ndjson", "sqlite")
+COMPRESSION = ("gzip", "zstd")
+
+_SUFFIX = {None: ".ndjson", "gzip": ".ndjson.gz", "zstd": ".ndjson.zst"}
+
+
+def _dumps(rec: Dict) -> str:
+    return json.dumps(rec, separators=(",", ":"), default=str)
+
+
+def records_from(data: Any) -> List[Dict]:
+    """Flatten a result (list, or dict keyed by host/target) into records."""
+    if isinstance(data, list):
+        return [r if isinstance(r, dict) else {"value": r} for r in data]
+    if isinstance(data, dict):
+        out = []
+        for k, v in data.items():
+            if isinstance(v, dict):
+                out.append(dict(v, key=k))
+            elif isinstance(v, list) and all(isinstance(r, dict) for r in v):
+                out += v
+            else:
+                out.append({"key": k, "value": v})
+        return out
+    return [{"value": data}]
+
+
+def check_compression(compress: Optional[str]):
+    """Raise ValueError if `compress` is unknown or its module is missing."""
+    if compress is None:
+        return
+    if compress not in COMPRESSION:
+        raise ValueError(f"unknown compression {compress!r}, expected one of {COMPRESSION}")
+    if compress == "zstd":
+        try:
+            import zstandard  # noqa: F401
+        except ImportError:
+            raise ValueError("zstd compression needs the optional 'zstandard' package") from None
+
+
+class NdjsonStore:
+    def __init__(self, name: str, compress: Optional[str] = None, timestamp: bool = False,
+                 batch_size: int = 1000):
+        check_compression(compress)
+        self.name = name
+        self.compress = compress
+        # one label for every kind file of the run, however late a kind is first written
+        self.stamp = utc_stamp() if timestamp else None
+        self.batch_size = batch_size
+        self._pending: Dict[str, List[str]] = {}
+        self._files: Dict[str, Tuple[Path, io.TextIOBase]] = {}
+        self._lock = threading.Lock()
+
+    def _open(self, kind: str):
+        entry = self._files.get(kind)
+        if entry is None:
+            path = result_path(f"{self.name}_{kind}", _SUFFIX[self.compress], self.stamp or False)
+            if self.compress == "gzip":
+                fh = gzip.open(path, "wt", encoding="utf-8")
+            elif self.compress == "zstd":
+                import zstandard
+                raw = zstandard.ZstdCompressor().stream_writer(open(path, "wb"))
+                fh = io.TextIOWrapper(raw, encoding="utf-8")
+            else:
+                fh = open(path, "w", encoding="utf-8")
+            entry = self._files[kind] = (path, fh)
+        return entry
+
+    def _flush_kind(self, kind: str):
+        lines = self._pending.pop(kind, None)
+        if lines:
+            self._open(kind)[1].write("\n".join(lines) + "\n")
+
+    def write(self, kind: str, record: Dict):
+        with self._lock:
+            lines = self._pending.setdefault(kind, [])
+            lines.append(_dumps(record))
+            if len(lines) >= self.batch_size:
+                self._flush_kind(kind)
+
+    def write_many(self, kind: str, records: Iterable[Dict]):
+        for r in records:
+            self.write(kind, r)
+
+    def location(self, kind: str) -> str:
+        with self._lock:
+            return str(self._open(kind)[0].resolve())
+
+    def flush(self):
+        with self._lock:
+            for kind in list(self._pending):
+                self._flush_kind(kind)
+            for _, fh in self._files.values():
+                fh.flush()
+
+    def close(self):
+        with self._lock:
+            for kind in list(self._pending):
+                self._flush_kind(kind)
+            for _, fh in self._files.values():
+                fh.close()
+            self._files.clear()
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    command TEXT,
+    started REAL NOT NULL,
+    finished REAL
+);
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY,
+    run INTEGER NOT NULL REFERENCES runs(id),
+    kind TEXT NOT NULL,
+    host TEXT,
+    ip TEXT,
+    status INTEGER,
+    port INTEGER,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS records_run_kind ON records(run, kind);
+CREATE INDEX IF NOT EXISTS records_host ON records(host);
+CREATE INDEX IF NOT EXISTS records_ip ON records(ip);
+CREATE INDEX IF NOT EXISTS records_status ON records(status);
+CREATE INDEX IF NOT EXISTS records_port ON records(port);
+CREATE TABLE IF NOT EXISTS ports (
+    record INTEGER NOT NULL REFERENCES records(id),
+    run INTEGER NOT NULL,
+    ip TEXT,
+    port INTEGER,
+    protocol TEXT,
+    state TEXT,
+    service TEXT
+);
+CREATE INDEX IF NOT EXISTS ports_port ON ports(port);
+CREATE INDEX IF NOT EXISTS ports_ip ON ports(ip);
+CREATE INDEX IF NOT EXISTS ports_run ON ports(run);
+"""
+
+
+def _int(v) -> Optional[int]:
+    try:
+        return int(v) if v is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def index_keys(rec: Dict) -> Tuple[Optional[str], Optional[str], Optional[int], Optional[int]]:
+    """(host, ip, status, port) of a record, whatever stage produced it."""
+    url = rec.get("target") or rec.get("url")
+    host = rec.get("host") or rec.get("fqdn") or (urlsplit(url).netloc if isinstance(url, str) else None)
+    if host is None and rec.get("vhosts"):
+        host = rec["vhosts"][0]
+    ips = rec.get("ips") or [None]
+    ip = rec.get("ip") or rec.get("addr") or ips[0]
+    status = rec.get("status")
+    return host, ip, status if isinstance(status, int) else None, _int(rec.get("port"))
+
+
+class SqliteStore:
+    def __init__(self, name: str, command: Optional[str] = None, path: Optional[Path] = None,
+                 batch_size: int = 1000, started: Optional[float] = None):
+        self.path = Path(path) if path else config.RESULTS_DIR / "results.sqlite"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        cur = self._db.execute("INSERT INTO runs (name, command, started) VALUES (?,?,?)",
+                               (name, command, started or time.time()))
+        self.run_id = cur.lastrowid
+        self._pending: List[Tuple[str, Dict]] = []
+        self._closed = False
+
+    def write(self, kind: str, record: Dict):
+        with self._lock:
+            self._pending.append((kind, record))
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+
+    def write_many(self, kind: str, records: Iterable[Dict]):
+        for r in records:
+            self.write(kind, r)
+
+    def _flush(self):
+        if not self._pending:
+            return
+        db = self._db
+        db.execute("BEGIN")
+        try:
+            plain = []
+            for kind, rec in self._pending:
+                row = (self.run_id, kind, *index_keys(rec), _dumps(rec))
+                ports = rec.get("ports") if isinstance(rec.get("ports"), list) else None
+                if not ports:
+                    plain.append(row)
+                    continue
+                rid = db.execute("INSERT INTO records (run, kind, host, ip, status, port, data) "
+                                 "VALUES (?,?,?,?,?,?,?)", row).lastrowid
+                db.executemany("INSERT INTO ports VALUES (?,?,?,?,?,?,?)",
+                               [(rid, self.run_id, row[3], _int(p.get("port")), p.get("protocol"),
+                                 p.get("state"), p.get("service")) for p in ports if isinstance(p, dict)])
+            db.executemany("INSERT INTO records (run, kind, host, ip, status, port, data) "
+                           "VALUES (?,?,?,?,?,?,?)", plain)
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        self._pending.clear()
+
+    def location(self, kind: str) -> str:
+        return f"{self.path.resolve()} (run {self.run_id}, kind {kind})"
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._flush()
+            self._db.execute("UPDATE runs SET finished=? WHERE id=?", (time.time(), self.run_id))
+            self._db.close()
+            self._closed = True
+
+
+def open_store(store: str, name: str, command: Optional[str] = None, compress: Optional[str] = None,
+               timestamp: bool = False, started: Optional[float] = None):
+    """NdjsonStore/SqliteStore for `store`, or None for "json" (export files only)."""
+    if store not in STORES:
+        raise ValueError(f"unknown store {store!r}, expected one of {STORES}")
+    if store == "ndjson":
+        return NdjsonStore(name, compress=compress, timestamp=timestamp)
+    if store == "sqlite":
+        return SqliteStore(name, command=command, started=started)
+    return None
@@ -0,0 +1,165 @@
+# src/utils/streams.py
+import asyncio
+import gzip
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Iterator, Optional, TypeVar
+
+from utils import metrics
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_DONE = object()
+
+
+def _is_gzip(path: Path) -> bool:
+    if path.suffix == ".gz":
+        return True
+    with path.open("rb") as f:
+        return f.read(2) == _GZIP_MAGIC
+
+
+def iter_wordlist(path: Path) -> Iterator[str]:
+    """
+    Lazily yield wordlist entries (one per line), skipping blanks and #comments.
+    gzip-compressed wordlists are detected by suffix or magic bytes.
+    """
+    path = Path(path)
+    if not path.exists():
+        return
+    opener = gzip.open if _is_gzip(path) else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            entry = line.strip()
+            if entry and not line.startswith("#"):
+                yield entry
+
+
+def imap_bounded(fn: Callable[[T], R], items: Iterable[T], workers: int,
+                 window: int = 0, name: str = "imap",
+                 limit: Optional[Callable[[], int]] = None) -> Iterator[R]:
+    """
+    Like ThreadPoolExecutor.map, but unordered and lazy: a feeder thread pulls
+    from `items` while at most `window` (default 2*workers) calls are pending,
+    and results are yielded as soon as each call completes. Memory stays
+    proportional to the window, not to the number of items. With metrics on,
+    in-flight calls and worker utilization are sampled as gauges labelled `name`.
+
+    `limit` (e.g. an adaptive controller's current limit) caps the window at
+    limit(), re-read as calls complete: the pool only starts a thread when a
+    call is pending and no thread is idle, so it grows with the limit (up to
+    `workers`) instead of starting `workers` threads up front.
+    """
+    window = max(1, window or workers * 2)
+    done_q: "queue.Queue" = queue.Queue()
+    room = threading.Condition()
+    stop = threading.Event()
+    state = {"submitted": 0, "completed": 0, "error": None}
+
+    def full() -> bool:
+        cap = min(window, max(1, limit())) if limit is not None else window
+        return state["submitted"] - state["completed"] >= cap
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as exe:
+
+        def feed():
+            try:
+                for item in items:
+                    with room:
+                        while full() and not stop.is_set():
+                            room.wait(0.1)
+                    if stop.is_set():
+                        return
+                    state["submitted"] += 1
+                    exe.submit(fn, item).add_done_callback(done_q.put)
+            except BaseException as e:  # surfaced to the consumer below
+                state["error"] = e
+            finally:
+                done_q.put(_DONE)
+
+        feeder = threading.Thread(target=feed, name="imap-feeder", daemon=True)
+        feeder.start()
+        fed_all = False
+        completed = 0
+        try:
+            while not fed_all or completed < state["submitted"]:
+                fut = done_q.get()
+                if fut is _DONE:
+                    fed_all = True
+                    continue
+                completed += 1
+                with room:
+                    state["completed"] = completed
+                    room.notify()
+                if metrics.enabled():
+                    pending = state["submitted"] - completed
+                    metrics.gauge("pool_in_flight", pending, pool=name)
+                    metrics.gauge("pool_utilization", min(pending, workers) / max(1, workers), pool=name)
+                yield fut.result()
+            if state["error"] is not None and not stop.is_set():
+                raise state["error"]
+        finally:
+            # consumer stopped early (or finished): tell the feeder to quit
+            stop.set()
+
+
+def iter_from_async(produce: Callable[[Callable[[T], Awaitable[None]], threading.Event], Awaitable[None]],
+                    buffer: int = 1000, name: str = "async-iter") -> Iterator[T]:
+    """
+    Bridge an asyncio producer to a synchronous iterator.
+
+    `produce(emit, stop)` must return a coroutine; it runs on its own event loop
+    in a background thread and calls `await emit(item)` for every result. At
+    most `buffer` unconsumed items are held (emit waits when full), and `stop`
+    is set when the consumer goes away so the producer can wind down.
+    """
+    items: "queue.Queue" = queue.Queue(maxsize=buffer)
+    stop = threading.Event()
+
+    async def emit(item):
+        while not stop.is_set():
+            try:
+                items.put_nowait(item)
+                return
+            except queue.Full:
+                await asyncio.sleep(0.05)
+
+    def run():
+        try:
+            asyncio.run(produce(emit, stop))
+        except BaseException as e:
+            if not stop.is_set():
+                items.put(e)
+        finally:
+            if not stop.is_set():
+                items.put(_DONE)
+
+    t = threading.Thread(target=run, name=name, daemon=True)
+    t.start()
+    try:
+        while True:
+            item = items.get()
+            if item is _DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+
+async def aiter_sync(items: Iterable[T]) -> AsyncIterator[T]:
+    """
+    Iterate a (possibly blocking) synchronous iterable from async code; each
+    next() runs in a worker thread so the event loop is never blocked.
+    """
+    it = iter(items)
+    while True:
+        item = await asyncio.to_thread(next, it, _DONE)
+        if item is _DONE:
+            return
+        yield item
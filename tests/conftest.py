@@ -0,0 +1,31 @@
+# tests/conftest.py
+import sys
+from pathlib import Path
+
+import pytest
+
+# the code runs from src/ (namespace packages, no install step)
+ROOT = Path(__file__).resolve().parent.parent
+for p in (ROOT / "src", ROOT):
+    if str(p) not in sys.path:
+        sys.path.insert(0, str(p))
+
+from tests.stubs import StubDns  # noqa: E402
+
+
+@pytest.fixture
+def stub_dns():
+    """Start a StubDns(answers, **opts); skips the test where port 53 cannot be bound."""
+    started = []
+
+    def start(answers, **opts):
+        try:
+            srv = StubDns(answers, **opts).__enter__()
+        except OSError as e:
+            pytest.skip(f"stub DNS server unavailable: {e}")
+        started.append(srv)
+        return srv
+
+    yield start
+    for srv in started:
+        srv.__exit__(None, None, None)
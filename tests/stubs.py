@@ -0,0 +1,197 @@
+# tests/stubs.py
+"""
+Local stand-ins for the network, used by the tests and by bench/.
+
+- StubDns:  UDP nameserver answering A queries from a dict (NXDOMAIN
+            otherwise), on a loopback address and port 53 because
+            ResolverPool only takes nameserver addresses; `delay` stands in
+            for network latency.
+- StubHttp: asyncio HTTP/1.1 server (keep-alive) answering from a
+            handler(path) -> (status, headers, body), with an optional
+            per-request delay; it counts requests and peak concurrency.
+            With max_in_flight it answers 429 to requests beyond that many
+            at once, like a rate-limiting target.
+
+Both run in a daemon thread and are context managers. forked_http runs a
+StubHttp in a child process instead, so a benchmark's client does not share
+the GIL with its server.
+"""
+import asyncio
+import multiprocessing
+import queue
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import dns.message
+import dns.rcode
+import dns.rrset
+
+Response = Tuple[int, Dict[str, str], bytes]
+
+
+class StubDns:
+    def __init__(self, answers: Dict[str, List[str]], host: str = "127.0.0.2", ttl: int = 60,
+                 delay: float = 0.0):
+        self.answers = {k.rstrip(".").lower(): v for k, v in answers.items()}
+        self.host = host
+        self.ttl = ttl
+        self.delay = delay
+        self.queries = 0
+        self._sock: Optional[socket.socket] = None
+        self._delayed: "queue.Queue" = queue.Queue()
+        self._stop = threading.Event()
+
+    def __enter__(self) -> "StubDns":
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.bind((self.host, 53))
+        self._sock.settimeout(0.1)
+        self._loop_thread = threading.Thread(target=self._loop, name="stub-dns", daemon=True)
+        self._loop_thread.start()
+        if self.delay:
+            threading.Thread(target=self._send_delayed, name="stub-dns-delay", daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._loop_thread.join()
+        self._sock.close()
+
+    def _answer(self, data: bytes, addr):
+        q = dns.message.from_wire(data)
+        r = dns.message.make_response(q)
+        ips = self.answers.get(q.question[0].name.to_text().rstrip(".").lower())
+        if ips:
+            r.answer.append(dns.rrset.from_text(q.question[0].name, self.ttl, "IN", "A", *ips))
+        else:
+            r.set_rcode(dns.rcode.NXDOMAIN)
+        try:
+            self._sock.sendto(r.to_wire(), addr)
+        except OSError:
+            pass
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                data, addr = self._sock.recvfrom(4096)
+            except socket.timeout:
+                continue
+            self.queries += 1
+            if self.delay:
+                self._delayed.put((time.monotonic() + self.delay, data, addr))
+            else:
+                self._answer(data, addr)
+
+    def _send_delayed(self):
+        # constant delay: answers are due in arrival order
+        while True:
+            due, data, addr = self._delayed.get()
+            wait = due - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._answer(data, addr)
+
+
+class StubHttp:
+    def __init__(self, handler: Callable[[str], Response], delay: float = 0.0,
+                 max_in_flight: Optional[int] = None):
+        self.handler = handler
+        self.delay = delay
+        self.max_in_flight = max_in_flight
+        self.requests = 0
+        self.throttled = 0
+        self.in_flight = 0
+        self.peak = 0
+        self.port = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ready = threading.Event()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self) -> "StubHttp":
+        self._thread = threading.Thread(target=self._run, name="stub-http", daemon=True)
+        self._thread.start()
+        self._ready.wait(5)
+        return self
+
+    def __exit__(self, *exc):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        server = self._loop.run_until_complete(asyncio.start_server(self._conn, "127.0.0.1", 0))
+        self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+        server.close()
+        for task in asyncio.all_tasks(self._loop):
+            task.cancel()
+        self._loop.run_until_complete(asyncio.sleep(0))
+        self._loop.close()
+
+    async def _conn(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    return
+                method, target = line.decode("latin-1").split()[:2]
+                while (await reader.readline()) not in (b"\r\n", b""):
+                    pass
+                self.requests += 1
+                self.in_flight += 1
+                self.peak = max(self.peak, self.in_flight)
+                try:
+                    if self.delay:
+                        await asyncio.sleep(self.delay)
+                    if self.max_in_flight is not None and self.in_flight > self.max_in_flight:
+                        self.throttled += 1
+                        status, headers, body = 429, {}, b"slow down"
+                    else:
+                        status, headers, body = self.handler(target)
+                finally:
+                    self.in_flight -= 1
+                head = [f"HTTP/1.1 {status} X", f"Content-Length: {len(body)}"]
+                head += [f"{k}: {v}" for k, v in headers.items()]
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1")
+                             + (b"" if method == "HEAD" else body))
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+@contextmanager
+def forked_http(handler: Callable[[str], Response], delay: float = 0.0,
+                max_in_flight: Optional[int] = None) -> Iterator[str]:
+    """StubHttp in a forked child process; yields its base URL."""
+    ctx = multiprocessing.get_context("fork")
+    parent, child = ctx.Pipe()
+
+    def serve():
+        with StubHttp(handler, delay, max_in_flight) as srv:
+            child.send(srv.url)
+            child.recv()  # until the parent is done
+
+    proc = ctx.Process(target=serve, daemon=True)
+    proc.start()
+    try:
+        yield parent.recv()
+    finally:
+        parent.send(None)
+        proc.join(5)
+        if proc.is_alive():
+            proc.kill()
+
+
+def timed(fn, *args, **kwargs):
+    """(result, seconds) of one call."""
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, time.perf_counter() - t0
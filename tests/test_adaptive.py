@@ -0,0 +1,56 @@
+# tests/test_adaptive.py
+from fuzz.scheduler import FuzzScheduler, fuzz_hosts
+from tests.stubs import forked_http
+from utils.adaptive import OK, THROTTLED, AimdController
+
+
+def _window(c, outcome=OK, latency=0.0):
+    """One full window of completions with the pool at its limit."""
+    n = max(c.min_window, c.limit)
+    for _ in range(n):
+        c._acquired()
+    for _ in range(n):
+        c.record(latency, outcome)
+        c._released()
+
+
+def test_slow_start_doubles_up_to_the_bound():
+    c = AimdController(4, max_limit=50, min_window=4)
+    for _ in range(5):
+        _window(c)
+    assert [h["limit"] for h in c.history] == [4, 8, 16, 32, 50]
+    assert c.report()["decreases"] == 0
+
+
+def test_throttling_cuts_once_per_round_trip_then_grows_additively():
+    c = AimdController(100, min_window=4)
+    _window(c, THROTTLED)
+    assert c.limit == 70 and not c.slow_start
+    # answers to requests sent before the cut are not counted again
+    _window(c, THROTTLED, latency=60.0)
+    assert c.limit == 70 and c.report()["decreases"] == 1
+    _window(c)
+    assert c.limit == 72
+
+
+def test_limit_settles_near_a_throttling_servers_cap():
+    # the server runs in its own process so its timing does not depend on the client's GIL
+    with forked_http(lambda p: (404, {}, b""), delay=0.02, max_in_flight=10) as url:
+        ctl = AimdController(200, min_limit=2, max_limit=200, name="fuzz")
+        sch = FuzzScheduler(per_host=200, max_errors=10**6, max_retries=1000, backoff=0.0,
+                            calibrate=False, adaptive=ctl)
+        fuzz_hosts([url], [f"p{i}" for i in range(1500)], scheduler=sch)
+    limits = [h["limit"] for h in ctl.history]
+    assert limits[0] == 200 and ctl.report()["decreases"] >= 5
+    assert all(5 <= l <= 20 for l in limits[-10:]), limits
+    st = sch.host_summaries()[0]
+    assert st["backoffs"] and st["done"] == 1500 and st["throttled"] == 0
+
+
+def test_limit_grows_against_an_unthrottled_server():
+    with forked_http(lambda p: (404, {}, b""), delay=0.02) as url:
+        ctl = AimdController(4, min_limit=2, max_limit=32, name="fuzz")
+        sch = FuzzScheduler(per_host=32, calibrate=False, adaptive=ctl)
+        fuzz_hosts([url], [f"p{i}" for i in range(600)], scheduler=sch)
+    assert [h["reason"] for h in ctl.history[1:4]] == ["slow-start"] * 3
+    assert ctl.report()["max_seen"] == 32
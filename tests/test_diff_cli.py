@@ -0,0 +1,43 @@
+# tests/test_diff_cli.py
+import pytest
+from typer.testing import CliRunner
+
+import config
+from utils.store import SqliteStore
+
+DOMAIN = "example.com"
+
+
+@pytest.fixture
+def runs(tmp_path, monkeypatch):
+    """Three stored runs of DOMAIN, each finding one more subdomain."""
+    monkeypatch.setattr(config, "RESULTS_DIR", tmp_path)
+    for n in range(1, 4):
+        store = SqliteStore(DOMAIN, command="subs")
+        store.write_many("subdomains", [{"host": f"h{i}.{DOMAIN}", "ips": ["10.0.0.1"]} for i in range(n)])
+        store.close()
+    return tmp_path / "results.sqlite"
+
+
+@pytest.mark.parametrize("args, compared, added", [
+    ([], "2 -> 3", "h2."),
+    (["--new", "2"], "1 -> 2", "h1."),
+    (["--old", "1"], "1 -> 3", "h2."),
+])
+def test_missing_side_defaults_to_the_stored_runs(runs, args, compared, added):
+    from main import app
+    res = CliRunner().invoke(app, ["diff", DOMAIN, "--db", str(runs), *args])
+    assert res.exit_code == 0, res.output
+    assert f"{DOMAIN}: {compared}" in res.output
+    assert added in res.output
+
+
+def test_single_run_is_an_error(tmp_path, monkeypatch):
+    from main import app
+    monkeypatch.setattr(config, "RESULTS_DIR", tmp_path)
+    store = SqliteStore(DOMAIN)
+    store.write("subdomains", {"host": f"a.{DOMAIN}"})
+    store.close()
+    res = CliRunner().invoke(app, ["diff", DOMAIN, "--new", "1"])
+    assert res.exit_code == 1
+    assert "need two runs" in res.output
@@ -0,0 +1,20 @@
+# tests/test_dns_engines.py
+import pytest
+
+from discovery.resolver_pool import ResolverPool
+from discovery.subdomains import ENGINES, iter_subdomains
+
+DOMAIN = "engines.test"
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_engines_find_every_hit_once(stub_dns, engine):
+    words = [f"w{i}" for i in range(600)]
+    expected = {f"w{i}.{DOMAIN}" for i in range(0, 600, 7)}
+    srv = stub_dns({h: ["10.0.0.7"] for h in expected}, delay=0.002)
+    hits = list(iter_subdomains(DOMAIN, iter(words), workers=50, engine=engine,
+                                pool=ResolverPool([srv.host]), timeout=3.0))
+    assert sorted(f for f, _ in hits) == sorted(expected)
+    assert all(ips == ["10.0.0.7"] for _, ips in hits)
+    # one query per label plus the apex wildcard fingerprint
+    assert srv.queries <= len(words) + 5
@@ -0,0 +1,32 @@
+# tests/test_nmap_xml.py
+from scanner.nmap_integration import iter_nmap_xml
+
+HEAD = b'<?xml version="1.0"?>\n<nmaprun scanner="nmap">\n'
+HOST = (b'<host><status state="up"/><address addr="10.0.0.%d" addrtype="ipv4"/>'
+        b'<ports><port protocol="tcp" portid="80"><state state="open" reason="syn-ack"/>'
+        b'<service name="http"/></port></ports></host>\n')
+
+
+def test_hosts_are_yielded_before_the_document_ends():
+    fed = []
+
+    def chunks():
+        yield HEAD
+        for i in range(3):
+            fed.append(i)
+            yield HOST % i
+        fed.append("end")
+        yield b"</nmaprun>\n"
+
+    seen = []
+    for host in iter_nmap_xml(chunks()):
+        seen.append((host["addr"], list(fed)))
+    assert [a for a, _ in seen] == ["10.0.0.0", "10.0.0.1", "10.0.0.2"]
+    assert all("end" not in f for _, f in seen)
+
+
+def test_truncated_scan_keeps_completed_hosts():
+    doc = HEAD + HOST % 1 + HOST % 2 + (HOST % 3)[:60]
+    hosts = list(iter_nmap_xml(doc[i:i + 7] for i in range(0, len(doc), 7)))
+    assert [h["addr"] for h in hosts] == ["10.0.0.1", "10.0.0.2"]
+    assert hosts[0]["ports"][0]["service"] == "http"
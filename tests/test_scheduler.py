@@ -0,0 +1,30 @@
+# tests/test_scheduler.py
+from fuzz.scheduler import FuzzScheduler, fuzz_hosts
+from tests.stubs import StubHttp
+
+
+def _handler(path):
+    if path == "/throttled":
+        return 429, {"Retry-After": "0"}, b"slow down"
+    if path == "/busy":
+        return 503, {}, b"busy"
+    if path == "/ok":
+        return 200, {}, b"<html>ok</html>"
+    return 404, {}, b""
+
+
+def test_throttle_answers_are_never_hits():
+    with StubHttp(_handler) as srv:
+        sch = FuzzScheduler(concurrency=4, per_host=2, max_retries=2, backoff=0.01, calibrate=False)
+        out = fuzz_hosts([srv.url], ["ok", "throttled", "busy", "missing"], scheduler=sch)
+    assert [h["url"].rsplit("/", 1)[1] for h in out[srv.url]] == ["ok"]
+    st = sch.host_summaries()[0]
+    assert st["throttled"] == 2
+    assert st["backoffs"] >= 2
+
+
+def test_per_host_cap_holds_during_calibration():
+    with StubHttp(lambda p: (404, {}, b"nope"), delay=0.01) as srv:
+        sch = FuzzScheduler(concurrency=8, per_host=2, calibrate=True)
+        fuzz_hosts([srv.url], [f"p{i}" for i in range(20)] + ["a.php", "b.js"], scheduler=sch)
+        assert srv.peak <= 2
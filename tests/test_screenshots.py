@@ -0,0 +1,31 @@
+# tests/test_screenshots.py
+from screenshots.backends import Capture, ScreenshotBackend
+from screenshots.screenshots import ScreenshotEngine
+
+PAGES = {
+    # url: (png, html)
+    "http://blank-a": (b"png-a", "<html><body></body></html>"),
+    "http://blank-b": (b"png-b", "<html><body>  \n </body></html>"),
+    "http://canvas": (b"png-c", "<html><body><canvas></canvas><script>draw()</script></body></html>"),
+    "http://parked-1": (b"png-p1", "<html><body>This domain is parked. Buy it now at example registrar!</body></html>"),
+    "http://parked-2": (b"png-p2", "<html><body>This domain is   parked. Buy it now at example registrar!</body></html>"),
+    "http://same-png": (b"png-a", "<html><body></body></html>"),
+}
+
+
+class FakeBrowser(ScreenshotBackend):
+    def capture(self, url, timeout):
+        png, html = PAGES[url]
+        return Capture(png=png, html=html, final_url=url, title=None)
+
+
+def test_blank_pages_are_deduped_on_png_only(tmp_path):
+    with ScreenshotEngine(workers=1, outdir=tmp_path, backend=FakeBrowser) as engine:
+        res = {r["url"]: r for r in map(engine.capture, PAGES)}
+    for url in ("http://blank-a", "http://blank-b", "http://canvas", "http://parked-1"):
+        assert res[url]["path"] and res[url]["duplicate_of"] is None, url
+    # same visible text, different pixels: still one page
+    assert res["http://parked-2"]["duplicate_of"] == res["http://parked-1"]["path"]
+    # identical PNG
+    assert res["http://same-png"]["duplicate_of"] == res["http://blank-a"]["path"]
+    assert engine.stats["captured"] == 4 and engine.stats["duplicates"] == 2
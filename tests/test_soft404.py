@@ -0,0 +1,59 @@
+# tests/test_soft404.py
+import hashlib
+
+from fuzz import soft404
+from fuzz.path_fuzzer import fuzz_paths
+from tests.stubs import StubHttp
+
+
+def _res(path, status, body=b"", location=None):
+    return {"url": f"http://t/{path}", "status": status, "len": len(body),
+            "sha1": hashlib.sha1(body).hexdigest(), "_sample": body, "location": location}
+
+
+def _login_catch_all():
+    b = soft404.Baseline()
+    for name in ("x7f3k2aa", "q9w8e7r6t5y4u3i2"):
+        b.add(name, _res(name, 302, location=f"/login?next=/{name}"))
+    return b
+
+
+def test_catch_all_redirect_is_soft404():
+    b = _login_catch_all()
+    assert b.match("admin", _res("admin", 302, location="/login?next=/admin"))
+
+
+def test_genuine_redirect_is_kept():
+    b = _login_catch_all()
+    # empty body like the baseline's, but it points somewhere else
+    assert b.match("dashboard", _res("dashboard", 302, location="/dashboard/home")) is None
+    assert b.match("dashboard", _res("dashboard", 301, location="/dashboard/")) is None
+
+
+def test_redirect_never_matches_empty_body_baseline():
+    b = soft404.Baseline()
+    b.add("x7f3k2aa", _res("x7f3k2aa", 404))
+    assert b.match("old", _res("old", 302, location="/new")) is None
+
+
+def test_echoed_path_is_soft404():
+    page = b"<html><body><h1>Not found</h1><p>The page /%s does not exist on this server.</p></body></html>"
+    b = soft404.Baseline()
+    for name in ("x7f3k2aa", "q9w8e7r6t5y4u3i2", "z" * 24):
+        b.add(name, _res(name, 200, page % name.encode()))
+    for word in ("a-rather-long-backup-directory-name", "config.bak"):
+        assert b.match(word, _res(word, 200, page % word.encode()))
+    assert b.match("admin", _res("admin", 200, b"<html><body>admin console</body></html>")) is None
+
+
+def test_fuzz_paths_keeps_real_redirect_next_to_catch_all():
+    def handler(path):
+        if path == "/dashboard":
+            return 302, {"Location": "/dashboard/home"}, b""
+        if path == "/status":
+            return 200, {}, b"<html>ok</html>"
+        return 302, {"Location": f"/login?next={path}"}, b""
+
+    with StubHttp(handler) as srv:
+        hits = fuzz_paths(srv.url, ["dashboard", "status", "admin", "backup", "old"], workers=4)
+    assert sorted(h["url"].rsplit("/", 1)[1] for h in hits) == ["dashboard", "status"]
@@ -0,0 +1,31 @@
+# tests/test_startup.py
+"""Import-time budget: the CLI must start without the engines' heavy dependencies."""
+import subprocess
+import sys
+
+import pytest
+
+from tests.conftest import ROOT
+
+# loaded by the commands that need them, never at startup
+HEAVY = ("httpx", "dns", "requests", "urllib3", "sqlite3", "_sqlite3", "selenium", "nmap",
+         "utils.store", "utils.cache", "discovery", "fuzz", "scanner", "screenshots", "sharding")
+
+
+def _imported(*args):
+    proc = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=ROOT / "src",
+                          capture_output=True, text=True, timeout=60)
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    mods = set()
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            mods.add(line.rsplit("|", 1)[1].strip())
+    return mods
+
+
+@pytest.mark.parametrize("args", [("-c", "import main"), ("main.py", "--help")], ids=["import", "help"])
+def test_no_heavy_imports_at_startup(args):
+    mods = _imported(*args)
+    assert "main" in mods or "__main__" in mods or "config" in mods
+    heavy = sorted(m for m in mods if m.split(".")[0] in HEAVY or m in HEAVY)
+    assert not heavy, f"imported at startup: {heavy}"
@@ -0,0 +1,43 @@
+# tests/test_store.py
+import sqlite3
+from datetime import datetime, timedelta
+
+import config
+from utils import output
+from utils.store import NdjsonStore, SqliteStore
+
+
+class Clock:
+    """datetime stand-in whose utcnow() moves one second per call."""
+    now = datetime(2026, 1, 1, 12, 0, 0)
+
+    @classmethod
+    def utcnow(cls):
+        cls.now += timedelta(seconds=1)
+        return cls.now
+
+
+def test_ndjson_kinds_of_one_run_share_the_timestamp(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "RESULTS_DIR", tmp_path)
+    monkeypatch.setattr(output, "datetime", Clock)
+    store = NdjsonStore("example.com", timestamp=True)
+    store.write("subdomains", {"host": "a.example.com"})
+    store.flush()
+    store.write("probe", {"url": "https://a.example.com", "status": 200})
+    store.close()
+    names = sorted(p.name for p in tmp_path.iterdir())
+    assert names == ["example.com_probe_20260101_120001.ndjson",
+                     "example.com_subdomains_20260101_120001.ndjson"]
+
+
+def test_sqlite_store_indexes_records_and_ports(tmp_path):
+    store = SqliteStore("example.com", command="recon", path=tmp_path / "r.sqlite", batch_size=2)
+    store.write_many("probe", [{"url": "https://a.example.com/x", "status": 200},
+                               {"host": "b.example.com", "status": "bad"}])
+    store.write("nmap", {"addr": "10.0.0.1", "ports": [{"port": "80", "protocol": "tcp", "state": "open"}]})
+    store.close()
+    db = sqlite3.connect(str(tmp_path / "r.sqlite"))
+    assert db.execute("SELECT kind, host, ip, status FROM records ORDER BY id").fetchall() == [
+        ("probe", "a.example.com", None, 200), ("probe", "b.example.com", None, None), ("nmap", None, "10.0.0.1", None)]
+    assert db.execute("SELECT ip, port, state FROM ports").fetchall() == [("10.0.0.1", 80, "open")]
+    assert db.execute("SELECT finished IS NOT NULL FROM runs").fetchone() == (1,)